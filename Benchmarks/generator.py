@@ -0,0 +1,162 @@
+"""
+Benchmarks/generator.py
+
+Reprodukálható (seedelt) szintetikus követelménykészletek a mérésekhez:
+
+- generate_requirements(): strukturált JSON (variables / inputs / outputs),
+  ugyanabban a felépítésben, mint az Examples/*.json fájlok.
+- generate_text(): "R<n> ..." soros folyószöveg, amit a
+  Pre_process/DataCleaning.text_to_requirements fel tud dolgozni.
+
+Paraméterek:
+    n_rules        – szabályok száma (10 … 1 000 000)
+    effect_vars    – hány különböző kimeneti változó között oszlanak meg a
+                     szabályok (kevés kimeneti változó → nagy csoportok)
+    condition_vars – hány numerikus feltételváltozó van
+    overlap        – 0..1, az intervallumok relatív szélessége; nagyobb
+                     érték több átfedő szabálypárt jelent
+    formula_ratio  – a hatások mekkora része képlet (string érték)
+    duplicate_ratio – a szabályok mekkora része egy korábbi pontos másolata
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, Iterator, List
+
+# a feltételváltozók értéktartománya
+VALUE_RANGE = 1000
+
+_OPERAND_NAMES = ("price", "weight", "points", "days", "rate")
+
+
+def _interval_causes(rnd: random.Random, var: str, overlap: float) -> List[Dict[str, Any]]:
+    width = max(1, int(VALUE_RANGE * overlap * rnd.random()))
+    lo = rnd.randint(0, VALUE_RANGE)
+    kind = rnd.random()
+    if kind < 0.2:
+        return [{"variable": var, "operator": ">=", "value": lo}]
+    if kind < 0.4:
+        return [{"variable": var, "operator": "<", "value": lo}]
+    return [
+        {"variable": var, "operator": ">=", "value": lo},
+        {"variable": var, "operator": "<", "value": lo + width},
+    ]
+
+
+def iter_rules(
+    n_rules: int,
+    seed: int = 0,
+    effect_vars: int = 10,
+    condition_vars: int = 3,
+    overlap: float = 0.05,
+    formula_ratio: float = 0.1,
+    duplicate_ratio: float = 0.01,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Az inputs szabályai egyenként (nagy n-re is kis memóriával).
+    """
+    rnd = random.Random(seed)
+    recent: List[Dict[str, Any]] = []
+
+    for n in range(n_rules):
+        if recent and rnd.random() < duplicate_ratio:
+            original = rnd.choice(recent)
+            yield {**original, "id": f"R{n + 1}"}
+            continue
+
+        causes: List[Dict[str, Any]] = []
+        for v in rnd.sample(range(condition_vars), rnd.randint(1, min(2, condition_vars))):
+            causes.extend(_interval_causes(rnd, f"cond_{v}", overlap))
+
+        effect_var = f"effect_{rnd.randrange(effect_vars)}"
+        if rnd.random() < formula_ratio:
+            a, b = rnd.sample(_OPERAND_NAMES, 2)
+            value: Any = f"{a} * {rnd.randint(1, 5)} + {b}"
+        else:
+            value = rnd.randint(0, 20) / 10
+
+        rule = {
+            "id": f"R{n + 1}",
+            "description": "",
+            "Causes": causes,
+            "effects": [{"variable": effect_var, "operator": "=", "value": value}],
+        }
+        if len(recent) < 64:
+            recent.append(rule)
+        else:
+            recent[rnd.randrange(64)] = rule
+        yield rule
+
+
+def generate_requirements(n_rules: int, seed: int = 0, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Teljes requirements dict n_rules szabállyal.
+    """
+    condition_vars = kwargs.get("condition_vars", 3)
+    effect_vars = kwargs.get("effect_vars", 10)
+
+    variables: List[Dict[str, Any]] = []
+    for v in range(condition_vars):
+        variables.append({"name": f"cond_{v}", "type": "decimal", "role": "input"})
+    for v in range(effect_vars):
+        variables.append({"name": f"effect_{v}", "type": "decimal", "role": "eternal-truth"})
+
+    return {
+        "variables": variables,
+        "inputs": list(iter_rules(n_rules, seed, **kwargs)),
+        "outputs": [
+            {
+                "id": f"R{n_rules + 1}",
+                "description": "The output is the result.",
+                "question": [{"variable": "result_value", "operator": "=", "value": "?"}],
+                "rules": [],
+            }
+        ],
+    }
+
+
+# -------------------- Folyószöveg -------------------- #
+
+_TEXT_CONDITIONS = (
+    "the price of the goods reaches {v} euros",
+    "the total weight of the goods is under {v} kilograms",
+    "the number of points is at least {v}",
+    "the age of the employee is more than {v} years",
+    "the distance is less than {v} km",
+)
+
+_TEXT_EFFECTS = (
+    "The customer gets {v}% price reduction",
+    "the delivery price is {v} euros",
+    "the grade is {v}",
+    "the employee gets {v} extra vacation days",
+)
+
+
+def iter_text_rules(n_rules: int, seed: int = 0, and_ratio: float = 0.3) -> Iterator[str]:
+    """
+    "R<n> ..." sorok egyenként; a feltételek és hatások a DataCleaning
+    által ismert kifejezéseket használják.
+    """
+    rnd = random.Random(seed)
+    for n in range(n_rules):
+        cond = rnd.choice(_TEXT_CONDITIONS).format(v=rnd.randint(1, VALUE_RANGE))
+        if rnd.random() < and_ratio:
+            cond += " and " + rnd.choice(_TEXT_CONDITIONS).format(v=rnd.randint(1, VALUE_RANGE))
+        effect = rnd.choice(_TEXT_EFFECTS).format(v=rnd.randint(1, 20))
+
+        if rnd.random() < 0.5:
+            yield f"R{n + 1} {effect[0].upper()}{effect[1:]} if {cond}."
+        else:
+            yield f"R{n + 1} If {cond}, then {effect[0].lower()}{effect[1:]}."
+
+
+def generate_text(n_rules: int, seed: int = 0, **kwargs: Any) -> str:
+    """
+    Teljes követelményszöveg címsorral és egy output szabállyal.
+    """
+    lines = ["Synthetic requirements"]
+    lines.extend(iter_text_rules(n_rules, seed, **kwargs))
+    lines.append(f"R{n_rules + 1} The output is the price to be paid.")
+    return "\n".join(lines)
@@ -0,0 +1,255 @@
+"""
+Benchmarks/run_benchmarks.py
+
+Skálázódási mérések szintetikus követelménykészleteken (generator.py).
+
+Használat (a repó gyökeréből):
+    python -m Benchmarks.run_benchmarks
+    python -m Benchmarks.run_benchmarks --sizes 10 100 1000 10000 --memory -o bench.json
+
+Minden méretre és szakaszra rögzítjük:
+    seconds     – falióra-idő (a --repeat futás minimuma)
+    throughput  – szabály / másodperc
+    peak_bytes  – tracemalloc csúcs (csak --memory esetén, külön futásban)
+A végén szakaszonként log-log meredekséget (scaling exponent) is számolunk:
+~1 lineáris, ~2 négyzetes viselkedés.
+
+Ha egy szakasz egy méreten túllépi a --budget másodpercet, a nagyobb
+méreteken kihagyjuk ("skipped": true).
+
+A kimenet gépi feldolgozásra szánt JSON (alapértelmezés: stdout).
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Benchmarks.generator import generate_requirements, generate_text
+from Checking_process import (
+    check_variable_conflicts,
+    check_logical_exclusions,
+    check_redunant_rules,
+    interval_arrays,
+)
+from Checking_process.rule_model import decode_requirements
+from Checking_process.rule_set import RuleSet
+from Pre_process import DataCleaning
+from Pre_process.RuleBaseFile import read_rule_base, write_rule_base
+
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+def _measure(func: Callable[[], Any], repeat: int, memory: bool) -> Tuple[float, Optional[int]]:
+    """
+    (legjobb idő, tracemalloc csúcs) egy szakaszra.
+    """
+    best = math.inf
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return best, peak
+
+
+def _text_stages(text: str) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    A DataCleaning szakaszai; minden szakasz az előző kimenetét kapja
+    (előre kiszámolva, hogy csak az adott szakasz ideje számítson).
+    """
+    rules = DataCleaning.extract_rules(text)
+    split = [DataCleaning.split_condition_action(desc) for desc in rules.values()]
+    struct = DataCleaning.build_rules_structure(rules)
+
+    return [
+        ("text.extract_rules", lambda: DataCleaning.extract_rules(text)),
+        ("text.split_condition_action",
+         lambda: [DataCleaning.split_condition_action(desc) for desc in rules.values()]),
+        ("text.parse_conditions",
+         lambda: [DataCleaning.parse_conditions(cond) for cond, _ in split]),
+        ("text.parse_effects",
+         lambda: [DataCleaning.parse_effects(action, rid) for (_, action), rid in zip(split, rules)]),
+        ("text.build_rules_structure", lambda: DataCleaning.build_rules_structure(rules)),
+        ("text.infer_variables", lambda: DataCleaning.infer_variables(struct)),
+        ("text.text_to_requirements", lambda: DataCleaning.text_to_requirements(text)),
+    ]
+
+
+def _check_stages(data: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    rule_set = RuleSet(data)
+    stages = [
+        ("check.rule_set", lambda: RuleSet(data)),
+        ("check.variable_conflicts", lambda: check_variable_conflicts.check(rule_set)),
+        ("check.logical_exclusions", lambda: check_logical_exclusions.check(rule_set)),
+        ("check.redundant_rules", lambda: check_redunant_rules.check(rule_set)),
+    ]
+    if interval_arrays.HAS_NUMPY:
+        stages.append(
+            ("check.logical_exclusions[numpy]",
+             lambda: check_logical_exclusions.check(rule_set, backend="numpy"))
+        )
+    return stages
+
+
+def _load_stages(data: Dict[str, Any], directory: str) -> List[Tuple[str, Callable[[], Any]]]:
+    """
+    Újratöltés rule_model alakra JSON-ból (json.load + dekódolás) és a
+    bináris szabálybázisból (a szabályok felépítésével együtt).
+    """
+    json_path = os.path.join(directory, "requirements.json")
+    rule_base_path = os.path.join(directory, "requirements.rulebase")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    write_rule_base(rule_base_path, data)
+
+    def load_json() -> Any:
+        with open(json_path, "r", encoding="utf-8") as f:
+            return decode_requirements(json.load(f))
+
+    def load_rule_base() -> Any:
+        loaded = read_rule_base(rule_base_path)
+        return [list(loaded[section]) for section in ("variables", "inputs", "outputs")]
+
+    return [("load.json", load_json), ("load.rule_base", load_rule_base)]
+
+
+def _scaling_exponents(results: List[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    """
+    Legkisebb négyzetes illesztés log(seconds) ~ k * log(size) szakaszonként.
+    """
+    by_stage: Dict[str, List[Tuple[float, float]]] = {}
+    for r in results:
+        # a nagyon rövid mérések zajosak, kihagyjuk őket
+        if r.get("skipped") or r["seconds"] < 1e-4:
+            continue
+        by_stage.setdefault(r["stage"], []).append((math.log(r["size"]), math.log(r["seconds"])))
+
+    exponents: Dict[str, Optional[float]] = {}
+    for stage, points in by_stage.items():
+        if len(points) < 2:
+            exponents[stage] = None
+            continue
+        mx = sum(x for x, _ in points) / len(points)
+        my = sum(y for _, y in points) / len(points)
+        var = sum((x - mx) ** 2 for x, _ in points)
+        cov = sum((x - mx) * (y - my) for x, y in points)
+        exponents[stage] = round(cov / var, 3) if var else None
+    return exponents
+
+
+def run(
+    sizes: List[int],
+    seed: int = 0,
+    repeat: int = 3,
+    memory: bool = False,
+    budget: float = 30.0,
+    generator_args: Optional[Dict[str, Any]] = None,
+    log: Callable[[str], None] = lambda msg: None,
+) -> Dict[str, Any]:
+    generator_args = generator_args or {}
+    results: List[Dict[str, Any]] = []
+    over_budget: set = set()
+
+    # a betöltési szakaszok fájljai
+    directory = tempfile.TemporaryDirectory(prefix="bench-")
+    for size in sorted(sizes):
+        text = generate_text(size, seed)
+        data = generate_requirements(size, seed, **generator_args)
+
+        stages = _text_stages(text) + _check_stages(data) + _load_stages(data, directory.name)
+        for stage, func in stages:
+            if stage in over_budget:
+                results.append({"stage": stage, "size": size, "skipped": True})
+                continue
+
+            seconds, peak = _measure(func, repeat, memory)
+            results.append(
+                {
+                    "stage": stage,
+                    "size": size,
+                    "seconds": seconds,
+                    "throughput": size / seconds if seconds else None,
+                    "peak_bytes": peak,
+                }
+            )
+            log(f"{stage:40s} n={size:<8d} {seconds:10.4f} s")
+            if seconds > budget:
+                over_budget.add(stage)
+
+    directory.cleanup()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "repeat": repeat,
+            "generator": generator_args,
+            "numpy": interval_arrays.HAS_NUMPY,
+        },
+        "results": results,
+        "scaling": _scaling_exponents(results),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Szintetikus skálázódási mérések.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory", action="store_true", help="tracemalloc csúcs mérése")
+    parser.add_argument("--budget", type=float, default=30.0,
+                        help="e fölötti szakaszidő után a nagyobb méreteket kihagyjuk (s)")
+    parser.add_argument("--effect-vars", type=int, default=10)
+    parser.add_argument("--condition-vars", type=int, default=3)
+    parser.add_argument("--overlap", type=float, default=0.05)
+    parser.add_argument("-o", "--output", help="JSON kimeneti fájl (alapértelmezés: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(
+        args.sizes,
+        seed=args.seed,
+        repeat=args.repeat,
+        memory=args.memory,
+        budget=args.budget,
+        generator_args={
+            "effect_vars": args.effect_vars,
+            "condition_vars": args.condition_vars,
+            "overlap": args.overlap,
+        },
+        log=lambda msg: print(msg, file=sys.stderr),
+    )
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+box_index.py
+
+Cél:
+- Több változós térbeli index a szabályok feltételdobozaihoz: egy doboz
+  (változónkénti intervallumok) metszési lekérdezése csak a ténylegesen
+  átfedő dobozokat adja vissza, nem kell minden párt megnézni.
+
+Heurisztika:
+- A dimenziók a dobozokban előforduló összes változó. Ahol egy doboznak
+  nincs feltétele, ott a teljes számegyenest fedi – mint a páronkénti
+  intervals_overlap vizsgálatnál, amely csak a közös változókat nézi.
+
+Működés:
+- Felülről lefelé épített befoglaló-doboz fa (k-d fa szerű felosztás): a
+  csomópont a legtöbb doboz által korlátozott dimenzióban vág – a
+  korlátozottakat a középpontjuk szerint FANOUT egyenlő szeletre, a
+  dimenzióban korlátlanokat egy külön gyerekbe. Így a befoglaló dobozok akkor is
+  végesek maradnak, ha a szabályok a változóknak csak egy részét
+  korlátozzák.
+- A csomópont a részfája befoglaló dobozát, belső (minden dobozban benne
+  levő) dobozát és legnagyobb sorszámát tárolja.
+- Lekérdezéskor csak a kérdező doboz korlátozott dimenzióit nézzük. A
+  befoglaló dobozzal nem átfedő részfát kihagyjuk, a belső dobozzal
+  szigorúan átfedőt vizsgálat nélkül átvesszük; a levelekben
+  intervals_overlap dönt, az eredmény tehát pontos.
+"""
+
+from __future__ import annotations
+
+from math import inf
+from typing import Dict, List, Optional, Tuple
+
+from Checking_process.intervals import Interval, Numeric, interval_empty, intervals_overlap
+from Instrumentation.metrics import METRICS
+
+
+# Ennyi doboz alatt nem vágunk tovább
+LEAF_SIZE = 16
+
+# A vágási dimenzióban korlátozott dobozok ennyi szeletre oszlanak
+FANOUT = 2
+
+
+def boxes_overlap(box1: Dict[str, Interval], box2: Dict[str, Interval]) -> bool:
+    """
+    Két feltételdoboz metszi-e egymást (a nem közös változók nem számítanak).
+    """
+    if len(box2) < len(box1):
+        box1, box2 = box2, box1
+    for var, interval in box1.items():
+        other = box2.get(var)
+        if other is not None and not intervals_overlap(interval, other):
+            return False
+    return True
+
+
+def _center(lo: Numeric, hi: Numeric) -> Optional[float]:
+    if lo == -inf:
+        return None if hi == inf else hi
+    if hi == inf:
+        return lo
+    return (lo + hi) / 2
+
+
+class _Node:
+    __slots__ = ("lows", "highs", "inner_lows", "inner_highs", "proper", "top", "children", "handles")
+
+    def __init__(self, handles: List[int]):
+        # befoglaló doboz: a legkisebb alsó és legnagyobb felső határok
+        self.lows: List[Numeric] = []
+        self.highs: List[Numeric] = []
+        # belső doboz: a legnagyobb alsó és legkisebb felső határok
+        self.inner_lows: List[Numeric] = []
+        self.inner_highs: List[Numeric] = []
+        # a részfában nincs üres intervallum
+        self.proper = True
+        # a részfa legnagyobb sorszáma
+        self.top = -1
+        self.children: Tuple["_Node", ...] = ()
+        self.handles = handles
+
+
+class BoxIndex:
+    """
+    Statikus index: sorszám -> feltételdoboz (változó -> intervallum).
+    """
+
+    def __init__(self, boxes: Dict[int, Dict[str, Interval]]):
+        self.boxes = boxes
+        self._dims: Dict[str, int] = {}
+        for box in boxes.values():
+            for var in box:
+                self._dims.setdefault(var, len(self._dims))
+
+        k = len(self._dims)
+        # dobozonként a dimenziók szerinti határok (hiányzó feltétel: végtelen)
+        # és középpontok (None: a dimenzióban korlátlan)
+        self._lows: Dict[int, List[Numeric]] = {}
+        self._highs: Dict[int, List[Numeric]] = {}
+        self._centers: Dict[int, List[Optional[float]]] = {}
+        # a levélbeli vizsgálathoz: (dimenzió, intervallum) párok, és hogy
+        # a dobozban nincs-e üres intervallum
+        self._items: Dict[int, List[Tuple[int, Interval]]] = {}
+        self._proper: Dict[int, bool] = {}
+        for handle, box in boxes.items():
+            self._items[handle] = [(self._dims[var], interval) for var, interval in box.items()]
+            self._proper[handle] = not any(interval_empty(interval) for interval in box.values())
+            lows = [-inf] * k
+            highs = [inf] * k
+            for var, (lo, _, hi, _) in box.items():
+                dim = self._dims[var]
+                lows[dim], highs[dim] = lo, hi
+            self._lows[handle] = lows
+            self._highs[handle] = highs
+            self._centers[handle] = [_center(lo, hi) for lo, hi in zip(lows, highs)]
+
+        self._root: Optional[_Node] = self._build(list(boxes)) if boxes else None
+
+    def _split(self, handles: List[int]) -> Optional[Tuple[List[int], ...]]:
+        """
+        A csomópont gyerekei: a vágási dimenzióban korlátozottak a
+        középpontjuk szerint FANOUT szeletben, a korlátlanok külön csoportban.
+        A dimenzió az, amelyet a legtöbb doboz korlátoz (egyenlőségnél a
+        nagyobb terjedelmű). None: nincs értelmes vágás.
+        """
+        best: Optional[Tuple[int, float, int]] = None
+        for dim in range(len(self._dims)):
+            centers = [c for h in handles if (c := self._centers[h][dim]) is not None]
+            if len(centers) < 2:
+                continue
+            spread = max(centers) - min(centers)
+            if spread and (best is None or (len(centers), spread) > best[:2]):
+                best = (len(centers), spread, dim)
+        if best is None:
+            return None
+
+        dim = best[2]
+        constrained = [h for h in handles if self._centers[h][dim] is not None]
+        free = [h for h in handles if self._centers[h][dim] is None]
+        constrained.sort(key=lambda h: self._centers[h][dim])
+        parts = min(FANOUT, len(constrained))
+        groups = [constrained[i * len(constrained) // parts:(i + 1) * len(constrained) // parts] for i in range(parts)]
+        groups.append(free)
+        return tuple(group for group in groups if group)
+
+    def _build(self, handles: List[int]) -> _Node:
+        # felülről lefelé vágunk, majd fordított sorrendben (a gyerekektől
+        # felfelé) számoljuk a dobozokat – rekurzió nélkül
+        root = _Node(handles)
+        nodes = [root]
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            if len(node.handles) <= LEAF_SIZE:
+                continue
+            groups = self._split(node.handles)
+            if groups is None:
+                continue
+            node.children = tuple(_Node(group) for group in groups)
+            node.handles = []
+            nodes.extend(node.children)
+            pending.extend(node.children)
+
+        for node in reversed(nodes):
+            if node.children:
+                parts = node.children
+                node.lows = [min(values) for values in zip(*(c.lows for c in parts))]
+                node.highs = [max(values) for values in zip(*(c.highs for c in parts))]
+                node.inner_lows = [max(values) for values in zip(*(c.inner_lows for c in parts))]
+                node.inner_highs = [min(values) for values in zip(*(c.inner_highs for c in parts))]
+                node.proper = all(c.proper for c in parts)
+                node.top = max(c.top for c in parts)
+                continue
+            lows = [self._lows[h] for h in node.handles]
+            highs = [self._highs[h] for h in node.handles]
+            node.lows = [min(values) for values in zip(*lows)]
+            node.highs = [max(values) for values in zip(*highs)]
+            node.inner_lows = [max(values) for values in zip(*lows)]
+            node.inner_highs = [min(values) for values in zip(*highs)]
+            node.proper = all(self._proper[h] for h in node.handles)
+            node.top = max(node.handles)
+        return root
+
+    def intersecting(self, box: Dict[str, Interval], after: int = -1) -> List[int]:
+        """
+        A box-szal átfedő dobozok sorszámai (after-nél nagyobbak), növekvő
+        sorrendben.
+        """
+        found: List[int] = []
+        if self._root is None:
+            return found
+        query = [
+            (self._dims[var], lo, hi)
+            for var, (lo, _, hi, _) in box.items()
+            if var in self._dims
+        ]
+        by_dim: List[Optional[Interval]] = [None] * len(self._dims)
+        for var, interval in box.items():
+            if var in self._dims:
+                by_dim[self._dims[var]] = interval
+        # nem üres kérdező doboznál a belső dobozzal szigorúan átfedő
+        # csomópont minden doboza átfed – ott nem kell egyenként vizsgálni
+        proper = not any(interval_empty(interval) for interval in box.values())
+        items, proper_boxes = self._items, self._proper
+        checks = 0
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node.top <= after:
+                continue
+            lows, highs = node.lows, node.highs
+            for dim, lo, hi in query:
+                if lows[dim] > hi or highs[dim] < lo:
+                    break
+            else:
+                if proper and node.proper:
+                    inner_lows, inner_highs = node.inner_lows, node.inner_highs
+                    for dim, lo, hi in query:
+                        if inner_lows[dim] >= hi or inner_highs[dim] <= lo:
+                            break
+                    else:
+                        found.extend(self._handles(node, after))
+                        continue
+                if node.children:
+                    stack.extend(node.children)
+                    continue
+                for handle in node.handles:
+                    if handle <= after:
+                        continue
+                    checks += 1
+                    # nem üres intervallumoknál a szigorú átfedés elég,
+                    # érintkező határoknál intervals_overlap dönt
+                    strict = proper and proper_boxes[handle]
+                    for dim, interval in items[handle]:
+                        other = by_dim[dim]
+                        if other is None or (strict and other[0] < interval[2] and interval[0] < other[2]):
+                            continue
+                        if not intervals_overlap(other, interval):
+                            break
+                    else:
+                        found.append(handle)
+        METRICS.count("box_index.checks", checks)
+        found.sort()
+        return found
+
+    @staticmethod
+    def _handles(node: _Node, after: int) -> List[int]:
+        """
+        A részfa after-nél nagyobb sorszámai.
+        """
+        handles: List[int] = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.top <= after:
+                continue
+            if node.children:
+                stack.extend(node.children)
+            else:
+                handles.extend(h for h in node.handles if h > after)
+        return handles
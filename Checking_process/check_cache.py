@@ -0,0 +1,412 @@
+"""
+check_cache.py
+
+Cél:
+- Inkrementális újraellenőrzés: ha több ezer szabályból csak néhány
+  változott, ne számoljunk újra mindent.
+
+Működés:
+- Minden szabályhoz tartalom-hash készül (section, id, Causes, effects/rules).
+  Azonos tartalmú szabályok az előfordulásuk sorszámával különböznek.
+- A lemezen tárolt cache (pickle) hash szerint tartalmazza a szabályból
+  számolt adatokat (intervallumok, diszkrét tartományok, redundancia- és
+  formula-signature), így változatlan szabálynál ezeket nem számoljuk újra.
+- A logikai kizárásoknál az előző futás assignment-kulcsait és ütköző
+  indexpárjait tároljuk. Két változatlan szabály párjának eredménye nem változhat, ezért
+  újra csak a módosult szabályokat érintő párokat vizsgáljuk.
+- A párok üzenetei a párokkal együtt, memóriában öröklődnek (next_run):
+  csak az új párok üzenetét formázzuk meg, a megjelent / megszűnt párok
+  üzenetei pedig külön is elérhetők (pair_changes, lásd watch.py).
+- A lefedett szabályokat hatás-signature csoportonként tároljuk a csoport
+  szabálykulcsaival együtt: változatlan csoportot nem vizsgálunk újra.
+- Memóriában tartott állapothoz (pl. watch.py) a next_run() adja a
+  következő futás cache-ét, lemez nélkül.
+- workers > 1 esetén a páros keresés teljes újraszámolása (hideg cache,
+  sok módosítás) process poolon fut (parallel.py).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import operator
+import os
+import pickle
+from bisect import bisect_left
+from itertools import compress
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Checking_process import check_variable_conflicts, check_logical_exclusions
+from Checking_process.check_redunant_rules import (
+    duplicate_messages,
+    effect_groups,
+    group_subsumptions,
+    subsumption_messages,
+)
+from Checking_process.formula_index import FormulaInterner
+from Checking_process.parallel import conflicting_pairs_parallel
+from Checking_process.rule_model import Condition, Effect, Rule
+from Checking_process.rule_set import RuleSet, derive_rule, rule_effects
+from Instrumentation.metrics import METRICS
+
+
+# A cache felépítésének verziója – változáskor a régi cache érvénytelen
+CACHE_VERSION = 6
+
+# Ha a módosult hatások aránya ennél nagyobb, teljes újraszámolás olcsóbb
+FULL_RESCAN_RATIO = 0.25
+
+
+def rule_digest(
+    section: str,
+    rid: Any,
+    causes: Tuple[Condition, ...],
+    effects: Tuple[Effect, ...],
+) -> str:
+    """
+    Egy szabály tartalom-hash-e az egységesített hatáslistával
+    (a leírás nem számít bele).
+    """
+    # egyszerű tuple-ök repr-je: gyorsabb a json.dumps-nál, és az értékek
+    # típusát is megkülönbözteti (1, 1.0, "1")
+    payload = repr((
+        section,
+        rid,
+        [(c.variable, c.operator, c.value, c.raw) for c in causes],
+        [(e.variable, e.operator, e.value, e.expression, e.raw) for e in effects],
+    ))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class RuleCache:
+    """
+    Lemezen tárolt, szabályonkénti cache egy futáshoz.
+
+    Egy példány egy RuleSet felépítéséhez tartozik: RuleSet(data, cache=...)
+    a lookup() hívásokkal tölti, a run_cached_checks() a végén menti.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        # előző futás adatai
+        self._derived: Dict[str, Dict[str, Any]] = {}
+        self.assignment_keys: List[str] = []
+        self.pairs: List[Tuple[int, int]] = []
+        # a pairs üzenetei ugyanabban a sorrendben; lemezre nem írjuk ki (None:
+        # nem ismertek, lemezről töltött cache)
+        self.pair_texts: Optional[List[str]] = []
+        # az utolsó futásban (megjelent, megszűnt) párok üzenetei; None, ha az
+        # előző futás üzenetei nem ismertek
+        self.pair_changes: Optional[Tuple[List[str], List[str]]] = ([], [])
+        # hatás-signature -> (a csoport szabálykulcsai, lefedések kulcsokkal)
+        self.subsumptions: Dict[Tuple, Tuple[Tuple[str, ...], List[Tuple[str, str, bool]]]] = {}
+
+        # (section, id) -> (nyers szabály, dekódolt szabály, hash) – memóriában
+        # tartott állapotnál (next_run) a változatlan szabályt nem dekódoljuk
+        # és a hash-ét nem számoljuk újra
+        self._previous_rules: Dict[Tuple[str, Any], Tuple[Any, Rule, str]] = {}
+
+        # aktuális futás adatai
+        self._current: Dict[str, Dict[str, Any]] = {}
+        self._occurrences: Dict[str, int] = {}
+        self._rules: Dict[Tuple[str, Any], Tuple[Any, Rule, str]] = {}
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            # sérült / régi cache – üresen indulunk
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        self._derived = data["derived"]
+        self.assignment_keys = data["assignment_keys"]
+        self.pairs = data["pairs"]
+        self.pair_texts = None
+        self.subsumptions = data["subsumptions"]
+
+    def lookup(
+        self,
+        rule: Dict[str, Any] | Rule,
+        section: str,
+        decode: Callable[[Any], Rule],
+        interner: Optional[FormulaInterner] = None,
+    ) -> Tuple[Rule, str, Dict[str, Any]]:
+        """
+        (szabály, kulcs, számolt adatok) egy nyers szabályhoz; cache-találatnál
+        újraszámolás nélkül. A next_run() előző futásában már látott,
+        változatlan szabályt nem is dekódoljuk újra. Új számolásnál a képletek
+        az interner (a hívó RuleSet) tárába kerülnek.
+        """
+        rid = rule.get("id", "<no-id>")
+        previous = self._previous_rules.get((section, rid))
+        if previous is not None and previous[0] is not rule and previous[0] == rule:
+            _, model, digest = previous
+        else:
+            model = decode(rule)
+            digest = rule_digest(section, rid, model.causes, rule_effects(model, section))
+        self._rules[(section, rid)] = (rule, model, digest)
+        n = self._occurrences.get(digest, 0)
+        self._occurrences[digest] = n + 1
+
+        derived = self._current.get(digest) or self._derived.get(digest)
+        if derived is None:
+            self.misses += 1
+            METRICS.count("rule_cache.misses")
+            derived = derive_rule(model, section, interner)
+        else:
+            self.hits += 1
+            METRICS.count("rule_cache.hits")
+        self._current[digest] = derived
+        return model, f"{digest}#{n}", derived
+
+    def save(self) -> None:
+        """
+        Az aktuális futás adatainak kiírása (a régi bejegyzések eldobásával).
+        """
+        if not self.path:
+            return
+        data = {
+            "version": CACHE_VERSION,
+            "derived": self._current,
+            "assignment_keys": self.assignment_keys,
+            "pairs": self.pairs,
+            "subsumptions": self.subsumptions,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def next_run(self) -> "RuleCache":
+        """
+        A következő futás cache-e, amelynek "előző futása" ez a példány –
+        a lemez érintése nélkül (ugyanarra az útvonalra ment, ha van).
+        """
+        cache = RuleCache()
+        cache.path = self.path
+        cache._derived = self._current
+        cache._previous_rules = self._rules
+        cache.assignment_keys = self.assignment_keys
+        cache.pairs = self.pairs
+        cache.pair_texts = self.pair_texts
+        cache.subsumptions = self.subsumptions
+        return cache
+
+
+def _rule_keys(rule_set: RuleSet) -> List[str]:
+    """
+    Szabályonként a tartalom-kulcs (cache nélkül épült RuleSet-nél itt
+    számolva).
+    """
+    rule_keys = [rule["key"] for rule in rule_set.rules]
+    if any(key is None for key in rule_keys):
+        occurrences: Dict[str, int] = {}
+        rule_keys = []
+        for rule in rule_set.rules:
+            digest = rule_digest(rule["section"], rule["id"], rule["causes"], rule["effects"])
+            n = occurrences.get(digest, 0)
+            occurrences[digest] = n + 1
+            rule_keys.append(f"{digest}#{n}")
+    return rule_keys
+
+
+def _assignment_keys(rule_set: RuleSet) -> List[str]:
+    """
+    Assignmentenként stabil kulcs: a szabály kulcsa + a hatás sorszáma
+    a szabályon belül.
+    """
+    rule_keys = _rule_keys(rule_set)
+    keys: List[str] = []
+    last_rule = None
+    ordinal = 0
+    for rec in rule_set.assignments:
+        ordinal = ordinal + 1 if rec["rule"] == last_rule else 0
+        last_rule = rec["rule"]
+        keys.append(f"{rule_keys[rec['rule']]}/{ordinal}")
+    return keys
+
+
+def _format_missing(rule_set: RuleSet, pairs: List[Tuple[int, int]], texts: List[Optional[str]]) -> List[str]:
+    """
+    A még üzenet nélküli (None) párok üzeneteinek kitöltése; visszatér az
+    újonnan formázott üzenetekkel, a párok sorrendjében.
+    """
+    missing: List[int] = []
+    try:
+        # list.index C-ben keres – a lista általában hosszú, a hiány kevés
+        while True:
+            missing.append(texts.index(None, missing[-1] + 1 if missing else 0))
+    except ValueError:
+        pass
+    formatted = check_logical_exclusions.pair_messages(rule_set, [pairs[n] for n in missing])
+    for n, text in zip(missing, formatted):
+        texts[n] = text
+    return formatted
+
+
+def cached_conflicting_pairs(
+    rule_set: RuleSet,
+    cache: RuleCache,
+    workers: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Ugyanaz, mint check_logical_exclusions.conflicting_pairs, de a két
+    változatlan hatás közti párokat az előző futásból vesszük át. A teljes
+    újraszámolás workers > 1 esetén párhuzamosan fut.
+
+    A párok üzeneteit (cache.pair_texts) is frissíti: változatlan párnál az
+    előző futás üzenetét vesszük át, és cache.pair_changes-be kerülnek a
+    megjelent és a megszűnt párok üzenetei.
+    """
+    keys = _assignment_keys(rule_set)
+    old_keys = cache.assignment_keys
+    known = cache.pair_texts is not None
+    old_texts: List[Optional[str]] = cache.pair_texts if known else [None] * len(cache.pairs)
+    resolved: List[Optional[str]] = []
+
+    if keys == old_keys:
+        # semmi sem változott
+        pairs = cache.pairs
+        texts = old_texts
+    else:
+        index_of = {key: i for i, key in enumerate(keys)}
+        old_index = set(old_keys)
+        changed = [i for i, key in enumerate(keys) if key not in old_index]
+
+        if not old_keys or len(changed) > FULL_RESCAN_RATIO * len(keys):
+            if workers is not None and workers > 1:
+                pairs = conflicting_pairs_parallel(rule_set, workers)
+            else:
+                pairs = check_logical_exclusions.conflicting_pairs(rule_set)
+            if cache.pairs:
+                # a megmaradt párok üzenete a kulcspár szerint; ami a végén a
+                # dict-ben marad, az megszűnt (az előző futás sorrendjében)
+                previous = {
+                    (old_keys[i], old_keys[j]): text for (i, j), text in zip(cache.pairs, old_texts)
+                }
+                texts = [previous.pop((keys[i], keys[j]), None) for i, j in pairs]
+                resolved = list(previous.values())
+            else:
+                texts = [None] * len(pairs)
+        else:
+            # régi index -> új index (None, ha a hatás megszűnt)
+            remap = [index_of.get(key) for key in old_keys]
+            fresh = check_logical_exclusions.conflicting_pairs_for(rule_set, changed)
+            kept = [i for i in remap if i is not None]
+            if all(a < b for a, b in zip(kept, kept[1:])):
+                # a megmaradt hatások sorrendje nem változott (helyben
+                # szerkesztés, beszúrás, törlés): az átszámozott régi párok
+                # rendezettek maradnak, és az új párokkal (amelyekben mindig
+                # van módosult hatás) nem fednek át – elég összefésülni
+                alive = [remap[i] is not None and remap[j] is not None for i, j in cache.pairs]
+                kept_pairs = list(compress(cache.pairs, alive))
+                if any(i is not None and i != old_i for old_i, i in enumerate(remap)):
+                    # eltolódtak az indexek (beszúrás / törlés); helyben
+                    # szerkesztésnél a régi párok változatlanul maradnak
+                    kept_pairs = [(remap[i], remap[j]) for i, j in kept_pairs]
+                kept_texts = list(compress(old_texts, alive))
+                resolved = list(compress(old_texts, map(operator.not_, alive)))
+                # a (kevés) új pár beszúrása szeletenként, üzenet nélkül
+                pairs = []
+                texts = []
+                start = 0
+                for pair in fresh:
+                    pos = bisect_left(kept_pairs, pair, start)
+                    pairs += kept_pairs[start:pos]
+                    texts += kept_texts[start:pos]
+                    pairs.append(pair)
+                    texts.append(None)
+                    start = pos
+                pairs += kept_pairs[start:]
+                texts += kept_texts[start:]
+            else:
+                merged_texts: Dict[Tuple[int, int], Optional[str]] = dict.fromkeys(fresh)
+                for (old_i, old_j), text in zip(cache.pairs, old_texts):
+                    i = remap[old_i]
+                    j = remap[old_j]
+                    if i is None or j is None:
+                        resolved.append(text)
+                    elif i < j:
+                        merged_texts[(i, j)] = text
+                    else:
+                        # megfordult a pár sorrendje – az üzenete is más
+                        resolved.append(text)
+                        merged_texts[(j, i)] = None
+                pairs = sorted(merged_texts)
+                texts = [merged_texts[pair] for pair in pairs]
+
+    # az új párok üzenetei (ismeretlen előző üzeneteknél mind)
+    added = _format_missing(rule_set, pairs, texts)
+    cache.assignment_keys = keys
+    cache.pairs = pairs
+    cache.pair_texts = texts
+    cache.pair_changes = (added, resolved) if known else None
+    return pairs
+
+
+def cached_subsumptions(rule_set: RuleSet, cache: RuleCache) -> List[Tuple[int, int, bool]]:
+    """
+    Ugyanaz, mint check_redunant_rules.subsumed_rules, de az előző futásban
+    már vizsgált, változatlan hatás-signature csoportok eredményét vesszük át.
+    """
+    rule_keys = _rule_keys(rule_set)
+    groups: Dict[Tuple, Tuple[Tuple[str, ...], List[Tuple[str, str, bool]]]] = {}
+    found: List[Tuple[int, int, bool]] = []
+
+    for effects, group in effect_groups(rule_set):
+        group_keys = tuple(rule_keys[idx] for idx in group)
+        previous = cache.subsumptions.get(effects)
+        if previous is not None and previous[0] == group_keys:
+            METRICS.count("rule_cache.subsumption_hits")
+            position = dict(zip(group_keys, group))
+            found.extend((position[a], position[b], equivalent) for a, b, equivalent in previous[1])
+            groups[effects] = previous
+            continue
+        subsumptions = group_subsumptions(rule_set, group)
+        found.extend(subsumptions)
+        groups[effects] = (
+            group_keys,
+            [(rule_keys[a], rule_keys[b], equivalent) for a, b, equivalent in subsumptions],
+        )
+
+    cache.subsumptions = groups
+    found.sort()
+    return found
+
+
+def run_cached_checks(
+    rule_set: RuleSet,
+    cache: RuleCache,
+    workers: Optional[int] = None,
+) -> Dict[str, List[str]]:
+    """
+    Mindhárom ellenőrző inkrementálisan, a cache frissítésével és mentésével.
+    Az eredmény ugyanaz, mint a soros check() hívásoké.
+    """
+    with METRICS.stage("check.logical_exclusions"):
+        exclusions = check_logical_exclusions.empty_interval_messages(rule_set)
+        cached_conflicting_pairs(rule_set, cache, workers)
+        exclusions.extend(cache.pair_texts)
+
+    with METRICS.stage("check.redundant_rules"):
+        redundant = duplicate_messages(rule_set)
+        redundant.extend(subsumption_messages(rule_set, cached_subsumptions(rule_set, cache)))
+
+    with METRICS.stage("check.variable_conflicts"):
+        variable_conflicts = check_variable_conflicts.check(rule_set)
+
+    results = {
+        "variable_conflicts": variable_conflicts,
+        "logical_exclusions": exclusions,
+        "redundant_rules": redundant,
+    }
+    with METRICS.stage("rule_cache.save"):
+        cache.save()
+    return results
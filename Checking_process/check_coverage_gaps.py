@@ -0,0 +1,278 @@
+"""
+check_coverage_gaps.py
+
+Cél:
+- Lefedettségi hézagok keresése: a bemeneti tér mely tartományaiban nem
+  ad értéket egyetlen szabály sem egy kimeneti változónak (pl. mely
+  total_goods_price / total_weight_kg kombinációknál marad a
+  delivery_price meghatározatlan).
+
+Heurisztika:
+- Kimeneti változónként az "=" hatású szabályok feltételdobozait nézzük
+  (intervals.build_intervals szemantikával). A dimenziók a szabályokban
+  korlátozott változók.
+- A numerikus intervallumba nem fordítható feltételt (pl. string érték)
+  is tartalmazó szabály csak feltételesen fed le – ezt nem számítjuk
+  lefedésnek. Üres intervallumú szabály semmit sem fed le.
+- A "boolean" típusú változók tartománya {0, 1}, a többié a teljes
+  számegyenes.
+
+Működés:
+- Változónként összegyűjtjük a határpontokat, és elemi cellákra
+  tömörítjük a számegyenest: (-inf, p1), [p1], (p1, p2), [p2], ..., (pk, inf).
+  Minden doboz így cellaindex-tartományok szorzata.
+- Dimenziónként söprünk: az első dimenzió mentén azokra a szakaszokra
+  bontunk, ahol az aktív dobozok halmaza állandó, és a maradék
+  dimenziókon rekurzívan keressük a fedetlen részt. Az azonos aktív
+  halmazú szakaszok eredményét újrahasznosítjuk, a szomszédos, azonos
+  eredményű szakaszokat összevonjuk. A munka így a ténylegesen érintett
+  cellák számával arányos, nem a teljes rácséval.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from math import inf
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from Checking_process.intervals import Interval, Numeric, interval_empty
+from Checking_process.rule_set import RuleSet, as_rule_set
+from Instrumentation.metrics import METRICS
+
+
+# Kimeneti változónként legfeljebb ennyi fedetlen tartományt írunk ki
+MAX_REGIONS = 20
+
+_INTERVAL_OPERATORS = (">", ">=", "<", "<=", "==")
+
+# cellaindex-tartomány (első, utolsó) – mindkettő zárt
+CellRange = Tuple[int, int]
+Region = Tuple[CellRange, ...]
+
+
+class _Axis:
+    """
+    Egy változó elemi cellái.
+    A k határpontnál a cellák: 2i = (p[i-1], p[i]) nyílt, 2i+1 = [p[i]].
+    """
+
+    def __init__(self, name: str, points: List[Numeric], boolean: bool):
+        self.name = name
+        # True / False pontok 1 / 0-ként, hogy az üzenetekben egységesen
+        # számként jelenjenek meg (True == 1, a halmaz bármelyiket megtartaná)
+        numbers = {int(p) if isinstance(p, bool) else p for p in points}
+        self.points = sorted(numbers | ({0, 1} if boolean else set()))
+        self.size = 2 * len(self.points) + 1
+        if boolean:
+            # csak a 0 és az 1 pontcellái tartoznak a tartományhoz
+            self.domain = [(self._point_cell(0),) * 2, (self._point_cell(1),) * 2]
+        else:
+            self.domain = [(0, self.size - 1)]
+
+    def _point_cell(self, value: Numeric) -> int:
+        return 2 * bisect_left(self.points, value) + 1
+
+    def cells(self, interval: Interval) -> CellRange:
+        lo, lo_inc, hi, hi_inc = interval
+        if lo == -inf:
+            first = 0
+        else:
+            first = self._point_cell(lo) + (0 if lo_inc else 1)
+        if hi == inf:
+            last = self.size - 1
+        else:
+            last = self._point_cell(hi) - (0 if hi_inc else 1)
+        return first, last
+
+    def describe(self, cells: CellRange) -> Optional[str]:
+        """
+        Egy cellatartomány szöveges alakja (None, ha a teljes tartomány).
+        """
+        first, last = cells
+        if [cells] == self.domain:
+            return None
+        if first % 2:
+            lo, lo_op = self.points[first // 2], ">="
+        else:
+            lo, lo_op = (self.points[first // 2 - 1] if first else None), ">"
+        if last % 2:
+            hi, hi_op = self.points[last // 2], "<="
+        else:
+            hi, hi_op = (self.points[last // 2] if last < self.size - 1 else None), "<"
+
+        if first == last and first % 2:
+            return f"{self.name} == {lo}"
+        if lo is None:
+            return f"{self.name} {hi_op} {hi}"
+        if hi is None:
+            return f"{self.name} {lo_op} {lo}"
+        return f"{self.name} {lo_op} {lo} és {self.name} {hi_op} {hi}"
+
+
+def _covering(rule: Dict[str, Any]) -> bool:
+    """
+    Teljesen lefed-e a szabály a feltételdobozán belül.
+    """
+    for c in rule["causes"]:
+        if not (
+            c.variable is not None
+            and c.operator in _INTERVAL_OPERATORS
+            and isinstance(c.value, (int, float))
+        ):
+            return False
+    return not any(interval_empty(iv) for iv in rule["intervals"].values())
+
+
+class _Sweep:
+    """
+    Egy kimeneti változó dobozainak rekurzív söprése.
+    """
+
+    def __init__(self, boxes: List[Region], axes: List[_Axis]):
+        self.boxes = boxes
+        self.axes = axes
+        # full_from[n][d]: az n. doboz a d. dimenziótól kezdve mindent lefed
+        self.full_from: List[List[bool]] = []
+        for box in boxes:
+            flags = [True] * (len(axes) + 1)
+            for d in range(len(axes) - 1, -1, -1):
+                first, last = box[d]
+                domain = axes[d].domain
+                flags[d] = flags[d + 1] and first <= domain[0][0] and last >= domain[-1][1]
+            self.full_from.append(flags)
+        # (mélység, aktív dobozok) -> fedetlen tartományok
+        self.memo: Dict[Tuple[int, FrozenSet[int]], List[Region]] = {}
+
+    def _segments(
+        self,
+        members: List[int],
+        depth: int,
+    ) -> Iterator[Tuple[CellRange, Optional[FrozenSet[int]]]]:
+        """
+        A depth dimenzió tartományának felosztása olyan szakaszokra, ahol az
+        aktív (a szakaszt lefedő) dobozok halmaza állandó. Ha egy aktív doboz
+        a további dimenziókban mindent lefed, a szakasz fedett (None).
+        """
+        domain = self.axes[depth].domain
+        starts: Dict[int, List[int]] = {}
+        stops: Dict[int, List[int]] = {}
+        for n in members:
+            first, last = self.boxes[n][depth]
+            starts.setdefault(first, []).append(n)
+            stops.setdefault(last + 1, []).append(n)
+
+        cuts = set(starts) | set(stops)
+        for first, last in domain:
+            cuts.add(first)
+            cuts.add(last + 1)
+        cuts = sorted(cuts)
+
+        active: set = set()
+        covering = 0
+        for start, stop in zip(cuts, cuts[1:]):
+            for n in stops.get(start, ()):
+                active.discard(n)
+                covering -= self.full_from[n][depth + 1]
+            for n in starts.get(start, ()):
+                active.add(n)
+                covering += self.full_from[n][depth + 1]
+            if not any(first <= start and stop - 1 <= last for first, last in domain):
+                continue
+            yield (start, stop - 1), (None if covering else frozenset(active))
+
+    def uncovered(self, active: FrozenSet[int], depth: int = 0) -> List[Region]:
+        """
+        A depth..végső dimenziókon az aktív dobozok által le nem fedett tartományok.
+        """
+        if not active:
+            regions: List[Region] = [()]
+            for axis in reversed(self.axes[depth:]):
+                regions = [(cells,) + rest for cells in axis.domain for rest in regions]
+            return regions
+
+        key = (depth, active)
+        result = self.memo.get(key)
+        if result is not None:
+            return result
+
+        METRICS.count("coverage_gaps.sweeps")
+        merged: List[Tuple[CellRange, List[Region]]] = []
+        for cells, sub_active in self._segments(sorted(active), depth):
+            sub = [] if sub_active is None else self.uncovered(sub_active, depth + 1)
+            if merged and merged[-1][1] == sub and merged[-1][0][1] + 1 == cells[0]:
+                merged[-1] = ((merged[-1][0][0], cells[1]), sub)
+            else:
+                merged.append((cells, sub))
+
+        result = [(cells,) + rest for cells, sub in merged for rest in sub]
+        self.memo[key] = result
+        return result
+
+
+def uncovered_regions(rule_set: RuleSet, effect_var: Any) -> List[List[str]]:
+    """
+    Az effect_var-t meg nem határozó bemeneti tartományok, tartományonként
+    a feltételek szöveges listájával (üres lista = bármely bemenet).
+    """
+    rule_indices = sorted(
+        {rule_set.assignments[n]["rule"] for n in rule_set.by_effect_var.get(effect_var, [])}
+    )
+    rules = [rule_set.rules[i] for i in rule_indices if _covering(rule_set.rules[i])]
+
+    booleans = {
+        v.name for v in rule_set.variables if v.type == "boolean"
+    }
+    points: Dict[str, List[Numeric]] = {}
+    for rule in rules:
+        for var, (lo, _, hi, _) in rule["intervals"].items():
+            bounds = points.setdefault(var, [])
+            bounds.extend(b for b in (lo, hi) if b not in (-inf, inf))
+
+    axes = [_Axis(var, points[var], var in booleans) for var in sorted(points)]
+    full = (-inf, False, inf, False)
+    boxes: List[Region] = [
+        tuple(axis.cells(rule["intervals"].get(axis.name, full)) for axis in axes)
+        for rule in rules
+    ]
+
+    if not axes:
+        # csak feltétel nélküli szabályok (vagy egy sem)
+        regions: List[Region] = [] if boxes else [()]
+    else:
+        regions = _Sweep(boxes, axes).uncovered(frozenset(range(len(boxes))))
+    return [
+        [text for axis, cells in zip(axes, region) if (text := axis.describe(cells))]
+        for region in regions
+    ]
+
+
+def check(requirements_data: Dict[str, Any] | RuleSet) -> List[str]:
+    """
+    Lefedettségi hézagok minden kimeneti ("=" hatású) változóra.
+
+    Bemenet: nyers requirements dict vagy előre felépített RuleSet.
+
+    Visszatér:
+        list[str] – figyelmeztetések.
+    """
+    rule_set = as_rule_set(requirements_data)
+    messages: List[str] = []
+
+    for effect_var in rule_set.by_effect_var:
+        regions = uncovered_regions(rule_set, effect_var)
+        for conditions in regions[:MAX_REGIONS]:
+            if not conditions:
+                messages.append(
+                    f"A(z) '{effect_var}' változót egyetlen bemenetre sem határozza meg szabály."
+                )
+                continue
+            messages.append(
+                f"A(z) '{effect_var}' változó nincs meghatározva, ha {' és '.join(conditions)}."
+            )
+        if len(regions) > MAX_REGIONS:
+            messages.append(
+                f"A(z) '{effect_var}' változónak további {len(regions) - MAX_REGIONS} "
+                f"lefedetlen tartománya van."
+            )
+
+    return messages
@@ -9,201 +9,421 @@ Cél:
      eltérő értéket adnak átfedő feltételhalmaz mellett.
 
 Heurisztika:
-- Csak numerikus összehasonlító operátorokat (<, <=, >, >=, ==) kezelünk.
+- A numerikus összehasonlító operátorok (<, <=, >, >=, ==) intervallumot
+  adnak; a logikai és szöveges "==" / "=" és a "!=" feltételek diszkrét
+  tartományt (discrete_domains.py). Két szabály csak akkor ütközhet, ha
+  mindkettő teljesülhet egyszerre.
+- Egy csoport rekordjait először egy logikai / szöveges értékre rögzített
+  változó értéke szerint (hash) partícionáljuk: eltérő értékre rögzített
+  rekordokat nem hasonlítunk össze. Csak numerikus feltételeknél a
+  párkeresés eredménye ugyanaz, mint a teljes páronkénti bejárásé.
+- A páros keresés több változót korlátozó szabályoknál a feltételdobozok
+  térbeli indexén megy (box_index.py), egyébként egy tengely menti
+  söpréssel – egyik esetben sem kell minden párt megnézni.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple, Optional
-from math import inf
+import heapq
+from typing import Any, Dict, Iterable, List, Tuple, Optional
 
+from Checking_process import interval_arrays
+from Checking_process.box_index import BoxIndex, boxes_overlap
+from Checking_process.discrete_domains import domain_empty, domains_compatible, pinned_value
+from Checking_process.intervals import Interval, Numeric, interval_empty, intervals_overlap
+from Checking_process.rule_set import RuleSet, as_rule_set
+from Instrumentation.metrics import METRICS
 
-Numeric = float | int
 
+# Ennyi átlagosan korlátozott változótól a csoport párjait térbeli index
+# keresi (box_index.py), alatta egy tengely menti söprés
+INDEX_MIN_VARIABLES = 2
 
-def _build_intervals(causes: List[Dict[str, Any]]) -> Dict[str, Tuple[Numeric, bool, Numeric, bool]]:
+
+def _domains_compatible(r1: Dict[str, Any], r2: Dict[str, Any]) -> bool:
+    if not r1["discrete"] and not r2["discrete"]:
+        return True
+    return domains_compatible(r1["discrete"], r1["intervals"], r2["discrete"], r2["intervals"])
+
+
+def _conflict_possible(r1: Dict[str, Any], r2: Dict[str, Any]) -> bool:
     """
-    Egy szabály Causes listájából intervallumot épít az egyes változókra:
-        var -> (lower, lower_inclusive, upper, upper_inclusive)
+    Két rekord akkor ütközhet, ha eltérő értéket adnak, minden közös
+    változójukon átfednek az intervallumaik (közös változó hiányában is),
+    és a diszkrét feltételeik egyszerre teljesülhetnek.
     """
-    intervals: Dict[str, Tuple[Numeric, bool, Numeric, bool]] = {}
+    if r1["effect_val"] == r2["effect_val"]:
+        # ugyanazt az értéket adják – nem ellentmondás, max. redundáns
+        return False
+    return boxes_overlap(r1["intervals"], r2["intervals"]) and _domains_compatible(r1, r2)
 
-    for c in causes:
-        var = c.get("variable")
-        op = c.get("operator")
-        val = c.get("value")
 
-        if var is None or op is None:
-            continue
-        if not isinstance(val, (int, float)):
-            # csak numerikus értékekkel tudunk dolgozni
+def _sweep_axis(group: List[int], records: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    A csoporton belül a legtöbb rekord által korlátozott változót választja
+    söprési tengelynek (ez szűr a legtöbbet).
+    """
+    counts: Dict[str, int] = {}
+    for idx in group:
+        for var in records[idx]["intervals"]:
+            counts[var] = counts.get(var, 0) + 1
+    if not counts:
+        return None
+    return min(counts, key=lambda v: (-counts[v], v))
+
+
+def _sweep_pairs(
+    records: List[Dict[str, Any]],
+    group: List[int],
+    pairs: List[Tuple[int, int]],
+) -> None:
+    """
+    Egy effect_var csoport ütköző (i, j) párjai (i < j) a pairs listába,
+    söpréssel.
+
+    Egy tengely (változó) mentén söprünk: csak azok a párok kerülnek
+    részletes vizsgálatra, amelyek intervalluma a tengelyen átfed.
+    Akinek nincs feltétele a tengelyen, az a teljes számegyenest lefedi.
+    """
+    axis = _sweep_axis(group, records)
+    unbounded: List[int] = []
+    constrained: List[int] = []
+    bounded: List[Tuple[Numeric, bool, int]] = []
+    for idx in group:
+        iv = records[idx]["intervals"].get(axis) if axis is not None else None
+        if iv is None:
+            unbounded.append(idx)
             continue
+        constrained.append(idx)
+        if not interval_empty(iv):
+            # üres intervallum egy másik, ugyanitt korlátozott
+            # intervallummal sem fedhet át
+            bounded.append((iv[0], not iv[1], idx))
+
+    # a tengelyen korlátlan rekordok mindenkivel átfednek a tengelyen
+    for a_pos, a in enumerate(unbounded):
+        for b in unbounded[a_pos + 1:]:
+            if _conflict_possible(records[a], records[b]):
+                pairs.append((a, b) if a < b else (b, a))
+        for b in constrained:
+            if _conflict_possible(records[a], records[b]):
+                pairs.append((a, b) if a < b else (b, a))
+
+    # söprés az alsó határ szerint; zárt alsó határ előrébb
+    bounded.sort()
+    active: Dict[int, Interval] = {}
+    ends: List[Tuple[Numeric, int]] = []
+    candidates = 0
+    for lo, _, idx in bounded:
+        # kidobjuk azokat, amelyek egy későbbi intervallummal sem fedhetnek át
+        while ends and ends[0][0] <= lo:
+            hi, old = heapq.heappop(ends)
+            old_iv = active[old]
+            if hi < lo or not old_iv[3]:
+                del active[old]
+            else:
+                # hi == lo és zárt felső határ – még átfedhet
+                heapq.heappush(ends, (hi, old))
+                break
+
+        iv = records[idx]["intervals"][axis]
+        candidates += len(active)
+        for other, other_iv in active.items():
+            if not intervals_overlap(iv, other_iv):
+                continue
+            if _conflict_possible(records[other], records[idx]):
+                pairs.append((other, idx) if other < idx else (idx, other))
 
-        current = intervals.get(var, (-inf, False, inf, False))
-        lo, lo_inc, hi, hi_inc = current
-
-        if op == ">":
-            if val > lo or (val == lo and lo_inc):
-                lo, lo_inc = val, False
-        elif op == ">=":
-            if val > lo or (val == lo and not lo_inc):
-                lo, lo_inc = val, True
-        elif op == "<":
-            if val < hi or (val == hi and hi_inc):
-                hi, hi_inc = val, False
-        elif op == "<=":
-            if val < hi or (val == hi and not hi_inc):
-                hi, hi_inc = val, True
-        elif op == "==":
-            # pontos érték – szűkítjük mindkét oldalról
-            lo, lo_inc = val, True
-            hi, hi_inc = val, True
-
-        intervals[var] = (lo, lo_inc, hi, hi_inc)
-
-    return intervals
-
-
-def _interval_empty(interval: Tuple[Numeric, bool, Numeric, bool]) -> bool:
-    lo, lo_inc, hi, hi_inc = interval
-    if lo > hi:
-        return True
-    if lo == hi and (not lo_inc or not hi_inc):
-        return True
-    return False
-
-
-def _intervals_overlap(
-    i1: Tuple[Numeric, bool, Numeric, bool],
-    i2: Tuple[Numeric, bool, Numeric, bool],
-) -> bool:
-    lo1, lo1_inc, hi1, hi1_inc = i1
-    lo2, lo2_inc, hi2, hi2_inc = i2
-
-    # alsó határ maximuma
-    if lo1 > lo2:
-        lo = lo1
-        lo_inc = lo1_inc
-    elif lo2 > lo1:
-        lo = lo2
-        lo_inc = lo2_inc
-    else:
-        lo = lo1
-        lo_inc = lo1_inc and lo2_inc
-
-    # felső határ minimuma
-    if hi1 < hi2:
-        hi = hi1
-        hi_inc = hi1_inc
-    elif hi2 < hi1:
-        hi = hi2
-        hi_inc = hi2_inc
+        active[idx] = iv
+        heapq.heappush(ends, (iv[2], idx))
+
+    # a tengelyen korlátlanok párjai + a söprés aktív halmazából vizsgált párok
+    n_unbounded = len(unbounded)
+    METRICS.count(
+        "logical_exclusions.pair_checks",
+        n_unbounded * (n_unbounded - 1) // 2 + n_unbounded * len(constrained) + candidates,
+    )
+
+
+def _index_pairs(
+    records: List[Dict[str, Any]],
+    group: List[int],
+    pairs: List[Tuple[int, int]],
+) -> None:
+    """
+    Egy effect_var csoport ütköző (i, j) párjai (i < j) a pairs listába,
+    térbeli indexszel (box_index.py).
+
+    Rekordonként egy metszési lekérdezés adja a vele minden közös változón
+    átfedő, későbbi rekordokat – csak ezeknél kell az értékeket összevetni.
+    """
+    index = BoxIndex({idx: records[idx]["intervals"] for idx in group})
+    candidates = 0
+    for idx in group:
+        rec = records[idx]
+        overlapping = index.intersecting(rec["intervals"], after=idx)
+        candidates += len(overlapping)
+        for other in overlapping:
+            if rec["effect_val"] != records[other]["effect_val"] and _domains_compatible(rec, records[other]):
+                pairs.append((idx, other))
+
+    # csak a minden közös változón átfedő párok kerülnek értékvizsgálatra
+    METRICS.count("logical_exclusions.pair_checks", candidates)
+
+
+def _cross_pairs(
+    records: List[Dict[str, Any]],
+    free: List[int],
+    pinned: List[int],
+    pairs: List[Tuple[int, int]],
+) -> None:
+    """
+    A partíció változóján nem rögzített (free) és rögzített (pinned)
+    rekordok ütköző párjai a pairs listába, térbeli indexszel.
+
+    A nagyobb oldalra épül index, a kisebb oldal rekordjai kérdeznek.
+    """
+    if not free or not pinned:
+        return
+    indexed, queries = (free, pinned) if len(free) >= len(pinned) else (pinned, free)
+    index = BoxIndex({idx: records[idx]["intervals"] for idx in indexed})
+    candidates = 0
+    for idx in queries:
+        rec = records[idx]
+        overlapping = index.intersecting(rec["intervals"])
+        candidates += len(overlapping)
+        for other in overlapping:
+            if rec["effect_val"] != records[other]["effect_val"] and _domains_compatible(rec, records[other]):
+                pairs.append((idx, other) if idx < other else (other, idx))
+
+    METRICS.count("logical_exclusions.pair_checks", candidates)
+
+
+def _partition_var(records: List[Dict[str, Any]], group: List[int]) -> Optional[str]:
+    """
+    A partícionálás változója: amelyet a legtöbb rekord rögzít egy
+    értékre, legalább két eltérő értékkel. None: nincs ilyen.
+    """
+    counts: Dict[str, int] = {}
+    values: Dict[str, set] = {}
+    for idx in group:
+        for var, domain in records[idx]["discrete"].items():
+            is_pinned, value = pinned_value(domain)
+            if is_pinned:
+                counts[var] = counts.get(var, 0) + 1
+                values.setdefault(var, set()).add(value)
+    candidates = [var for var in counts if len(values[var]) > 1]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda v: (-counts[v], v))
+
+
+def _leaf_pairs(
+    records: List[Dict[str, Any]],
+    group: List[int],
+    pairs: List[Tuple[int, int]],
+    backend: str,
+) -> None:
+    """
+    Partícionálás nélkül: söprés, térbeli index vagy a numpy backend.
+
+    Ha a rekordok átlagosan legalább INDEX_MIN_VARIABLES változót
+    korlátoznak, a térbeli index szűr jobban (több tengely egyszerre);
+    egyébként az egy tengely menti söprés olcsóbb.
+    """
+    if len(group) < 2:
+        return
+    if backend == "numpy":
+        start = len(pairs)
+        if interval_arrays.group_pairs(records, group, pairs):
+            # a tömbös út csak az intervallumokat és az értékeket nézi
+            pairs[start:] = [(i, j) for i, j in pairs[start:] if _domains_compatible(records[i], records[j])]
+            return
+    constrained = sum(len(records[idx]["intervals"]) for idx in group)
+    if constrained >= INDEX_MIN_VARIABLES * len(group):
+        _index_pairs(records, group, pairs)
     else:
-        hi = hi1
-        hi_inc = hi1_inc and hi2_inc
+        _sweep_pairs(records, group, pairs)
 
-    if lo < hi:
-        return True
-    if lo == hi and lo_inc and hi_inc:
-        return True
-    return False
 
+def _partitioned_pairs(
+    records: List[Dict[str, Any]],
+    group: List[int],
+    pairs: List[Tuple[int, int]],
+    backend: str,
+) -> None:
+    """
+    Hash-partícionálás egy rögzített értékű változó szerint: az azonos
+    értékű rekordok csoportjai és a változón nem rögzítettek csoportja
+    külön (rekurzívan) megy, utóbbiak a rögzítettekkel még _cross_pairs
+    szerint. Eltérő értékű partíciók rekordjai sosem kerülnek össze.
+    """
+    if len(group) < 2:
+        return
+    var = _partition_var(records, group)
+    if var is None:
+        _leaf_pairs(records, group, pairs, backend)
+        return
+
+    buckets: Dict[Any, List[int]] = {}
+    free: List[int] = []
+    for idx in group:
+        domain = records[idx]["discrete"].get(var)
+        is_pinned, value = pinned_value(domain) if domain is not None else (False, None)
+        if is_pinned:
+            buckets.setdefault(value, []).append(idx)
+        else:
+            free.append(idx)
+    METRICS.count("logical_exclusions.partitions", len(buckets))
+
+    for bucket in buckets.values():
+        _partitioned_pairs(records, bucket, pairs, backend)
+    _partitioned_pairs(records, free, pairs, backend)
+    _cross_pairs(records, free, [idx for bucket in buckets.values() for idx in bucket], pairs)
+
+
+def _group_pairs(
+    records: List[Dict[str, Any]],
+    group: List[int],
+    pairs: List[Tuple[int, int]],
+    backend: str = "python",
+) -> None:
+    """
+    Egy effect_var csoport ütköző (i, j) párjai (i < j) a pairs listába.
 
-def _iter_rules_with_effects(data: Dict[str, Any]):
+    A diszkrét feltételeik miatt sosem teljesülő rekordok kimaradnak, a
+    többit _partitioned_pairs dolgozza fel.
     """
-    Visszaadja az összes (rule, effect) párost, ahol effect.operator "=".
-    Csak azokat nézzük, amelyeknek van Causes listájuk is.
+    if len(group) < 2:
+        return
+    if any(records[idx]["discrete"] for idx in group):
+        group = [
+            idx for idx in group
+            if not domain_empty(records[idx]["discrete"], records[idx]["intervals"])
+        ]
+    _partitioned_pairs(records, group, pairs, backend)
+
+
+def _find_conflicting_pairs(
+    records: List[Dict[str, Any]],
+    groups: Dict[Any, List[int]],
+    backend: str = "python",
+) -> List[Tuple[int, int]]:
     """
-    for rule in data.get("inputs", []):
-        causes = rule.get("Causes", [])
-        for eff in rule.get("effects", []):
-            if eff.get("operator") == "=":
-                yield rule, causes, eff
+    Ütköző (i, j) indexpárok, i < j, ugyanabban a sorrendben, mint a
+    teljes páronkénti bejárásnál.
+
+    A rekordok effect_var szerinti csoportjait (groups) külön nézzük –
+    más kimeneti változóra vonatkozó párokat meg sem nézünk.
+
+    backend:
+        "python" – söprés vagy térbeli index tuple-intervallumokon (_leaf_pairs)
+        "numpy"  – tömbös, blokkonkénti átfedésszámítás (interval_arrays.py);
+                   amit az nem tud pontosan kezelni, az a python úton megy
+    """
+    if backend not in ("python", "numpy"):
+        raise ValueError(f"Ismeretlen backend: {backend}")
+
+    pairs: List[Tuple[int, int]] = []
+    METRICS.count("logical_exclusions.groups", len(groups))
+    for group in groups.values():
+        _group_pairs(records, group, pairs, backend)
 
-    for rule in data.get("outputs", []):
-        causes = rule.get("Causes", [])
-        # új struktúra: "rules"
-        for eff in rule.get("rules", []):
-            if eff.get("operator") == "=":
-                yield rule, causes, eff
-        # kompatibilitás kedvéért:
-        for eff in rule.get("effects", []):
-            if eff.get("operator") == "=":
-                yield rule, causes, eff
+    pairs.sort()
+    return pairs
 
 
-def check(requirements_data: Dict[str, Any]) -> List[str]:
+def conflicting_pairs(
+    rule_set: RuleSet,
+    effect_vars: Optional[List[Any]] = None,
+    backend: str = "python",
+) -> List[Tuple[int, int]]:
     """
-    Kétféle problémát keres:
-      - önellentmondó feltétel egy szabályon belül,
-      - két szabály, amely ugyanarra a változóra eltérő értéket adhat
-        átfedő feltételek mellett.
+    A rule_set.assignments ütköző indexpárjai rendezve. Ha effect_vars meg
+    van adva, csak ezeknek a kimeneti változóknak a csoportjait nézzük –
+    így a munka kimeneti változók szerint szétosztható (shard).
+    """
+    groups = rule_set.by_effect_var
+    if effect_vars is not None:
+        groups = {var: groups[var] for var in effect_vars if var in groups}
+    return _find_conflicting_pairs(rule_set.assignments, groups, backend)
 
-    Visszatér:
-        list[str] – figyelmeztetések.
+
+def conflicting_pairs_for(rule_set: RuleSet, indices: Iterable[int]) -> List[Tuple[int, int]]:
     """
-    messages: List[str] = []
+    Csak azok az ütköző párok, amelyekben legalább az egyik assignment
+    index az indices között van (pl. egy módosított szabály hatásai).
+    Költsége a megadott elemek csoportméretével arányos.
+    """
+    records = rule_set.assignments
+    selected = set(indices)
+    pairs = set()
+    for i in selected:
+        group = rule_set.by_effect_var[records[i]["effect_var"]]
+        METRICS.count("logical_exclusions.pair_checks", len(group) - 1)
+        for j in group:
+            if j == i or (j in selected and j < i):
+                # önmaga, illetve a mindkét oldalon kiválasztott párt egyszer nézzük
+                continue
+            if _conflict_possible(records[i], records[j]):
+                pairs.add((i, j) if i < j else (j, i))
+    return sorted(pairs)
+
 
-    # 1) önellentmondó feltételek
-    for rule in requirements_data.get("inputs", []):
-        rid = rule.get("id", "<no-id>")
-        intervals = _build_intervals(rule.get("Causes", []))
-        for var, iv in intervals.items():
-            if _interval_empty(iv):
+def empty_interval_messages(rule_set: RuleSet) -> List[str]:
+    """
+    Önellentmondó feltételek egy szabályon belül (csak az inputs szabályain).
+    """
+    messages: List[str] = []
+    for idx in rule_set.input_rules:
+        rule = rule_set.rules[idx]
+        for var, iv in rule["intervals"].items():
+            if interval_empty(iv):
                 messages.append(
-                    f"Szabály {rid}: a(z) '{var}' változóra vonatkozó feltételek "
+                    f"Szabály {rule['id']}: a(z) '{var}' változóra vonatkozó feltételek "
                     f"ellentmondásos intervallumot adnak (üres metszet)."
                 )
+        for var in domain_empty(rule["discrete"], rule["intervals"]):
+            if var in rule["intervals"] and interval_empty(rule["intervals"][var]):
+                continue
+            messages.append(
+                f"Szabály {rule['id']}: a(z) '{var}' változóra vonatkozó feltételek "
+                f"egyszerre nem teljesülhetnek (kizáró értékek)."
+            )
+    return messages
 
-    # 2) szabály-párok közti konfliktusok
-    records = []
-    for rule, causes, eff in _iter_rules_with_effects(requirements_data):
-        rid = rule.get("id", "<no-id>")
-        eff_var = eff.get("variable")
-        eff_val = eff.get("value")
-        if eff_var is None:
-            continue
-        records.append(
-            {
-                "id": rid,
-                "effect_var": eff_var,
-                "effect_val": eff_val,
-                "intervals": _build_intervals(causes),
-            }
-        )
 
-    for i in range(len(records)):
-        for j in range(i + 1, len(records)):
-            r1 = records[i]
-            r2 = records[j]
-            if r1["effect_var"] != r2["effect_var"]:
-                continue
-            if r1["effect_val"] == r2["effect_val"]:
-                # ugyanazt az értéket adják – nem ellentmondás, max. redundáns
-                continue
+def pair_messages(rule_set: RuleSet, pairs: Iterable[Tuple[int, int]]) -> List[str]:
+    """
+    Az ütköző indexpárokból emberi olvasásra alkalmas üzenetek.
+    """
+    records = rule_set.assignments
+    messages: List[str] = []
+    for i, j in pairs:
+        r1 = records[i]
+        r2 = records[j]
+        messages.append(
+            f"Szabály {r1['id']} és {r2['id']} ugyanarra a '{r1['effect_var']}' "
+            f"változóra eltérő értéket adnak ({r1['effect_val']} vs {r2['effect_val']}) "
+            f"átfedő feltételek mellett."
+        )
+    return messages
 
-            iv1 = r1["intervals"]
-            iv2 = r2["intervals"]
 
-            shared_vars = set(iv1.keys()) & set(iv2.keys())
+def check(requirements_data: Dict[str, Any] | RuleSet, backend: str = "python") -> List[str]:
+    """
+    Kétféle problémát keres:
+      - önellentmondó feltétel egy szabályon belül,
+      - két szabály, amely ugyanarra a változóra eltérő értéket adhat
+        átfedő feltételek mellett.
 
-            conflict_possible = False
-            if not shared_vars:
-                # nincs közös numerikus feltétel – potenciálisan egyszerre is igazak lehetnek
-                conflict_possible = True
-            else:
-                # minden közös változóra legyen átfedés az intervallumok között
-                conflict_possible = True
-                for v in shared_vars:
-                    if not _intervals_overlap(iv1[v], iv2[v]):
-                        conflict_possible = False
-                        break
-
-            if conflict_possible:
-                messages.append(
-                    f"Szabály {r1['id']} és {r2['id']} ugyanarra a '{r1['effect_var']}' "
-                    f"változóra eltérő értéket adnak ({r1['effect_val']} vs {r2['effect_val']}) "
-                    f"átfedő feltételek mellett."
-                )
+    Bemenet: nyers requirements dict vagy előre felépített RuleSet.
+    backend: "python" (alapértelmezett) vagy "numpy" (lásd interval_arrays.py).
 
+    Visszatér:
+        list[str] – figyelmeztetések.
+    """
+    rule_set = as_rule_set(requirements_data)
+    messages = empty_interval_messages(rule_set)
+    messages.extend(pair_messages(rule_set, conflicting_pairs(rule_set, backend=backend)))
     return messages
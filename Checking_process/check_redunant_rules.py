@@ -5,83 +5,324 @@ Cél:
 - Olyan szabályokat találni, amelyek pontosan ugyanazokat a feltételeket
   és pontosan ugyanazokat a hatásokat tartalmazzák, azaz duplikált /
   redundáns szabályok.
+- Olyan szabályokat találni, amelyeket egy másik, azonos hatású szabály
+  lefed: a feltételei szűkebbek (vagy ekvivalensek), tehát valahányszor
+  teljesülnek, a másik szabály is ugyanazt váltja ki (subsumption).
 
 Heurisztika:
 - Minden szabályhoz (inputs + outputs) készül egy 'signature'
   (rendezett Causes + rendezett effects/rules).
 - Ha ugyanaz a signature több szabályhoz tartozik, az ismétlés.
+- Lefedés: azonos hatás-signature-ű szabályok között, változónkénti
+  intervallum-tartalmazással. A numerikus intervallumba nem fordítható
+  feltételeknek (pl. string érték, ismeretlen operátor) a tágabb
+  szabályban szó szerint szerepelniük kell a szűkebbben is.
+
+Működés (lefedés):
+- A hatás-signature csoportokon belül a szabályokat a korlátozott
+  változóik halmaza szerint vödrökbe tesszük. B csak akkor fedheti le A-t,
+  ha B változóhalmaza része A-énak.
+- Egy vödörben egy tengelyváltozó alsó határa szerint rendezünk, a felső
+  határokra maximum-fát építünk: az A-t a tengelyen tartalmazó jelöltek
+  (alsó határ <= A alsó határa, felső határ >= A felső határa) így
+  logaritmikus lépésekben, sorban kerülnek elő – nem kell minden párt
+  összehasonlítani.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from bisect import bisect_right
+from math import inf
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
 
+from Checking_process.intervals import Interval, Numeric, interval_empty
+from Checking_process.rule_model import Condition
+from Checking_process.rule_set import RuleSet, as_rule_set, normalize_condition
+from Instrumentation.metrics import METRICS
 
-def _normalize_condition(cond: Dict[str, Any]) -> Tuple[str, str, str]:
-    return (
-        str(cond.get("variable")),
-        str(cond.get("operator")),
-        str(cond.get("value")),
-    )
 
+# Az intervallumba fordított (build_intervals által kezelt) operátorok
+_INTERVAL_OPERATORS = (">", ">=", "<", "<=", "==")
+
+_FULL_INTERVAL: Interval = (-inf, False, inf, False)
+
+# Rendezhető határ-kulcsok: kisebb alsó kulcs = gyengébb alsó határ,
+# nagyobb felső kulcs = gyengébb felső határ
+BoundKey = Tuple[Numeric, int]
+
+
+def _lower_key(interval: Interval) -> BoundKey:
+    lo, lo_inc, _, _ = interval
+    return (lo, 0 if lo_inc else 1)
+
+
+def _upper_key(interval: Interval) -> BoundKey:
+    _, _, hi, hi_inc = interval
+    return (hi, 1 if hi_inc else 0)
+
+
+class _Box:
+    """
+    Egy szabály feltételdoboza a lefedés-kereséshez.
+    """
+
+    __slots__ = ("index", "lower", "upper", "variables", "residual")
+
+    def __init__(self, index: int, rule: Dict[str, Any]):
+        self.index = index
+        self.lower: Dict[str, BoundKey] = {}
+        self.upper: Dict[str, BoundKey] = {}
+        for var, interval in rule["intervals"].items():
+            if interval == _FULL_INTERVAL:
+                continue
+            self.lower[var] = _lower_key(interval)
+            self.upper[var] = _upper_key(interval)
+        self.variables: FrozenSet[str] = frozenset(self.lower)
+        self.residual = frozenset(
+            normalize_condition(c)
+            for c in rule["causes"]
+            if not _interval_condition(c)
+        )
 
-def _normalize_effect(eff: Dict[str, Any]) -> Tuple[str, str, str]:
-    # 'value' vagy 'expression', esetleg más – mindent stringgé alakítunk
-    val = eff.get("value")
-    if val is None and "expression" in eff:
-        val = eff.get("expression")
+    def contains(self, other: "_Box") -> bool:
+        """
+        Igaz, ha other minden pontja self-ben is benne van.
+        """
+        if not self.residual <= other.residual:
+            return False
+        for var, lower in self.lower.items():
+            if lower > other.lower[var] or self.upper[var] < other.upper[var]:
+                return False
+        return True
+
+
+def _interval_condition(cond: Condition) -> bool:
     return (
-        str(eff.get("variable")),
-        str(eff.get("operator")),
-        str(val),
+        cond.variable is not None
+        and cond.operator in _INTERVAL_OPERATORS
+        and isinstance(cond.value, (int, float))
     )
 
 
-def _iter_all_rules(data: Dict[str, Any]):
+class _MaxTree:
     """
-    Visszaadja az összes szabályobjektumot, egységesített 'effects' listával.
+    Maximum-fa a felső határ-kulcsokon: egy prefixben sorban előkeresi
+    azokat a pozíciókat, ahol a kulcs legalább egy adott érték.
     """
-    for rule in data.get("inputs", []):
-        effects = rule.get("effects", [])
-        yield rule, rule.get("Causes", []), effects
 
-    for rule in data.get("outputs", []):
-        causes = rule.get("Causes", [])
-        effects = []
-        if "rules" in rule:
-            effects.extend(rule.get("rules", []))
-        if "effects" in rule:
-            effects.extend(rule.get("effects", []))
-        yield rule, causes, effects
+    def __init__(self, values: List[BoundKey]):
+        size = 1
+        while size < len(values):
+            size *= 2
+        self.size = size
+        self.tree: List[Any] = [None] * (2 * size)
+        self.tree[size:size + len(values)] = values
+        for node in range(size - 1, 0, -1):
+            left, right = self.tree[2 * node], self.tree[2 * node + 1]
+            if right is None or (left is not None and left >= right):
+                self.tree[node] = left
+            else:
+                self.tree[node] = right
 
+    def iter_at_least(self, limit: BoundKey, stop: int) -> Iterator[int]:
+        """
+        A [0, stop) pozíciók közül azok, ahol az érték >= limit, növekvő sorrendben.
+        """
+        stack = [(1, 0, self.size)]
+        while stack:
+            node, start, end = stack.pop()
+            if start >= stop:
+                continue
+            best = self.tree[node]
+            if best is None or best < limit:
+                continue
+            if end - start == 1:
+                yield start
+                continue
+            mid = (start + end) // 2
+            stack.append((2 * node + 1, mid, end))
+            stack.append((2 * node, start, mid))
 
-def check(requirements_data: Dict[str, Any]) -> List[str]:
+
+class _Bucket:
+    """
+    Azonos változóhalmazú dobozok, tengely szerinti kereséshez előkészítve.
     """
-    Redundáns (duplikált) szabályok keresése.
 
-    Visszatér:
-        list[str] – figyelmeztetések.
+    def __init__(self, variables: FrozenSet[str], boxes: List[_Box]):
+        self.variables = variables
+        self.axis = _bucket_axis(variables, boxes)
+        if self.axis is None:
+            self.boxes = boxes
+            return
+        self.boxes = sorted(boxes, key=lambda b: b.lower[self.axis])
+        self.lowers = [b.lower[self.axis] for b in self.boxes]
+        self.tree = _MaxTree([b.upper[self.axis] for b in self.boxes])
+
+    def candidates(self, box: _Box) -> Iterator[_Box]:
+        """
+        A vödör azon dobozai, amelyek a tengelyen tartalmazzák box-ot.
+        """
+        if self.axis is None:
+            # feltétel nélküli dobozok: mindent tartalmaznak
+            yield from self.boxes
+            return
+        stop = bisect_right(self.lowers, box.lower[self.axis])
+        for pos in self.tree.iter_at_least(box.upper[self.axis], stop):
+            yield self.boxes[pos]
+
+
+def _bucket_axis(variables: FrozenSet[str], boxes: List[_Box]) -> Optional[str]:
     """
-    signature_map: Dict[Tuple, str] = {}
-    redundant_ids: List[str] = []
+    A legtöbb különböző alsó határt adó változó (ez szűr a legjobban).
+    """
+    if not variables:
+        return None
+    return min(
+        variables,
+        key=lambda v: (-len({b.lower[v] for b in boxes}), v),
+    )
 
-    for rule, causes, effects in _iter_all_rules(requirements_data):
-        rid = rule.get("id", "<no-id>")
 
-        conds_sig = tuple(sorted(_normalize_condition(c) for c in causes))
-        effs_sig = tuple(sorted(_normalize_effect(e) for e in effects))
-        signature = (conds_sig, effs_sig)
+def _group_subsumptions(
+    rule_set: RuleSet,
+    group: List[int],
+    found: List[Tuple[int, int, bool]],
+) -> None:
+    boxes: List[_Box] = []
+    for idx in group:
+        rule = rule_set.rules[idx]
+        if any(interval_empty(iv) for iv in rule["intervals"].values()):
+            # kielégíthetetlen feltétel – azt a logikai kizárások jelzik
+            continue
+        boxes.append(_Box(idx, rule))
+    if len(boxes) < 2:
+        return
 
-        if signature in signature_map:
-            first_id = signature_map[signature]
-            redundant_ids.append((rid, first_id))
-        else:
-            signature_map[signature] = rid
+    by_variables: Dict[FrozenSet[str], List[_Box]] = {}
+    for box in boxes:
+        by_variables.setdefault(box.variables, []).append(box)
+    buckets = [_Bucket(variables, members) for variables, members in by_variables.items()]
+
+    for box in boxes:
+        witness = _find_witness(box, buckets)
+        if witness is not None:
+            found.append(witness)
 
+
+def _find_witness(box: _Box, buckets: List[_Bucket]) -> Optional[Tuple[int, int, bool]]:
+    """
+    Az első szabály, amely box-ot lefedi: (box, lefedő, ekvivalens-e).
+    Ekvivalens feltételeknél csak a korábbi szabály lehet a lefedő.
+    """
+    for bucket in buckets:
+        if not bucket.variables <= box.variables:
+            continue
+        for other in bucket.candidates(box):
+            METRICS.count("redundant_rules.containment_checks")
+            if other is box or not other.contains(box):
+                continue
+            equivalent = other.variables == box.variables and box.contains(other)
+            if equivalent and other.index > box.index:
+                continue
+            return box.index, other.index, equivalent
+    return None
+
+
+def effect_groups(rule_set: RuleSet) -> Iterator[Tuple[Tuple, List[int]]]:
+    """
+    (hatás-signature, szabály indexek) a lefedés-kereséshez: csak a
+    hatással rendelkező csoportok, signature-önként az első (eredeti)
+    szabállyal, és csak ahol legalább két ilyen van.
+    """
+    for effects, group in rule_set.by_effects.items():
+        if not effects:
+            # hatás nélküli szabály nem lehet redundáns a fenti értelemben
+            continue
+        originals = [
+            idx for idx in group
+            if rule_set.by_signature[rule_set.rules[idx]["signature"]][0] == idx
+        ]
+        if len(originals) >= 2:
+            yield effects, originals
+
+
+def group_subsumptions(rule_set: RuleSet, group: List[int]) -> List[Tuple[int, int, bool]]:
+    """
+    Egy effect_groups() csoport lefedett szabályai – csak a csoport
+    szabályaitól (és azok sorrendjétől) függ, így csoportonként
+    újrahasznosítható (lásd check_cache.py).
+    """
+    found: List[Tuple[int, int, bool]] = []
+    _group_subsumptions(rule_set, group, found)
+    return found
+
+
+def subsumed_rules(rule_set: RuleSet) -> List[Tuple[int, int, bool]]:
+    """
+    Lefedett szabályok: (szabály index, lefedő szabály index, ekvivalens-e),
+    a szabályok sorrendjében. A pontos (signature szerinti) ismétlések
+    nem szerepelnek, azokat a check() külön jelzi.
+    """
+    found: List[Tuple[int, int, bool]] = []
+    for _, group in effect_groups(rule_set):
+        _group_subsumptions(rule_set, group, found)
+    found.sort()
+    return found
+
+
+def duplicate_messages(rule_set: RuleSet) -> List[str]:
+    """
+    A pontos (signature szerinti) ismétlések üzenetei.
+    """
     messages: List[str] = []
-    for rid, first_id in redundant_ids:
+    METRICS.count("redundant_rules.signature_lookups", len(rule_set.rules))
+    for rule in rule_set.rules:
+        # a signature-index első eleme az "eredeti" szabály
+        first = rule_set.rules[rule_set.by_signature[rule["signature"]][0]]
+        if first is rule:
+            continue
         messages.append(
-            f"Szabály {rid} redundáns: logikailag megegyezik a(z) {first_id} szabállyal."
+            f"Szabály {rule['id']} redundáns: logikailag megegyezik a(z) {first['id']} szabállyal."
         )
+    return messages
 
+
+def subsumption_messages(
+    rule_set: RuleSet,
+    subsumptions: Iterable[Tuple[int, int, bool]],
+) -> List[str]:
+    """
+    A lefedett szabályokból (subsumed_rules) emberi olvasásra alkalmas üzenetek.
+    """
+    messages: List[str] = []
+    for idx, other, equivalent in subsumptions:
+        rule_id = rule_set.rules[idx]["id"]
+        other_id = rule_set.rules[other]["id"]
+        if equivalent:
+            messages.append(
+                f"Szabály {rule_id} redundáns: feltételei ekvivalensek a(z) "
+                f"{other_id} szabályéval, a hatásaik azonosak."
+            )
+        else:
+            messages.append(
+                f"Szabály {rule_id} redundáns: a(z) {other_id} szabály ugyanezeket "
+                f"a hatásokat tágabb feltételek mellett is kiváltja."
+            )
+    return messages
+
+
+def check(requirements_data: Dict[str, Any] | RuleSet) -> List[str]:
+    """
+    Redundáns (duplikált vagy lefedett) szabályok keresése.
+
+    Bemenet: nyers requirements dict vagy előre felépített RuleSet.
+
+    Visszatér:
+        list[str] – figyelmeztetések (előbb a pontos ismétlések, majd a
+        lefedett szabályok).
+    """
+    rule_set = as_rule_set(requirements_data)
+    messages = duplicate_messages(rule_set)
+    messages.extend(subsumption_messages(rule_set, subsumed_rules(rule_set)))
     return messages
@@ -0,0 +1,149 @@
+"""
+discrete_domains.py
+
+Cél:
+- A nem intervallummal leírható feltételek (logikai és szöveges értékek,
+  "!=") kezelése a páros ellenőrzéseknél: ezek nélkül két szabály, amely
+  pl. is_regular_customer == true és == false mellett ad értéket, "nincs
+  közös változójuk" alapon átfedőnek látszik.
+
+Egy változó diszkrét tartománya:
+    (pinned, excluded)
+    pinned   – a logikai / szöveges "==" / "=" feltételek értékei (egynél
+               több eltérő: üres)
+    excluded – a "!=" feltételek értékei
+
+Heurisztika:
+- A szemantika a kiértékelőé (rule_compiler.py): a None érték és a nem
+  hash-elhető érték feltételét kihagyjuk, szöveges érték numerikus
+  intervallumba nem eshet bele.
+- Csak a logikai és szöveges "==" / "=" értéket rögzítjük. A numerikus
+  "==" az intervallumok dolga (intervals.build_intervals), így a csak
+  numerikus feltételű szabálykészlet eredménye ugyanaz marad, mint az
+  intervallum-alapú ellenőrzésé: ott sem partícionálunk, sem szabályt
+  nem hagyunk ki.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from Checking_process.intervals import Interval
+
+
+Discrete = Tuple[FrozenSet[Any], FrozenSet[Any]]
+
+# A változónak nincs diszkrét feltétele
+NO_DOMAIN: Discrete = (frozenset(), frozenset())
+
+
+def build_discrete(causes: Iterable[Any]) -> Dict[str, Discrete]:
+    """
+    Egy szabály feltételeiből (rule_model.Condition) változónként a
+    diszkrét tartomány:
+        var -> (pinned, excluded)
+    """
+    pinned: Dict[str, set] = {}
+    excluded: Dict[str, set] = {}
+
+    for c in causes:
+        var = c.variable
+        op = c.operator
+        val = c.value
+
+        if var is None or val is None:
+            continue
+        try:
+            hash(val)
+        except TypeError:
+            continue
+
+        if op in ("==", "="):
+            if isinstance(val, (int, float)) and not isinstance(val, bool):
+                # numerikus érték – csak intervallumként számít
+                continue
+            pinned.setdefault(var, set()).add(val)
+        elif op == "!=":
+            excluded.setdefault(var, set()).add(val)
+
+    return {
+        var: (frozenset(pinned.get(var, ())), frozenset(excluded.get(var, ())))
+        for var in (*pinned, *(v for v in excluded if v not in pinned))
+    }
+
+
+def pinned_value(domain: Discrete) -> Tuple[bool, Any]:
+    """
+    (True, érték), ha a tartomány pontosan egy értékre rögzített.
+    """
+    pinned = domain[0]
+    if len(pinned) != 1:
+        return False, None
+    return True, next(iter(pinned))
+
+
+def _fits(value: Any, interval: Interval) -> bool:
+    if not isinstance(value, (int, float)):
+        return False
+    lo, lo_inc, hi, hi_inc = interval
+    return (lo < value or (lo == value and lo_inc)) and (value < hi or (value == hi and hi_inc))
+
+
+def _variable_empty(
+    pinned: FrozenSet[Any],
+    excluded: FrozenSet[Any],
+    intervals: List[Interval],
+) -> bool:
+    """
+    A feltételek együtt üresek-e egy változón. Az intervallumok egymás
+    közti átfedését nem nézi – az intervals_overlap dolga.
+    """
+    if len(pinned) > 1:
+        return True
+    if pinned:
+        if pinned & excluded:
+            return True
+        value = next(iter(pinned))
+        return not all(_fits(value, interval) for interval in intervals)
+    if excluded and intervals:
+        # több intervallum közös része akkor pont, ha a határok egybeesnek
+        lo = max(interval[0] for interval in intervals)
+        hi = min(interval[2] for interval in intervals)
+        return lo == hi and lo in excluded
+    return False
+
+
+def domain_empty(discrete: Dict[str, Discrete], intervals: Dict[str, Interval]) -> List[str]:
+    """
+    Azok a változók, amelyeken egyetlen szabály diszkrét feltételei nem
+    teljesülhetnek (az intervallumaival együtt sem).
+    """
+    empty: List[str] = []
+    for var, (pinned, excluded) in discrete.items():
+        interval = intervals.get(var)
+        if _variable_empty(pinned, excluded, [interval] if interval is not None else []):
+            empty.append(var)
+    return empty
+
+
+def domains_compatible(
+    discrete1: Dict[str, Discrete],
+    intervals1: Dict[str, Interval],
+    discrete2: Dict[str, Discrete],
+    intervals2: Dict[str, Interval],
+) -> bool:
+    """
+    Teljesülhet-e egyszerre két szabály összes diszkrét feltétele (a
+    másik szabály intervallumaival együtt).
+    """
+    for var in discrete1.keys() | discrete2.keys():
+        pinned1, excluded1 = discrete1.get(var, NO_DOMAIN)
+        pinned2, excluded2 = discrete2.get(var, NO_DOMAIN)
+        intervals: List[Interval] = []
+        for source in (intervals1, intervals2):
+            interval: Optional[Interval] = source.get(var)
+            if interval is not None:
+                intervals.append(interval)
+        if _variable_empty(pinned1 | pinned2, excluded1 | excluded2, intervals):
+            return False
+    return True
@@ -0,0 +1,328 @@
+"""
+formula_index.py
+
+Cél:
+- A formulák (string értékű "=" hatások) kanonikus alakra hozása, hogy a
+  check_variable_conflicts a matematikailag azonos képleteket is egyezőnek
+  lássa (a*b == b*a, (a+b)+c == c+(b+a), zárójelezés, stb.).
+
+Működés:
+- A képletet egyszer parszoljuk kifejezés-DAG-gá. Minden csomópont
+  hash-consolt (internált): azonos részkifejezés csak egyszer létezik a
+  memóriában, bárhány formulában szerepel is.
+- Kanonizálás: '-' → összeadás (-1)-szeres taggal, a '+' és '*' kiterítve
+  (asszociativitás) és rendezve (kommutativitás), numerikus konstansok
+  összevonva.
+- A csomópont kanonikus szöveges alakja (signature) memoizált; a duplikált
+  formulák keresése ezután egyetlen dict-lookup hatásonként.
+- Amit nem tudunk parszolni (pl. szabad szöveg), az a régi, egyszerű
+  normalizálással (rule_set.normalize_expression) kap signature-t.
+- A tár élettartama a szabálykészleté: minden RuleSet a sajátját használja
+  (lásd rule_set.py), így a hosszan futó folyamatokban (watch, server) a
+  régi futások képletei nem halmozódnak fel.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# csomópont: (op, payload) – op: "var", "num", "add", "mul", "div", "pow"
+Node = Tuple
+
+_TOKEN_RE = re.compile(r"\s*(?:(\d+(?:\.\d+)?)|([A-Za-z_][A-Za-z0-9_]*)|(\*\*|[-+*/^()]))")
+
+_COMMUTATIVE = ("add", "mul")
+
+
+class FormulaParseError(ValueError):
+    pass
+
+
+class FormulaInterner:
+    """
+    Internált kifejezés-csomópontok tára.
+
+    Minden csomópontot egy egész azonosító jelöl; azonos (op, gyerekek)
+    kulcshoz mindig ugyanaz az azonosító tartozik.
+    """
+
+    def __init__(self):
+        self._ids: Dict[Node, int] = {}
+        self._nodes: List[Node] = []
+        self._parsed: Dict[str, int] = {}
+        self._signatures: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    # -------------------- internálás -------------------- #
+
+    def _intern(self, node: Node) -> int:
+        node_id = self._ids.get(node)
+        if node_id is None:
+            node_id = len(self._nodes)
+            self._ids[node] = node_id
+            self._nodes.append(node)
+        return node_id
+
+    def var(self, name: str) -> int:
+        return self._intern(("var", name))
+
+    def num(self, value: float) -> int:
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return self._intern(("num", value))
+
+    def neg(self, child: int) -> int:
+        # -x == (-1)*x, így a konstans-összevonás a negálást is kezeli
+        return self.mul(self.num(-1), child)
+
+    def _assoc(self, op: str, children: List[int]) -> int:
+        """
+        Kiterített, rendezett, konstans-összevont '+' vagy '*' csomópont.
+        """
+        flat: List[int] = []
+        const = 0 if op == "add" else 1
+        has_const = False
+        stack = list(reversed(children))
+        while stack:
+            child = stack.pop()
+            child_op, payload = self._nodes[child]
+            if child_op == op:
+                stack.extend(reversed(payload))
+            elif child_op == "num":
+                const = const + payload if op == "add" else const * payload
+                has_const = True
+            else:
+                flat.append(child)
+
+        identity = 0 if op == "add" else 1
+        if has_const and (const != identity or not flat):
+            flat.append(self.num(const))
+        if len(flat) == 1:
+            return flat[0]
+
+        flat.sort()
+        return self._intern((op, tuple(flat)))
+
+    def add(self, *children: int) -> int:
+        return self._assoc("add", list(children))
+
+    def mul(self, *children: int) -> int:
+        return self._assoc("mul", list(children))
+
+    def binary(self, op: str, left: int, right: int) -> int:
+        return self._intern((op, (left, right)))
+
+    # -------------------- parszolás -------------------- #
+
+    def parse(self, expr: str) -> int:
+        """
+        Képlet → kanonikus csomópont-azonosító (memoizált).
+        Hibás képletnél FormulaParseError.
+        """
+        node_id = self._parsed.get(expr)
+        if node_id is None:
+            node_id = _Parser(self, expr).parse()
+            self._parsed[expr] = node_id
+        return node_id
+
+    # -------------------- signature -------------------- #
+
+    def signature(self, node_id: int) -> str:
+        """
+        A csomópont egyértelmű, kanonikus szöveges alakja (memoizált).
+        Explicit veremmel, a gyerekektől felfelé számoljuk, így a mélyen
+        egymásba ágyazott képlet sem éri el a rekurziós korlátot.
+        """
+        sig = self._signatures.get(node_id)
+        if sig is not None:
+            return sig
+
+        signatures = self._signatures
+        nodes = self._nodes
+        stack = [node_id]
+        while stack:
+            current = stack[-1]
+            if current in signatures:
+                # ugyanaz a gyerek többször is a verembe kerülhetett (a*a)
+                stack.pop()
+                continue
+            op, payload = nodes[current]
+            if op == "var":
+                sig = payload
+            elif op == "num":
+                sig = repr(payload)
+            else:
+                pending = False
+                for child in payload:
+                    if child not in signatures:
+                        stack.append(child)
+                        pending = True
+                if pending:
+                    continue
+                if op in _COMMUTATIVE:
+                    sep = "+" if op == "add" else "*"
+                    sig = sep.join(sorted([self._operand(c) for c in payload]))
+                else:
+                    sep = "/" if op == "div" else "^"
+                    sig = self._operand(payload[0]) + sep + self._operand(payload[1])
+            signatures[current] = sig
+            stack.pop()
+
+        return signatures[node_id]
+
+    def _operand(self, node_id: int) -> str:
+        # összetett részkifejezés zárójelben, hogy az alak egyértelmű legyen
+        sig = self._signatures[node_id]
+        if self._nodes[node_id][0] in ("var", "num"):
+            return sig
+        return "(" + sig + ")"
+
+
+class _Parser:
+    """
+    Leszálló parszoló:
+        expr   := term (('+' | '-') term)*
+        term   := unary (('*' | '/') unary)*
+        unary  := ('-' | '+') unary | power
+        power  := atom (('^' | '**') unary)?
+        atom   := number | name | '(' expr ')'
+
+    A szabályok nem Python-rekurzióval, hanem explicit keretveremmel
+    hívják egymást, így a mély zárójelezés, a hosszú unáris lánc vagy az
+    egymásba ágyazott hatványok sem érik el a rekurziós korlátot.
+    """
+
+    def __init__(self, interner: FormulaInterner, text: str):
+        self.f = interner
+        self.tokens = self._tokenize(text)
+        # a tokenek műveleti jele (None, ha nem művelet), a végén őrszem
+        self.ops: List[Optional[str]] = [value if kind == "op" else None for kind, value in self.tokens]
+        self.ops.append(None)
+        self.pos = 0
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, str]]:
+        tokens: List[Tuple[str, str]] = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            m = _TOKEN_RE.match(text, pos)
+            if m is None:
+                raise FormulaParseError(f"Nem értelmezhető képlet: {text!r}")
+            number, name, op = m.groups()
+            if number is not None:
+                tokens.append(("num", number))
+            elif name is not None:
+                tokens.append(("name", name))
+            else:
+                tokens.append(("op", "^" if op == "**" else op))
+            pos = m.end()
+        return tokens
+
+    def parse(self) -> int:
+        node = self._run()
+        if self.pos != len(self.tokens):
+            raise FormulaParseError("Felesleges tokenek a képlet végén.")
+        return node
+
+    def _run(self) -> int:
+        # Keretek: ["expr", tagok, előjel], ["term", tényezők, műveleti jel],
+        # ["sign", op], ["power", alap], ["paren"]. Minden szabály végül egy
+        # unary-val kezdődik, ezért csak abba lépünk be; a kész részeredményt
+        # (result) a verem tetején lévő keret kapja meg.
+        f = self.f
+        ops = self.ops
+        tokens = self.tokens
+        stack: List[list] = [["expr", [], "+"], ["term", [], "*"]]
+
+        while True:
+            # -------- unary / power / atom -------- #
+            op = ops[self.pos]
+            while op == "-" or op == "+":
+                stack.append(["sign", op])
+                self.pos += 1
+                op = ops[self.pos]
+            if self.pos >= len(tokens):
+                raise FormulaParseError("Váratlan képletvég.")
+            kind, text = tokens[self.pos]
+            self.pos += 1
+            if kind == "num":
+                result = f.num(float(text))
+            elif kind == "name":
+                result = f.var(text)
+            elif text == "(":
+                stack.append(["paren"])
+                stack.append(["expr", [], "+"])
+                stack.append(["term", [], "*"])
+                continue
+            else:
+                raise FormulaParseError(f"Váratlan token: {text!r}")
+            if ops[self.pos] == "^":
+                self.pos += 1
+                stack.append(["power", result])
+                continue
+
+            # -------- visszatérés a keretekbe, a következő unary-ig -------- #
+            while True:
+                frame = stack[-1]
+                rule = frame[0]
+                if rule == "term":
+                    factors = frame[1]
+                    if frame[2] == "*":
+                        factors.append(result)
+                    else:
+                        left = factors[0] if len(factors) == 1 else f.mul(*factors)
+                        factors[:] = [f.binary("div", left, result)]
+                    op = ops[self.pos]
+                    if op == "*" or op == "/":
+                        self.pos += 1
+                        frame[2] = op
+                        break
+                    stack.pop()
+                    result = factors[0] if len(factors) == 1 else f.mul(*factors)
+                elif rule == "expr":
+                    terms = frame[1]
+                    terms.append(result if frame[2] == "+" else f.neg(result))
+                    op = ops[self.pos]
+                    if op == "+" or op == "-":
+                        self.pos += 1
+                        frame[2] = op
+                        stack.append(["term", [], "*"])
+                        break
+                    stack.pop()
+                    result = terms[0] if len(terms) == 1 else f.add(*terms)
+                    if not stack:
+                        return result
+                elif rule == "sign":
+                    stack.pop()
+                    if frame[1] == "-":
+                        result = f.neg(result)
+                elif rule == "power":
+                    stack.pop()
+                    result = f.binary("pow", frame[1], result)
+                else:
+                    if ops[self.pos] != ")":
+                        raise FormulaParseError("Hiányzó ')'.")
+                    self.pos += 1
+                    stack.pop()
+                    if ops[self.pos] == "^":
+                        # a zárójeles kifejezés egy hatvány alapja
+                        self.pos += 1
+                        stack.append(["power", result])
+                        break
+
+
+def canonical_formula(expr: str, interner: Optional[FormulaInterner] = None) -> Optional[str]:
+    """
+    A képlet kanonikus signature-je, vagy None, ha nem képlet. interner
+    nélkül egyszer használatos tárral számolunk.
+    """
+    if interner is None:
+        interner = FormulaInterner()
+    try:
+        return interner.signature(interner.parse(expr))
+    except FormulaParseError:
+        return None
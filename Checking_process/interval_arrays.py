@@ -0,0 +1,159 @@
+"""
+interval_arrays.py
+
+Cél:
+- Opcionális, NumPy-alapú backend a logikai kizárások páros kereséséhez
+  (check_logical_exclusions, backend="numpy").
+
+Működés:
+- Egy effect_var csoport minden rekordjának változónkénti határai és
+  zártsági jelzői (m x k) tömbökbe kerülnek; a hiányzó feltétel külön
+  maszkban ("has") van, mert az a tuple-kódban is kimarad a vizsgálatból.
+- A rekordokat a leggyakrabban korlátozott változó alsó határa szerint
+  rendezzük, és soronként blokkokban dolgozunk – egy blokk csak azokkal az
+  oszlopokkal hasonlít, amelyek alsó határa nem nagyobb a blokk legnagyobb
+  felső határánál. A blokkon belül előbb az eltérő értékű párokat szűrjük
+  ki, és csak ezekre számoljuk az átfedési maszkot.
+- A szemantika azonos az intervals.intervals_overlap tuple-kódjával.
+  Ahol a float64 nem pontos (nagy egész határok) vagy az érték nem
+  hash-elhető, a csoportot a python út kapja vissza.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from Instrumentation.metrics import METRICS
+
+try:
+    import numpy as np
+except ImportError:  # a NumPy opcionális függőség
+    np = None
+
+
+HAS_NUMPY = np is not None
+
+# Ennél kisebb csoportnál a tömbök felépítése többe kerül, mint a söprés
+MIN_GROUP_SIZE = 32
+
+# Egy blokk legfeljebb ennyi (sor x oszlop) párt szűr
+BLOCK_ELEMENTS = 1 << 22
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError("A 'numpy' backendhez telepíteni kell a NumPy csomagot.")
+
+
+def _exact_float(value: Any) -> bool:
+    return isinstance(value, float) or float(value) == value
+
+
+def _group_arrays(records: List[Dict[str, Any]], group: List[int]) -> Optional[Tuple]:
+    """
+    A csoport tömbjei, vagy None, ha a csoport nem kezelhető pontosan.
+    """
+    columns: Dict[str, int] = {}
+    for idx in group:
+        for var in records[idx]["intervals"]:
+            if var not in columns:
+                columns[var] = len(columns)
+
+    m = len(group)
+    k = max(len(columns), 1)
+    lo = np.full((m, k), -np.inf)
+    hi = np.full((m, k), np.inf)
+    lo_inc = np.zeros((m, k), dtype=bool)
+    hi_inc = np.zeros((m, k), dtype=bool)
+    has = np.zeros((m, k), dtype=bool)
+    codes = np.empty(m, dtype=np.int64)
+    value_codes: Dict[Any, int] = {}
+
+    for row, idx in enumerate(group):
+        rec = records[idx]
+        try:
+            codes[row] = value_codes.setdefault(rec["effect_val"], len(value_codes))
+        except TypeError:
+            # nem hash-elhető effect érték
+            return None
+        for var, (low, low_inc, high, high_inc) in rec["intervals"].items():
+            if not (_exact_float(low) and _exact_float(high)):
+                return None
+            col = columns[var]
+            lo[row, col] = low
+            hi[row, col] = high
+            lo_inc[row, col] = low_inc
+            hi_inc[row, col] = high_inc
+            has[row, col] = True
+
+    return columns, lo, lo_inc, hi, hi_inc, has, codes
+
+
+def group_pairs(
+    records: List[Dict[str, Any]],
+    group: List[int],
+    pairs: List[Tuple[int, int]],
+) -> bool:
+    """
+    Egy effect_var csoport ütköző párjait a pairs listába teszi.
+    False, ha a csoportot a python útnak kell kezelnie.
+    """
+    require_numpy()
+    if len(group) < MIN_GROUP_SIZE:
+        return False
+
+    arrays = _group_arrays(records, group)
+    if arrays is None:
+        return False
+    _, lo, lo_inc, hi, hi_inc, has, codes = arrays
+    m = lo.shape[0]
+
+    # rendezés a leggyakrabban korlátozott változó alsó határa szerint
+    axis = int(np.argmax(has.sum(axis=0)))
+    order = np.argsort(lo[:, axis], kind="stable")
+    lo, lo_inc, hi, hi_inc, has, codes = (
+        a[order] for a in (lo, lo_inc, hi, hi_inc, has, codes)
+    )
+    members = np.asarray(group)[order]
+    axis_lo = lo[:, axis]
+    axis_hi = hi[:, axis]
+
+    block = max(1, BLOCK_ELEMENTS // m)
+    for start in range(0, m, block):
+        stop = min(start + block, m)
+        # ennél nagyobb alsó határú sor a blokk egyik sorával sem fedhet át
+        end = int(np.searchsorted(axis_lo, axis_hi[start:stop].max(), side="right"))
+        if end <= start + 1:
+            continue
+
+        # először az olcsó szűrés: eltérő érték, és minden pár csak egyszer
+        rows = np.arange(start, stop)[:, None]
+        cols = np.arange(start, end)[None, :]
+        candidate = (codes[start:stop, None] != codes[None, start:end]) & (cols > rows)
+        r, c = np.nonzero(candidate)
+        METRICS.count("logical_exclusions.pair_checks", len(r))
+        if not len(r):
+            continue
+        r += start
+        c += start
+
+        # alsó határ maximuma, felső határ minimuma – mint intervals_overlap
+        l1, l2 = lo[r], lo[c]
+        h1, h2 = hi[r], hi[c]
+        li1, li2 = lo_inc[r], lo_inc[c]
+        hi1, hi2 = hi_inc[r], hi_inc[c]
+        low = np.maximum(l1, l2)
+        low_inc = np.where(l1 > l2, li1, np.where(l2 > l1, li2, li1 & li2))
+        high = np.minimum(h1, h2)
+        high_inc = np.where(h1 < h2, hi1, np.where(h2 < h1, hi2, hi1 & hi2))
+        overlap = (low < high) | ((low == high) & low_inc & high_inc)
+
+        # a nem közös változók nem számítanak
+        overlap |= ~(has[r] & has[c])
+        mask = overlap.all(axis=1)
+
+        a = members[r[mask]]
+        b = members[c[mask]]
+        pairs.extend(zip(np.minimum(a, b).tolist(), np.maximum(a, b).tolist()))
+
+    return True
@@ -0,0 +1,109 @@
+"""
+intervals.py
+
+Cél:
+- A szabályok numerikus feltételeiből (Causes) változónkénti intervallumok
+  építése és az intervallum-műveletek, amelyeket több ellenőrző is használ.
+
+Egy intervallum:
+    (lower, lower_inclusive, upper, upper_inclusive)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Tuple
+from math import inf
+
+
+Numeric = float | int
+Interval = Tuple[Numeric, bool, Numeric, bool]
+
+
+def build_intervals(causes: Iterable[Any]) -> Dict[str, Interval]:
+    """
+    Egy szabály feltételeiből (variable / operator / value attribútumú
+    objektumok, pl. rule_model.Condition) intervallumot épít az egyes
+    változókra:
+        var -> (lower, lower_inclusive, upper, upper_inclusive)
+    """
+    intervals: Dict[str, Interval] = {}
+
+    for c in causes:
+        var = c.variable
+        op = c.operator
+        val = c.value
+
+        if var is None or op is None:
+            continue
+        if not isinstance(val, (int, float)):
+            # csak numerikus értékekkel tudunk dolgozni
+            continue
+
+        current = intervals.get(var, (-inf, False, inf, False))
+        lo, lo_inc, hi, hi_inc = current
+
+        if op == ">":
+            if val > lo or (val == lo and lo_inc):
+                lo, lo_inc = val, False
+        elif op == ">=":
+            if val > lo or (val == lo and not lo_inc):
+                lo, lo_inc = val, True
+        elif op == "<":
+            if val < hi or (val == hi and hi_inc):
+                hi, hi_inc = val, False
+        elif op == "<=":
+            if val < hi or (val == hi and not hi_inc):
+                hi, hi_inc = val, True
+        elif op == "==":
+            # pontos érték – szűkítjük mindkét oldalról
+            lo, lo_inc = val, True
+            hi, hi_inc = val, True
+
+        intervals[var] = (lo, lo_inc, hi, hi_inc)
+
+    return intervals
+
+
+def interval_empty(interval: Interval) -> bool:
+    lo, lo_inc, hi, hi_inc = interval
+    if lo > hi:
+        return True
+    if lo == hi and (not lo_inc or not hi_inc):
+        return True
+    return False
+
+
+def intervals_overlap(
+    i1: Interval,
+    i2: Interval,
+) -> bool:
+    lo1, lo1_inc, hi1, hi1_inc = i1
+    lo2, lo2_inc, hi2, hi2_inc = i2
+
+    # alsó határ maximuma
+    if lo1 > lo2:
+        lo = lo1
+        lo_inc = lo1_inc
+    elif lo2 > lo1:
+        lo = lo2
+        lo_inc = lo2_inc
+    else:
+        lo = lo1
+        lo_inc = lo1_inc and lo2_inc
+
+    # felső határ minimuma
+    if hi1 < hi2:
+        hi = hi1
+        hi_inc = hi1_inc
+    elif hi2 < hi1:
+        hi = hi2
+        hi_inc = hi2_inc
+    else:
+        hi = hi1
+        hi_inc = hi1_inc and hi2_inc
+
+    if lo < hi:
+        return True
+    if lo == hi and lo_inc and hi_inc:
+        return True
+    return False
@@ -0,0 +1,163 @@
+"""
+parallel.py
+
+Cél:
+- Az ellenőrzők párhuzamos futtatása process poolon.
+
+Működés:
+- A RuleSet-et a workerek induláskor egyszer kapják meg (initializer),
+  a feladatok csak az ellenőrző nevét / a shard leírását viszik.
+- A változóütközés- és a redundancia-ellenőrzés (közel) lineáris, ezek
+  egy-egy feladatként futnak.
+- A logikai kizárások páros keresése nagy bemenetnél kimeneti változók
+  (effect_var) szerint shardokra bomlik; a shardok rendezett párlistáit
+  összefésüljük, így az üzenetek sorrendje azonos a soros futáséval.
+- A cache-elt futás (check_cache.py) teljes újraszámolásakor csak a páros
+  keresés fut így (conflicting_pairs_parallel).
+- A workerek a feladatuk idejét is visszaadják; run_checks_parallel ezt
+  ellenőrzőnként a szülő METRICS-ébe veszi fel (check.<ellenőrző>), a
+  kizárásoknál a shardok és a szülőben futó rész idejének összegeként.
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from Checking_process import (
+    check_variable_conflicts,
+    check_logical_exclusions,
+    check_redunant_rules,
+)
+from Checking_process.rule_set import RuleSet
+from Instrumentation.metrics import METRICS
+
+
+# Ennyi "=" hatás felett a logikai kizárásokat shardokra bontjuk
+SHARD_THRESHOLD = 5000
+
+_CHECKERS = {
+    "variable_conflicts": check_variable_conflicts,
+    "redundant_rules": check_redunant_rules,
+}
+
+_worker_rule_set: Optional[RuleSet] = None
+
+
+def _init_worker(rule_set: RuleSet) -> None:
+    global _worker_rule_set
+    _worker_rule_set = rule_set
+
+
+def _run_checker(name: str) -> Tuple[List[str], float]:
+    # (üzenetek, a worker ideje) – a szülő a saját METRICS-ébe veszi fel
+    start = time.perf_counter()
+    messages = _CHECKERS[name].check(_worker_rule_set)
+    return messages, time.perf_counter() - start
+
+
+def _run_exclusion_shard(effect_vars: List[Any]) -> Tuple[List[Tuple[int, int]], float]:
+    start = time.perf_counter()
+    pairs = check_logical_exclusions.conflicting_pairs(_worker_rule_set, effect_vars)
+    return pairs, time.perf_counter() - start
+
+
+def _make_shards(rule_set: RuleSet, count: int) -> List[List[Any]]:
+    """
+    Kimeneti változók szétosztása count shardba. A csoportok költsége
+    nagyjából négyzetes a méretükben, ezért mohón, a legnagyobbal kezdve
+    mindig a legkevésbé terhelt shardba tesszük őket.
+    """
+    groups = sorted(
+        rule_set.by_effect_var.items(),
+        key=lambda kv: len(kv[1]),
+        reverse=True,
+    )
+    heap = [(0, n) for n in range(count)]
+    shards: List[List[Any]] = [[] for _ in range(count)]
+    for var, members in groups:
+        if len(members) < 2:
+            # egyelemű csoportban nincs pár
+            continue
+        load, n = heapq.heappop(heap)
+        shards[n].append(var)
+        heapq.heappush(heap, (load + len(members) ** 2, n))
+    return [shard for shard in shards if shard]
+
+
+def _shards(rule_set: RuleSet, workers: int, shard_threshold: int) -> List[List[Any]]:
+    if len(rule_set.assignments) >= shard_threshold and workers > 1:
+        return _make_shards(rule_set, workers)
+    return [list(rule_set.by_effect_var)]
+
+
+def conflicting_pairs_parallel(
+    rule_set: RuleSet,
+    workers: Optional[int] = None,
+    shard_threshold: int = SHARD_THRESHOLD,
+) -> List[Tuple[int, int]]:
+    """
+    Ugyanaz, mint check_logical_exclusions.conflicting_pairs, de a shardok
+    process poolon futnak.
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = _shards(rule_set, workers, shard_threshold)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(shards)),
+        initializer=_init_worker,
+        initargs=(rule_set,),
+    ) as pool:
+        shard_futures = [pool.submit(_run_exclusion_shard, shard) for shard in shards]
+        return list(heapq.merge(*(f.result()[0] for f in shard_futures)))
+
+
+def run_checks_parallel(
+    rule_set: RuleSet,
+    workers: Optional[int] = None,
+    shard_threshold: int = SHARD_THRESHOLD,
+) -> Dict[str, List[str]]:
+    """
+    Mindhárom ellenőrzőt párhuzamosan futtatja.
+
+    Visszatér:
+        {"variable_conflicts": [...], "logical_exclusions": [...],
+         "redundant_rules": [...]} – ugyanazok az üzenetek, ugyanabban a
+        sorrendben, mint a soros check() hívásoknál.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    shards = _shards(rule_set, workers, shard_threshold)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(rule_set,),
+    ) as pool:
+        checker_futures = {name: pool.submit(_run_checker, name) for name in _CHECKERS}
+        shard_futures = [pool.submit(_run_exclusion_shard, shard) for shard in shards]
+
+        # az önellentmondó feltételek keresése lineáris – közben itt fut
+        start = time.perf_counter()
+        exclusions = check_logical_exclusions.empty_interval_messages(rule_set)
+        local = time.perf_counter() - start
+
+        shard_results = [f.result() for f in shard_futures]
+        start = time.perf_counter()
+        pairs = heapq.merge(*(shard_pairs for shard_pairs, _ in shard_results))
+        exclusions.extend(check_logical_exclusions.pair_messages(rule_set, pairs))
+        local += time.perf_counter() - start
+        METRICS.record("check.logical_exclusions", local + sum(seconds for _, seconds in shard_results))
+
+        results = {"logical_exclusions": exclusions}
+        for name, future in checker_futures.items():
+            results[name], seconds = future.result()
+            METRICS.record(f"check.{name}", seconds)
+
+        return {
+            "variable_conflicts": results["variable_conflicts"],
+            "logical_exclusions": results["logical_exclusions"],
+            "redundant_rules": results["redundant_rules"],
+        }
@@ -0,0 +1,396 @@
+"""
+rule_model.py
+
+Cél:
+- A requirements szabályainak típusos, kompakt memóriabeli alakja a nyers
+  dict-ek helyett: Variable, Condition, Effect és Rule __slots__ osztályok.
+  Egy feltétel dict-je ~200 bájt, a slotos objektum ~60; a változónevek
+  internálva, az operátorok Operator enumként (egy-egy példány) tárolódnak,
+  az azonos tartalmú feltételek és hatások egy objektumon osztoznak
+  (RuleDecoder).
+
+Heurisztika:
+- A legfelső szint marad dict ({"variables", "inputs", "outputs"}), csak az
+  elemei típusosak – így minden, ami requirements dict-et vár, változatlanul
+  kapja.
+- Az ismeretlen operátor szövegként (internálva) marad, a kiértékelő és az
+  ellenőrzők ugyanúgy kezelik, mint eddig.
+- A modell objektumai olvasható mappingként is viselkednek a JSON
+  kulcsokkal (get, [], in), a dict-et váró régi kód is használhatja őket.
+  Hiányzó és null mező között nem teszünk különbséget; a modellben nem
+  szereplő kulcsok (pl. egy szabály egyéb mezői) dekódoláskor elvesznek.
+
+Használat:
+    requirements = load_model("requirements.json")     # elemenként, streamelve
+    requirements = decode_requirements(json.load(f))    # kész dict-ből
+    rule_set = RuleSet(requirements)
+    json.dump(encode_requirements(requirements), f)
+"""
+
+from __future__ import annotations
+
+import sys
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Pre_process.JsonStream import stream_json_requirements
+
+
+class Operator(str, Enum):
+    """
+    A feltételek és hatások ismert operátorai. Mindenben str-ként viselkedik
+    (Operator.GE == ">=", ugyanaz a dict-kulcs, repr-je "'>='").
+    """
+
+    LT = "<"
+    LE = "<="
+    GT = ">"
+    GE = ">="
+    EQ = "=="
+    ASSIGN = "="
+    NE = "!="
+
+    __hash__ = str.__hash__
+    __str__ = str.__str__
+    __format__ = str.__format__
+    __repr__ = str.__repr__
+
+
+_OPERATORS: Dict[str, Operator] = {op.value: op for op in Operator}
+
+
+def operator_of(op: Any) -> Any:
+    """
+    Operátor-szöveg → Operator; az ismeretlen szöveg internálva marad.
+    """
+    known = _OPERATORS.get(op) if isinstance(op, str) else None
+    if known is not None:
+        return known
+    return sys.intern(op) if type(op) is str else op
+
+
+def intern_name(name: Any) -> Any:
+    return sys.intern(name) if type(name) is str else name
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, Operator) else value
+
+
+class _Record:
+    """
+    Közös alap: mapping-szerű olvasás a JSON kulcsokkal, egyenlőség és
+    tartalom szerinti repr.
+    """
+
+    __slots__ = ()
+
+    # (JSON kulcs, attribútum) párok, a JSON-beli sorrendben
+    _FIELDS: Tuple[Tuple[str, str], ...] = ()
+    _KEYS: Dict[str, str] = {}
+    # a to_dict által null értékkel is kiírt kulcsok
+    _REQUIRED: Tuple[str, ...] = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        attr = self._KEYS.get(key)
+        value = getattr(self, attr) if attr is not None else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None  # type: ignore[arg-type]
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for _, attr in self._FIELDS)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        values = ", ".join(repr(getattr(self, attr)) for _, attr in self._FIELDS)
+        return f"{type(self).__name__}({values})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-alak; a nem kötelező, üres mezők kimaradnak.
+        """
+        data: Dict[str, Any] = {}
+        for key, attr in self._FIELDS:
+            value = getattr(self, attr)
+            if value is None and key not in self._REQUIRED:
+                continue
+            if isinstance(value, tuple):
+                value = [item.to_dict() for item in value]
+            data[key] = _plain(value)
+        return data
+
+
+def _fields(*pairs: Tuple[str, str]) -> Tuple[Tuple[Tuple[str, str], ...], Dict[str, str]]:
+    return pairs, dict(pairs)
+
+
+class Variable(_Record):
+    __slots__ = ("name", "type", "unit", "role")
+
+    _FIELDS, _KEYS = _fields(("name", "name"), ("type", "type"), ("unit", "unit"), ("role", "role"))
+    _REQUIRED = ("name",)
+
+    def __init__(self, name: Any, type: Any = None, unit: Any = None, role: Any = None):
+        self.name = intern_name(name)
+        self.type = intern_name(type)
+        self.unit = intern_name(unit)
+        self.role = intern_name(role)
+
+
+class Condition(_Record):
+    """
+    Egy feltétel: variable operator value; a szövegből konvertáltaknál "raw"
+    az eredeti mondatrész.
+    """
+
+    __slots__ = ("variable", "operator", "value", "raw", "_normalized")
+
+    _FIELDS, _KEYS = _fields(("variable", "variable"), ("operator", "operator"), ("value", "value"), ("raw", "raw"))
+    _REQUIRED = ("variable", "operator", "value")
+
+    def __init__(self, variable: Any, operator: Any, value: Any, raw: Any = None):
+        self.variable = intern_name(variable)
+        self.operator = operator_of(operator)
+        self.value = value
+        self.raw = raw
+        self._normalized: Optional[Tuple[str, str, str]] = None
+
+    def normalized(self) -> Tuple[str, str, str]:
+        """
+        (variable, operator, value) szövegként – a redundancia-signature
+        eleme; a megosztott objektumon egyszer számolódik.
+        """
+        key = self._normalized
+        if key is None:
+            key = self._normalized = (str(self.variable), str(self.operator), str(self.value))
+        return key
+
+
+class Effect(_Record):
+    """
+    Egy hatás: variable operator value; régebbi fájlokban az érték
+    "expression" néven is állhat, a szövegből konvertáltaknál "raw" az
+    eredeti mondatrész.
+    """
+
+    __slots__ = ("variable", "operator", "value", "expression", "raw", "_normalized")
+
+    _FIELDS, _KEYS = _fields(
+        ("variable", "variable"),
+        ("operator", "operator"),
+        ("value", "value"),
+        ("expression", "expression"),
+        ("raw", "raw"),
+    )
+    _REQUIRED = ("variable", "operator", "value")
+
+    def __init__(self, variable: Any, operator: Any, value: Any, expression: Any = None, raw: Any = None):
+        self.variable = intern_name(variable)
+        self.operator = operator_of(operator)
+        self.value = value
+        self.expression = expression
+        self.raw = raw
+        self._normalized: Optional[Tuple[str, str, str]] = None
+
+    def normalized(self) -> Tuple[str, str, str]:
+        """
+        (variable, operator, érték) szövegként, az érték hiányában az
+        expression-nel (lásd Condition.normalized).
+        """
+        key = self._normalized
+        if key is None:
+            val = self.value if self.value is not None else self.expression
+            key = self._normalized = (str(self.variable), str(self.operator), str(val))
+        return key
+
+
+class Rule(_Record):
+    """
+    Egy szabály. Az inputs szabályainak hatásai az effects-ben, az outputs
+    szabályaié a rules-ban (és kompatibilitás kedvéért az effects-ben)
+    vannak; question az outputs kérdezett változója.
+    """
+
+    __slots__ = ("id", "description", "causes", "effects", "rules", "question", "_present")
+
+    _FIELDS, _KEYS = _fields(
+        ("id", "id"),
+        ("description", "description"),
+        ("Causes", "causes"),
+        ("effects", "effects"),
+        ("question", "question"),
+        ("rules", "rules"),
+    )
+    _REQUIRED = ("id",)
+
+    def __init__(
+        self,
+        id: Any,
+        description: Optional[str] = None,
+        causes: Tuple[Condition, ...] = (),
+        effects: Tuple[Effect, ...] = (),
+        rules: Tuple[Effect, ...] = (),
+        question: Tuple[Effect, ...] = (),
+        present: Tuple[str, ...] = (),
+    ):
+        self.id = intern_name(id)
+        self.description = description
+        self.causes = causes
+        self.effects = effects
+        self.rules = rules
+        self.question = question
+        # a forrásban üres listaként is szereplő kulcsok (a to_dict kiírja őket)
+        self._present = present
+
+    @property
+    def present(self) -> Tuple[str, ...]:
+        """
+        A forrásban üres listaként szereplő kulcsok ("Causes", "effects", ...).
+        """
+        return self._present
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # a dict-es alakban a hiányzó lista és az üres lista ugyanaz
+        attr = self._KEYS.get(key)
+        value = getattr(self, attr) if attr is not None else None
+        return default if value is None or value == () else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        for key in ("Causes", "effects", "question", "rules"):
+            if not data.get(key) and key not in self._present:
+                data.pop(key, None)
+        return data
+
+
+# -------------------- Dekódolás / kódolás -------------------- #
+
+_RULE_LISTS = ("Causes", "effects", "rules", "question")
+
+
+class RuleDecoder:
+    """
+    Nyers dict → modell. Az azonos tartalmú feltételeket és hatásokat egy
+    megosztott objektum képviseli (a nagy szabálykészletekben ugyanaz a
+    feltétel sokszor ismétlődik) – ezért a modell objektumai nem
+    módosítandók.
+    """
+
+    def __init__(self):
+        # (variable, operator, értéktípus, érték[, ...]) -> objektum; a típus
+        # azért része a kulcsnak, mert 1 == 1.0 == True
+        self._conditions: Dict[Tuple, Condition] = {}
+        self._effects: Dict[Tuple, Effect] = {}
+
+    def variable(self, data: Dict[str, Any]) -> Variable:
+        return Variable(data.get("name"), data.get("type"), data.get("unit"), data.get("role"))
+
+    def rule(self, data: Any) -> Rule:
+        """
+        Nyers szabály-dict → Rule (kész Rule-t változatlanul ad vissza).
+        """
+        if type(data) is Rule:
+            return data
+        # a ciklusok szándékosan helyben, függvényhívás nélkül (forró út)
+        conditions = self._conditions
+        causes: List[Condition] = []
+        for c in data.get("Causes") or ():
+            var, op, val, raw = c.get("variable"), c.get("operator"), c.get("value"), c.get("raw")
+            key = (var, op, type(val), val, raw)
+            try:
+                cond = conditions.get(key)
+            except TypeError:
+                cond = Condition(var, op, val, raw)
+            else:
+                if cond is None:
+                    cond = conditions[key] = Condition(var, op, val, raw)
+            causes.append(cond)
+
+        shared = self._effects
+        lists: List[Tuple[Effect, ...]] = []
+        for items in (data.get("effects"), data.get("rules"), data.get("question")):
+            if not items:
+                lists.append(())
+                continue
+            built: List[Effect] = []
+            for e in items:
+                var, op, val = e.get("variable"), e.get("operator"), e.get("value")
+                expression, raw = e.get("expression"), e.get("raw")
+                key = (var, op, type(val), val, expression, raw)
+                try:
+                    eff = shared.get(key)
+                except TypeError:
+                    eff = Effect(var, op, val, expression, raw)
+                else:
+                    if eff is None:
+                        eff = shared[key] = Effect(var, op, val, expression, raw)
+                built.append(eff)
+            lists.append(tuple(built))
+
+        present = tuple(key for key in _RULE_LISTS if data.get(key) == [])
+        return Rule(data.get("id"), data.get("description"), tuple(causes), *lists, present)
+
+    def item(self, section: str, item: Any) -> Any:
+        """
+        Egy "variables" / "inputs" / "outputs" elem dekódolása (a nem dict
+        elemek változatlanul maradnak).
+        """
+        if not isinstance(item, dict):
+            return item
+        if section == "variables":
+            return self.variable(item)
+        return self.rule(item)
+
+
+def decode_stream(items: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """
+    (section, item) párok folyama (JsonStream) dekódolt elemekkel – a
+    nyers dict az elem után rögtön eldobható.
+    """
+    decoder = RuleDecoder()
+    for section, item in items:
+        yield section, decoder.item(section, item)
+
+
+def decode_requirements(requirements_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Requirements dict → ugyanolyan felépítésű dict típusos elemekkel.
+    """
+    decoder = RuleDecoder()
+    model = dict(requirements_data)
+    for section in ("variables", "inputs", "outputs"):
+        model[section] = [decoder.item(section, item) for item in requirements_data.get(section, [])]
+    return model
+
+
+def load_model(json_path: str) -> Dict[str, List[Any]]:
+    """
+    requirements.json → típusos requirements, elemenként dekódolva (a teljes
+    nyers dict sosem kerül a memóriába).
+    """
+    model: Dict[str, List[Any]] = {"variables": [], "inputs": [], "outputs": []}
+    for section, item in decode_stream(stream_json_requirements(json_path)):
+        model[section].append(item)
+    return model
+
+
+def encode_requirements(requirements: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Típusos requirements → JSON-ba írható dict.
+    """
+    data = dict(requirements)
+    for section in ("variables", "inputs", "outputs"):
+        if section in data:
+            data[section] = [item.to_dict() if isinstance(item, _Record) else item for item in data[section]]
+    return data
@@ -0,0 +1,324 @@
+"""
+rule_set.py
+
+Cél:
+- A requirements dict egyszeri bejárása és előfeldolgozása, hogy az
+  ellenőrzők (check_*) ne olvassák újra és újra a nyers struktúrát.
+
+Egy RuleSet tartalmazza:
+- a szabályokat egységesített alakban (Causes + effects/rules egy listában,
+  a rule_model.py típusos objektumaiként),
+- szabályonként a numerikus intervallumokat, a diszkrét (logikai, szöveges,
+  "!=") feltételeket és a redundancia-signature-t,
+- az "=" operátorú hatásokat (assignments) és a formula-signature-öket,
+- változónkénti indexeket (kimeneti változó, feltételváltozó, signature,
+  hatás-signature).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from Checking_process.formula_index import FormulaInterner, canonical_formula
+from Checking_process.discrete_domains import build_discrete
+from Checking_process.intervals import build_intervals
+from Checking_process.rule_model import Condition, Effect, Rule, RuleDecoder
+
+
+# -------------------- Normalizálás -------------------- #
+
+def normalize_condition(cond: Condition) -> Tuple[str, str, str]:
+    return cond.normalized()
+
+
+def normalize_effect(eff: Effect) -> Tuple[str, str, str]:
+    # 'value' vagy 'expression' – mindent stringgé alakítunk
+    return eff.normalized()
+
+
+def normalize_expression(expr: str) -> str:
+    """
+    Egyszerű normalizálás:
+    - szóközök elhagyása
+    - ha van benne '+', akkor a tagokat rendezzük (a+b == b+a)
+    """
+    expr = expr.replace(" ", "")
+    if "+" in expr:
+        parts = expr.split("+")
+        parts = sorted(parts)
+        expr = "+".join(parts)
+    return expr
+
+
+def rule_effects(rule: Rule, section: str) -> Tuple[Effect, ...]:
+    """
+    Egységesített hatáslista:
+    - inputs[*].effects
+    - outputs[*].rules, majd kompatibilitás kedvéért outputs[*].effects
+    """
+    if section == "inputs" or not rule.rules:
+        return rule.effects
+    return rule.rules + rule.effects
+
+
+def derive_rule(rule: Rule, section: str, interner: FormulaInterner | None = None) -> Dict[str, Any]:
+    """
+    Egy szabályból számolt, csak a szabály tartalmától függő adatok:
+        intervals – változónkénti numerikus intervallumok
+        discrete  – változónkénti diszkrét tartományok (discrete_domains.py)
+        signature – (rendezett Causes, rendezett effects) a redundanciához
+        formulas  – hatásonként a kanonikus formula-signature (string
+                    értékű "=" hatásnál, lásd formula_index.py), egyébként None
+    A képleteket az interner tárába (a RuleSet-é) internáljuk.
+    """
+    causes = rule.causes
+    effects = rule_effects(rule, section)
+
+    conds_sig = tuple(sorted([c.normalized() for c in causes]))
+    effs_sig = tuple(sorted([e.normalized() for e in effects]))
+
+    formulas: List[Any] = []
+    for eff in effects:
+        val = eff.value
+        if eff.operator == "=" and isinstance(val, str):
+            formulas.append(canonical_formula(val, interner) or normalize_expression(val))
+        else:
+            formulas.append(None)
+
+    return {
+        "intervals": build_intervals(causes),
+        "discrete": build_discrete(causes),
+        "signature": (conds_sig, effs_sig),
+        "formulas": formulas,
+    }
+
+
+# -------------------- RuleSet -------------------- #
+
+class _Entry:
+    """
+    A RuleSet rekordjainak közös alapja: __slots__ objektum, amely a
+    korábbi dict-ekhez hasonlóan kulccsal is olvasható (rule["intervals"]).
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class RuleEntry(_Entry):
+    """
+    Egy szabály a RuleSet-ben (lásd RuleSet.rules).
+    """
+
+    __slots__ = ("id", "section", "causes", "effects", "intervals", "discrete", "signature", "key")
+
+    def __init__(
+        self,
+        id: Any,
+        section: str,
+        causes: Tuple[Condition, ...],
+        effects: Tuple[Effect, ...],
+        intervals: Dict[str, Any],
+        discrete: Dict[str, Any],
+        signature: Tuple,
+        key: Any,
+    ):
+        self.id = id
+        self.section = section
+        self.causes = causes
+        self.effects = effects
+        self.intervals = intervals
+        self.discrete = discrete
+        self.signature = signature
+        self.key = key
+
+
+class Assignment(_Entry):
+    """
+    Egy "=" operátorú hatás a RuleSet-ben (lásd RuleSet.assignments).
+    """
+
+    __slots__ = ("id", "rule", "effect_var", "effect_val", "intervals", "discrete")
+
+    def __init__(
+        self,
+        id: Any,
+        rule: int,
+        effect_var: Any,
+        effect_val: Any,
+        intervals: Dict[str, Any],
+        discrete: Dict[str, Any],
+    ):
+        self.id = id
+        self.rule = rule
+        self.effect_var = effect_var
+        self.effect_val = effect_val
+        self.intervals = intervals
+        self.discrete = discrete
+
+
+class RuleSet:
+    """
+    Egy futás során egyszer felépített, indexelt szabálykészlet.
+
+    Attribútumok:
+        variables        – a "variables" lista változatlanul
+        rules            – szabályonként egy RuleEntry (kulccsal is
+                           olvasható): id, section, causes, effects
+                           (rule_model Condition / Effect tuple-ök),
+                           intervals, discrete, signature, key
+                           (tartalom-hash, ha van cache)
+        input_rules      – az inputs szakaszból jövő szabályok indexei
+        assignments      – "=" operátorú hatások (kimeneti változóval),
+                           Assignment rekordok: id, rule, effect_var,
+                           effect_val, intervals, discrete
+        formulas         – (variable, formula_signature) párok a
+                           string értékű "=" hatásokra
+        by_effect_var    – effect_var -> assignments indexek
+        by_condition_var – feltételváltozó -> rules indexek
+        by_signature     – redundancia-signature -> rules indexek
+        by_effects       – hatás-signature (a signature második fele) ->
+                           rules indexek
+        by_formula       – formula_signature -> változónevek (előfordulási sorrendben)
+    """
+
+    def __init__(self, requirements_data: Dict[str, Any], cache: Any = None):
+        # opcionális RuleCache (check_cache.py) a szabályonkénti adatokhoz
+        self.cache = cache
+        self._decoder = RuleDecoder()
+        # a szabálykészlet saját képlet-tára (formula_index.py)
+        self._formulas = FormulaInterner()
+        self.variables: List[Any] = [
+            self._decoder.item("variables", v) for v in requirements_data.get("variables", [])
+        ]
+        self.rules: List[RuleEntry] = []
+        self.input_rules: List[int] = []
+        self.assignments: List[Assignment] = []
+        self.formulas: List[Tuple[str, str]] = []
+
+        self.by_effect_var: Dict[Any, List[int]] = {}
+        self.by_condition_var: Dict[str, List[int]] = {}
+        self.by_signature: Dict[Tuple, List[int]] = {}
+        self.by_effects: Dict[Tuple, List[int]] = {}
+        self.by_formula: Dict[str, List[str]] = {}
+
+        for section in ("inputs", "outputs"):
+            for rule in requirements_data.get(section, []):
+                self.add_rule(rule, section)
+
+    @classmethod
+    def from_stream(cls, items: Iterable[Tuple[str, Any]], cache: Any = None) -> "RuleSet":
+        """
+        Felépítés (section, item) párok folyamából (lásd
+        Pre_process/JsonStream.py), a teljes dict memóriában tartása nélkül.
+        Az indexek elemenként frissülnek, így a beolvasás végére az egymenetes
+        ellenőrzések (redundancia, formulák) adatai is készen vannak.
+
+        A szabályok sorrendje ugyanaz, mint dict esetén (inputs, majd outputs):
+        az inputs előtt érkező outputs elemeket addig pufferoljuk.
+        """
+        rule_set = cls({}, cache=cache)
+        seen_inputs = False
+        pending_outputs: List[Dict[str, Any]] = []
+
+        for section, item in items:
+            if section == "variables":
+                rule_set.variables.append(rule_set._decoder.item(section, item))
+            elif section == "inputs":
+                seen_inputs = True
+                rule_set.add_rule(item, "inputs")
+            elif section == "outputs":
+                if not seen_inputs:
+                    pending_outputs.append(item)
+                    continue
+                for rule in pending_outputs:
+                    rule_set.add_rule(rule, "outputs")
+                pending_outputs.clear()
+                rule_set.add_rule(item, "outputs")
+
+        for rule in pending_outputs:
+            rule_set.add_rule(rule, "outputs")
+        return rule_set
+
+    def add_rule(self, rule: Dict[str, Any] | Rule, section: str) -> RuleEntry:
+        """
+        Egy szabály (nyers dict vagy rule_model.Rule) felvétele és az
+        indexek frissítése.
+        """
+        if self.cache is not None:
+            rule, key, derived = self.cache.lookup(rule, section, self._decoder.rule, self._formulas)
+        else:
+            rule = self._decoder.rule(rule)
+            key, derived = None, derive_rule(rule, section, self._formulas)
+
+        rid = rule.id if rule.id is not None else "<no-id>"
+        effects = rule_effects(rule, section)
+        intervals = derived["intervals"]
+        discrete = derived["discrete"]
+        signature = derived["signature"]
+
+        index = len(self.rules)
+        entry = RuleEntry(rid, section, rule.causes, effects, intervals, discrete, signature, key)
+        self.rules.append(entry)
+        if section == "inputs":
+            self.input_rules.append(index)
+
+        self.by_signature.setdefault(signature, []).append(index)
+        self.by_effects.setdefault(signature[1], []).append(index)
+        for var in intervals:
+            self.by_condition_var.setdefault(var, []).append(index)
+        for var in discrete:
+            if var not in intervals:
+                self.by_condition_var.setdefault(var, []).append(index)
+
+        for eff, sig in zip(effects, derived["formulas"]):
+            var = eff.variable
+            if var is None or eff.operator != "=":
+                continue
+
+            self.by_effect_var.setdefault(var, []).append(len(self.assignments))
+            self.assignments.append(Assignment(rid, index, var, eff.value, intervals, discrete))
+
+            if sig is not None:
+                self.formulas.append((var, sig))
+                self.by_formula.setdefault(sig, []).append(var)
+
+        return entry
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # a dekóder megosztási táblái és a képlet-tár a folyamatok közti
+        # átadáskor (parallel.py) feleslegesek
+        state = self.__dict__.copy()
+        state["_decoder"] = None
+        state["_formulas"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._decoder = RuleDecoder()
+        self._formulas = FormulaInterner()
+
+
+def as_rule_set(requirements_data: Dict[str, Any] | RuleSet) -> RuleSet:
+    """
+    Az ellenőrzők belépési pontja: kész RuleSet-et változatlanul ad vissza,
+    nyers requirements dict-ből pedig felépíti.
+    """
+    if isinstance(requirements_data, RuleSet):
+        return requirements_data
+    return RuleSet(requirements_data)
@@ -0,0 +1,387 @@
+"""
+Evaluation/boundary_cases.py
+
+Cél:
+- Határérték-analízisen alapuló tesztesetek (bemeneti vektorok)
+  generálása minden szabályhoz és az együtt teljesülni képes
+  szabály-kombinációkhoz, folyamként (generátor / JSON Lines).
+
+Heurisztika:
+- Egy szabály feltételdoboza a bemeneti változókra vonatkozó feltételek
+  intervallumaiból áll (intervals.build_intervals szemantikával), egy
+  kombinációé ezek metszete. Változónként: minden véges határ, a határ ±
+  lépésköz, és egy belső pont. Egy esetben egyszerre csak egy változó tér
+  el a doboz belső pontjától (egyhibás feltevés).
+- Lépésköz: a "min_<név>_step" alakú, számmal értéket kapó változó (pl.
+  min_price_step = 0.1) arra a bemenetre vonatkozik, amelynek nevében a
+  <név> szerepel (total_goods_price), ennek híján az azonos mértékegységűre.
+  Egyébként egész típusnál 1, máskor a határok tizedesjegyeiből adódó
+  legkisebb helyiérték.
+- Boolean változónál a két érték, nem numerikus "==" feltételnél az érték
+  és a hiányzó érték, "!=" feltételnél a kizárt érték (± lépésköz) a határ.
+- Csak a bemeneti változók kapnak értéket (amelyeknek egyetlen szabály
+  sem ad értéket); a köztes változókra vonatkozó feltételeket kihagyjuk.
+  Sosem teljesülő (ismeretlen operátorú, üres intervallumú) szabályhoz,
+  illetve nem numerikus értékkel rendező feltételhez nem készül eset.
+
+Működés:
+- A kombinációkat index szerint növekvő sorrendben, mélységi bejárással
+  állítjuk elő (legfeljebb max_order szabály): egy szabály akkor bővíti a
+  kombinációt, ha a kombináció valamelyik változóját korlátozza, és a
+  metszet nem üres, de szűkebb (a nem szűkítő bővítés csak ismétlődő
+  eseteket adna). A kombinációs tér így sosem kerül a memóriába.
+- Az azonos bemeneti vektorú eseteket hash-halmaz szűri (csak a vektorok
+  hash-ét tároljuk), az első előfordulás marad meg.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from bisect import bisect_right
+from decimal import Decimal
+from math import inf, isfinite
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from Checking_process.intervals import Interval, Numeric, build_intervals, interval_empty
+from Checking_process.rule_model import Variable
+from Checking_process.rule_set import RuleSet
+from Evaluation.rule_compiler import CompiledRule, CompiledRules, Condition, compile_rules
+from Instrumentation.metrics import METRICS
+
+
+# Alapértelmezés: egyes szabályok és szabálypárok
+DEFAULT_MAX_ORDER = 2
+
+_STEP_NAME = re.compile(r"^min_(\w+)_step$")
+
+_FULL_INTERVAL: Interval = (-inf, False, inf, False)
+
+# (pont megnevezése, érték) – None érték: a változó hiányzik a vektorból
+Point = Tuple[str, Any]
+
+
+def _numeric(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not (isinstance(value, float) and not isfinite(value))
+
+
+def _decimals(value: Numeric) -> int:
+    if isinstance(value, int):
+        return 0
+    exponent = Decimal(repr(value)).as_tuple().exponent
+    return max(0, -exponent) if isinstance(exponent, int) else 0
+
+
+def _offset(value: Numeric, delta: Numeric) -> Numeric:
+    """
+    value + delta, a lebegőpontos zaj nélkül (200 - 0.1 = 199.9).
+    """
+    result = value + delta
+    if isinstance(result, int):
+        return result
+    return round(result, max(_decimals(value), _decimals(delta)))
+
+
+def _contains(interval: Interval, value: Numeric) -> bool:
+    lo, lo_inc, hi, hi_inc = interval
+    return (lo < value or (lo_inc and lo == value)) and (value < hi or (hi_inc and value == hi))
+
+
+def _intersect(a: Interval, b: Interval) -> Interval:
+    lo, lo_inc = max((a[0], not a[1]), (b[0], not b[1]))
+    hi, hi_inc = min((a[2], a[3]), (b[2], b[3]))
+    return lo, not lo_inc, hi, hi_inc
+
+
+class _Box:
+    """
+    Egy szabály (kombináció) feltételei a bemeneti változókon:
+        intervals – numerikus intervallumok
+        pinned    – nem numerikus "==" értékek
+        excluded  – "!=" értékek
+    """
+
+    __slots__ = ("intervals", "pinned", "excluded")
+
+    def __init__(
+        self,
+        intervals: Dict[str, Interval],
+        pinned: Dict[str, Any],
+        excluded: Dict[str, Tuple[Any, ...]],
+    ):
+        self.intervals = intervals
+        self.pinned = pinned
+        self.excluded = excluded
+
+    def variables(self) -> List[str]:
+        return sorted(set(self.intervals) | set(self.pinned) | set(self.excluded))
+
+    def satisfiable(self) -> bool:
+        for var, interval in self.intervals.items():
+            if interval_empty(interval) or var in self.pinned:
+                return False
+            lo, _, hi, _ = interval
+            if lo == hi and lo in self.excluded.get(var, ()):
+                return False
+        for var, value in self.pinned.items():
+            if value in self.excluded.get(var, ()):
+                return False
+        return True
+
+    def merge(self, other: "_Box") -> Optional["_Box"]:
+        """
+        A két doboz metszete (None, ha üres).
+        """
+        intervals = dict(self.intervals)
+        for var, interval in other.intervals.items():
+            current = intervals.get(var)
+            intervals[var] = interval if current is None else _intersect(current, interval)
+        pinned = dict(self.pinned)
+        for var, value in other.pinned.items():
+            if pinned.setdefault(var, value) != value:
+                return None
+        excluded = dict(self.excluded)
+        for var, values in other.excluded.items():
+            excluded[var] = tuple(dict.fromkeys(excluded.get(var, ()) + values))
+        box = _Box(intervals, pinned, excluded)
+        return box if box.satisfiable() else None
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, _Box)
+            and self.intervals == other.intervals
+            and self.pinned == other.pinned
+            and self.excluded == other.excluded
+        )
+
+
+def _rule_box(rule: CompiledRule, inputs: Dict[str, None]) -> Optional[_Box]:
+    """
+    A szabály feltételdoboza, vagy None, ha nem készíthető hozzá eset.
+    """
+    if rule.never:
+        return None
+    numeric: List[Condition] = []
+    pinned: Dict[str, Any] = {}
+    excluded: Dict[str, Tuple[Any, ...]] = {}
+    for cond in rule.conditions:
+        if cond.variable not in inputs:
+            continue
+        if cond.value is None:
+            if cond.operator == "!=":
+                continue
+            return None
+        if cond.operator == "!=":
+            excluded[cond.variable] = excluded.get(cond.variable, ()) + (cond.value,)
+        elif _numeric(cond.value):
+            numeric.append(cond)
+        elif cond.operator == "==":
+            if pinned.setdefault(cond.variable, cond.value) != cond.value:
+                return None
+        else:
+            return None
+    box = _Box(build_intervals(numeric), pinned, excluded)
+    return box if box.satisfiable() else None
+
+
+class _Domain:
+    """
+    A bemeneti változók tulajdonságai: típus és lépésköz.
+    """
+
+    def __init__(self, requirements_data: Dict[str, Any] | RuleSet, compiled: CompiledRules,
+                 steps: Optional[Dict[str, Numeric]]):
+        if isinstance(requirements_data, RuleSet):
+            declared = requirements_data.variables
+        else:
+            declared = requirements_data.get("variables", [])
+        info = {v["name"]: v for v in declared if isinstance(v, (dict, Variable)) and isinstance(v.get("name"), str)}
+
+        assigned = set(compiled.outputs)
+        self.inputs: Dict[str, None] = {}
+        for rule in compiled.rules:
+            for cond in rule.conditions:
+                if cond.variable not in assigned:
+                    self.inputs.setdefault(cond.variable)
+        self.booleans = {var for var in self.inputs if info.get(var, {}).get("type") == "boolean"}
+
+        # min_<név>_step = szám hatások
+        step_values: List[Tuple[str, Numeric, Any]] = []
+        for rule in compiled.rules:
+            for eff in rule.effects:
+                match = _STEP_NAME.match(eff.variable)
+                if match and eff.formula is None and _numeric(eff.value) \
+                        and not isinstance(eff.value, bool) and eff.value > 0:
+                    step_values.append((match.group(1), eff.value, info.get(eff.variable, {}).get("unit")))
+
+        decimals: Dict[str, int] = {}
+        for rule in compiled.rules:
+            for cond in rule.conditions:
+                if cond.variable in self.inputs and _numeric(cond.value):
+                    decimals[cond.variable] = max(decimals.get(cond.variable, 0), _decimals(cond.value))
+
+        self.steps: Dict[str, Numeric] = {}
+        for var in self.inputs:
+            unit = info.get(var, {}).get("unit")
+            by_name = [step for stem, step, _ in step_values if f"_{stem}_" in f"_{var}_"]
+            by_unit = [step for _, step, step_unit in step_values if unit is not None and step_unit == unit]
+            if by_name or by_unit:
+                self.steps[var] = min(by_name or by_unit)
+            elif info.get(var, {}).get("type") == "integer" or not decimals.get(var):
+                self.steps[var] = 1
+            else:
+                self.steps[var] = float(Decimal(1).scaleb(-decimals[var]))
+        self.steps.update(steps or {})
+
+    def points(self, box: _Box, var: str) -> Tuple[Any, List[Point]]:
+        """
+        (belső pont, határpontok) egy változóra.
+        """
+        excluded = box.excluded.get(var, ())
+        if var in box.pinned:
+            return box.pinned[var], [("value", box.pinned[var]), ("missing", None)]
+
+        interval = box.intervals.get(var, _FULL_INTERVAL)
+        if var in self.booleans:
+            values = [value for value in (False, True) if _contains(interval, value) and value not in excluded]
+            return (values[0] if values else None), [("false", False), ("true", True)]
+
+        step = self.steps.get(var, 1)
+        lo, lo_inc, hi, hi_inc = interval
+        points: List[Point] = []
+        if lo == hi:
+            points += [("value-step", _offset(lo, -step)), ("value", lo), ("value+step", _offset(lo, step))]
+        else:
+            if lo != -inf:
+                points += [("lower-step", _offset(lo, -step)), ("lower", lo), ("lower+step", _offset(lo, step))]
+            if hi != inf:
+                points += [("upper-step", _offset(hi, -step)), ("upper", hi), ("upper+step", _offset(hi, step))]
+        for value in excluded:
+            if _numeric(value):
+                points += [("excluded-step", _offset(value, -step)), ("excluded+step", _offset(value, step))]
+            points.append(("excluded", value))
+
+        candidates: List[Numeric] = []
+        if lo != -inf and hi != inf:
+            middle = round((lo + hi) / 2 / step) * step
+            candidates.append(round(middle, _decimals(step)) if isinstance(middle, float) else middle)
+        if lo != -inf:
+            candidates.append(_offset(lo, step))
+        if hi != inf:
+            candidates.append(_offset(hi, -step))
+        candidates += [lo, hi]
+        if lo == -inf and hi == inf:
+            candidates += [0] + [_offset(value, step) for value in excluded if _numeric(value)]
+        candidates.append((lo + hi) / 2)
+        for value in candidates:
+            if _numeric(value) and _contains(interval, value) and value not in excluded:
+                return value, points
+        return None, points
+
+
+def _box_cases(domain: _Domain, box: _Box) -> Iterator[Tuple[Optional[str], str, Dict[str, Any]]]:
+    """
+    (változó, pont, bemeneti vektor) – előbb a belső pont, majd
+    változónként a határpontok.
+    """
+    variables = box.variables()
+    inner: Dict[str, Any] = {}
+    points: Dict[str, List[Point]] = {}
+    for var in variables:
+        inner[var], points[var] = domain.points(box, var)
+    base = {var: value for var, value in inner.items() if value is not None}
+    yield None, "inner", base
+    for var in variables:
+        for name, value in points[var]:
+            vector = dict(base)
+            if value is None:
+                vector.pop(var, None)
+            else:
+                vector[var] = value
+            yield var, name, vector
+
+
+def _combinations(
+    boxes: List[Optional[_Box]],
+    max_order: Optional[int],
+) -> Iterator[Tuple[List[int], _Box]]:
+    """
+    (szabályindexek, metszet-doboz), mélységi bejárással, lustán.
+    """
+    by_variable: Dict[str, List[int]] = {}
+    for index, box in enumerate(boxes):
+        if box is not None:
+            for var in box.variables():
+                by_variable.setdefault(var, []).append(index)
+
+    def following(members: List[int], box: _Box) -> Iterator[int]:
+        # a kombináció változóit korlátozó, későbbi szabályok, növekvő sorrendben
+        last = members[-1]
+        slices = []
+        for var in box.variables():
+            indices = by_variable[var]
+            slices.append(map(indices.__getitem__, range(bisect_right(indices, last), len(indices))))
+        previous = None
+        for other in heapq.merge(*slices):
+            if other != previous:
+                previous = other
+                yield other
+
+    for index, box in enumerate(boxes):
+        if box is None:
+            continue
+        METRICS.count("boundary_cases.combinations")
+        yield [index], box
+        # veremkeretek: (tagok, metszet, a még ki nem próbált bővítések)
+        stack = [([index], box, following([index], box))]
+        while stack:
+            members, current, candidates = stack[-1]
+            if max_order is not None and len(members) >= max_order:
+                stack.pop()
+                continue
+            for other in candidates:
+                merged = current.merge(boxes[other])
+                # a nem szűkítő bővítés részfája egy testvérágéval azonos dobozokat ad
+                if merged is not None and merged != current:
+                    extended = members + [other]
+                    METRICS.count("boundary_cases.combinations")
+                    yield extended, merged
+                    stack.append((extended, merged, following(extended, merged)))
+                    break
+            else:
+                stack.pop()
+
+
+def boundary_cases(
+    requirements_data: Dict[str, Any] | RuleSet,
+    max_order: Optional[int] = DEFAULT_MAX_ORDER,
+    steps: Optional[Dict[str, Numeric]] = None,
+    compiled: Optional[CompiledRules] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Határérték-tesztesetek, lustán:
+        {"rules": [szabály id-k], "variable": változó vagy None,
+         "point": pont megnevezése, "inputs": bemeneti vektor}
+
+    max_order: a kombinációk legnagyobb mérete (None = korlátlan).
+    steps: változónkénti lépésköz, felülírja a kikövetkeztetettet.
+    compiled: a már lefordított szabálykészlet (ha van).
+    """
+    if compiled is None:
+        compiled = compile_rules(requirements_data)
+    domain = _Domain(requirements_data, compiled, steps)
+    boxes = [_rule_box(rule, domain.inputs) for rule in compiled.rules]
+
+    seen: set = set()
+    for members, box in _combinations(boxes, max_order):
+        rule_ids = [compiled.rules[index].id for index in members]
+        for var, point, vector in _box_cases(domain, box):
+            # a teljes vektor a kulcs (hash-ütközés nem ejthet ki esetet), a
+            # típussal együtt, hogy {a: True} és {a: 1} külön eset maradjon
+            key = tuple((name, type(value), value) for name, value in sorted(vector.items()))
+            if key in seen:
+                METRICS.count("boundary_cases.duplicates")
+                continue
+            seen.add(key)
+            METRICS.count("boundary_cases.cases")
+            yield {"rules": rule_ids, "variable": var, "point": point, "inputs": vector}
@@ -0,0 +1,370 @@
+"""
+Evaluation/rule_arrays.py
+
+Cél:
+- Opcionális, NumPy-alapú oszlopos (batch) kiértékelés a lefordított
+  szabályokhoz (CompiledRules.evaluate_columns): sok rekord egyszerre,
+  változónként egy tömbbel.
+
+Működés:
+- Változónként egy (értékek, meghatározott-maszk) tömbpár. Szabályonként a
+  feltételekből sormaszk készül, a hatások a maszk sorait írják felül – a
+  sorrend és a felülírás ugyanaz, mint a rekordonkénti generált kódban.
+- Numerikus / boolean oszlopon az összehasonlítások és a képletek NumPy
+  műveletek. A hiányzó operandus, a nullával osztás és a nem véges
+  kerekítés a Python-úthoz hasonlóan meghatározatlan eredményt ad.
+- Ahol a Python-szemantika nem képezhető le pontosan (objektum oszlop,
+  string érték, nagy egészek), ott soronkénti Python-kiértékelés fut,
+  ugyanazzal a hibakezeléssel, mint a rekordonkénti kódban.
+- A bemenet oszlopai lehetnek listák, tömbök vagy maszkolt tömbök (maszkolt
+  vagy None elem = hiányzó érték). A kimenet változónként
+  np.ma.MaskedArray, a maszk a meghatározatlan sorokat jelöli.
+"""
+
+from __future__ import annotations
+
+import ast
+import operator
+from functools import reduce
+from typing import Any, Dict, Optional, Tuple
+
+from Instrumentation.metrics import METRICS
+
+try:
+    import numpy as np
+except ImportError:  # a NumPy opcionális függőség
+    np = None
+
+
+HAS_NUMPY = np is not None
+
+# az objektum (soronként Python-kiértékelt) oszlopok dtype-ja
+_OBJECT = np.dtype(object) if HAS_NUMPY else None
+
+_COMPARISONS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+# ennél nagyobb egészek float64-ben már nem pontosak
+_EXACT_INT = 2 ** 53
+
+# (értékek, meghatározott-maszk)
+Column = Tuple[Any, Any]
+
+
+class _RowFallback(Exception):
+    """
+    A képlet nem számolható pontosan tömbműveletekkel – soronként számoljuk.
+    """
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError("Az oszlopos kiértékeléshez telepíteni kell a NumPy csomagot.")
+
+
+def _numeric_scalar(value: Any) -> bool:
+    if isinstance(value, bool):
+        return True
+    if isinstance(value, int):
+        return abs(value) <= _EXACT_INT
+    return isinstance(value, float)
+
+
+# -------------------- bemenet -------------------- #
+
+def _packed_objects(values: Any, defined: Any) -> Any:
+    """
+    Objektum-tömb tömör numerikus alakja, ha minden meghatározott eleme
+    pontosan ábrázolható szám (None-t is tartalmazó listákhoz).
+    """
+    items = [v for v, d in zip(values.tolist(), defined.tolist()) if d]
+    if not all(_numeric_scalar(v) for v in items):
+        return values
+    if items and all(isinstance(v, bool) for v in items):
+        dtype = bool
+    elif all(isinstance(v, int) for v in items):
+        dtype = np.int64
+    else:
+        dtype = np.float64
+    packed = np.zeros(len(values), dtype=dtype)
+    packed[defined] = items
+    return packed
+
+
+def _input_column(column: Any, length: int) -> Column:
+    if np.ma.isMaskedArray(column):
+        values = np.ma.getdata(column)
+        defined = ~np.ma.getmaskarray(column)
+    elif isinstance(column, np.ndarray):
+        values = column
+        defined = None
+    else:
+        values = np.asarray(column)
+        if values.dtype.kind not in "biuf":
+            # nem tisztán numerikus lista: objektum-tömb, hogy a vegyes elemek
+            # ne alakuljanak szöveggé ([1, 'x'] → '<U21'); a tömör alakot
+            # _packed_objects adja
+            values = np.asarray(column, dtype=object)
+        defined = None
+
+    if values.ndim != 1 or len(values) != length:
+        raise ValueError("Minden oszlopnak azonos hosszú, egydimenziós tömbnek kell lennie.")
+    if values.dtype.kind not in "biuf":
+        values = values.astype(object)
+    if defined is None:
+        if values.dtype == _OBJECT:
+            defined = np.fromiter((v is not None for v in values.tolist()), dtype=bool, count=length)
+        else:
+            defined = np.ones(length, dtype=bool)
+    if values.dtype == _OBJECT:
+        values = _packed_objects(values, defined)
+    elif values.dtype.kind == "u" or (
+        values.dtype.kind == "i" and len(values) and np.abs(values).max() > _EXACT_INT
+    ):
+        values = values.astype(object)
+    return values, defined
+
+
+def _column_length(columns: Dict[str, Any]) -> int:
+    for column in columns.values():
+        return len(column)
+    raise ValueError("Oszlopok nélkül a length paramétert meg kell adni.")
+
+
+# -------------------- feltételek -------------------- #
+
+def _object_compare(values: Any, defined: Any, op: str, value: Any) -> Any:
+    compare = _COMPARISONS[op]
+    items = values.tolist()
+    hit = np.zeros(len(items), dtype=bool)
+    for i in np.flatnonzero(defined).tolist():
+        try:
+            hit[i] = bool(compare(items[i], value))
+        except TypeError:
+            pass
+    return hit
+
+
+def _condition_mask(column: Column, op: str, value: Any) -> Any:
+    values, defined = column
+    if values.dtype != _OBJECT and _numeric_scalar(value):
+        with np.errstate(invalid="ignore"):
+            return defined & _COMPARISONS[op](values, value)
+    return _object_compare(values, defined, op, value)
+
+
+# -------------------- képletek -------------------- #
+
+def _formula_arrays(node: ast.expr, state: Dict[str, Column], length: int) -> Column:
+    """
+    A képlet értéke és meghatározottsága tömbműveletekkel.
+    """
+    if isinstance(node, ast.Constant):
+        return node.value, True
+
+    if isinstance(node, ast.Name):
+        column = state.get(node.id)
+        if column is None:
+            return np.zeros(length), np.zeros(length, dtype=bool)
+        values, defined = column
+        if values.dtype == _OBJECT:
+            raise _RowFallback
+        if values.dtype == bool:
+            # Pythonban True + True == 2, NumPy-ban True
+            values = values.astype(np.int64)
+        return values, defined
+
+    if isinstance(node, ast.UnaryOp):
+        values, defined = _formula_arrays(node.operand, state, length)
+        return (-values if isinstance(node.op, ast.USub) else +values), defined
+
+    if isinstance(node, ast.BinOp):
+        left, left_def = _formula_arrays(node.left, state, length)
+        right, right_def = _formula_arrays(node.right, state, length)
+        defined = left_def & right_def
+        if isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)):
+            defined = defined & (right != 0)
+        elif isinstance(node.op, ast.Pow):
+            # NumPy egészek negatív kitevőre hibát dobnak, Python floatot ad
+            left = np.asarray(left, dtype=np.float64)
+            right = np.asarray(right)
+            with np.errstate(all="ignore"):
+                defined = defined & ~((left == 0) & (right < 0)) & ~((left < 0) & (right % 1 != 0))
+        with np.errstate(all="ignore"):
+            values = _ARITHMETIC[type(node.op)](left, right)
+        if isinstance(node.op, ast.Pow):
+            # Pythonban a float-túlcsordulás OverflowError
+            defined = defined & (np.isfinite(values) | ~(np.isfinite(left) & np.isfinite(right)))
+        return values, defined
+
+    if isinstance(node, ast.Call):
+        args = [_formula_arrays(arg, state, length) for arg in node.args]
+        name = node.func.id
+        defined = reduce(operator.and_, (d for _, d in args))
+        if name in ("max", "min"):
+            if len(args) == 1:
+                # max(x) számra Pythonban TypeError
+                return np.zeros(length), np.zeros(length, dtype=bool)
+            ufunc = np.maximum if name == "max" else np.minimum
+            return reduce(ufunc, (v for v, _ in args)), defined
+        if name == "abs":
+            return np.abs(args[0][0]), defined
+        # round
+        if len(args) == 2 and not isinstance(node.args[1], ast.Constant):
+            raise _RowFallback
+        values = args[0][0]
+        with np.errstate(all="ignore"):
+            rounded = np.round(values, int(node.args[1].value) if len(args) == 2 else 0)
+        if len(args) == 1:
+            defined = defined & np.isfinite(values)
+        return rounded, defined
+
+    raise _RowFallback
+
+
+def _formula_rows(formula: Any, state: Dict[str, Column], mask: Any, length: int) -> Column:
+    """
+    A képlet soronként, a rekordonkénti kóddal azonos hibakezeléssel.
+    """
+    function = formula.function()
+    operands = []
+    present = np.ones(length, dtype=bool)
+    for name in formula.names:
+        column = state.get(name)
+        if column is None:
+            return np.empty(length, dtype=object), np.zeros(length, dtype=bool)
+        operands.append(column[0].tolist())
+        present &= column[1]
+
+    values = np.empty(length, dtype=object)
+    defined = np.zeros(length, dtype=bool)
+    for i in np.flatnonzero(mask & present).tolist():
+        try:
+            values[i] = function(*(col[i] for col in operands))
+        except (ArithmeticError, TypeError, ValueError):
+            continue
+        defined[i] = True
+    return values, defined
+
+
+def _formula_column(formula: Any, state: Dict[str, Column], mask: Any, length: int) -> Column:
+    try:
+        values, defined = _formula_arrays(formula.node, state, length)
+    except _RowFallback:
+        return _formula_rows(formula, state, mask, length)
+    values = np.asarray(values)
+    if values.ndim == 0:
+        values = np.full(length, values)
+    if not isinstance(defined, np.ndarray):
+        defined = np.full(length, bool(defined))
+    return values, defined
+
+
+# -------------------- hatások -------------------- #
+
+def _value_dtype(value: Any) -> Any:
+    if isinstance(value, (bool, float)) or (isinstance(value, int) and _numeric_scalar(value)):
+        return np.asarray(value).dtype
+    return _OBJECT
+
+
+def _assign(
+    state: Dict[str, Column],
+    owned: set,
+    var: str,
+    mask: Any,
+    values: Any,
+    defined: Any,
+    dtype: Any,
+) -> None:
+    """
+    A mask sorainak felülírása. values lehet skalár vagy teljes hosszú tömb.
+    """
+    current, current_def = state[var]
+    if current.dtype == _OBJECT or dtype == _OBJECT:
+        target = _OBJECT
+    else:
+        target = np.result_type(current.dtype, dtype)
+    if var not in owned or target != current.dtype:
+        # a hívó tömbjeit nem írjuk felül
+        current = current.astype(target)
+        current_def = current_def.copy()
+        owned.add(var)
+
+    if isinstance(values, np.ndarray):
+        current[mask] = values[mask]
+        current_def[mask] = defined[mask]
+    elif defined:
+        current[mask] = values
+        current_def[mask] = True
+    else:
+        current_def[mask] = False
+    state[var] = (current, current_def)
+
+
+def evaluate_columns(
+    compiled: Any,
+    columns: Dict[str, Any],
+    length: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    A lefordított szabályok (rule_compiler.CompiledRules) kiértékelése
+    oszlopokon: változónév -> értékek (lista / tömb / maszkolt tömb).
+
+    Visszatér: minden outputs változóra egy np.ma.MaskedArray.
+    """
+    require_numpy()
+    if length is None:
+        length = _column_length(columns)
+
+    with METRICS.stage("evaluate.batch"):
+        METRICS.count("evaluate.rows", length)
+        state: Dict[str, Column] = {}
+        owned: set = set()
+        for var in compiled.variables:
+            if var in columns:
+                state[var] = _input_column(columns[var], length)
+            else:
+                state[var] = (np.zeros(length, dtype=bool), np.zeros(length, dtype=bool))
+                owned.add(var)
+
+        for rule in compiled.rules:
+            if rule.never:
+                continue
+            mask = np.ones(length, dtype=bool)
+            for cond in rule.conditions:
+                mask &= _condition_mask(state[cond.variable], cond.operator, cond.value)
+            if not mask.any():
+                continue
+
+            for eff in rule.effects:
+                if eff.formula is None:
+                    _assign(state, owned, eff.variable, mask, eff.value,
+                            eff.value is not None, _value_dtype(eff.value))
+                    continue
+                values, defined = _formula_column(eff.formula, state, mask, length)
+                if values.dtype.kind not in "biufO":
+                    values = values.astype(object)
+                _assign(state, owned, eff.variable, mask, values, defined, values.dtype)
+
+        result: Dict[str, Any] = {}
+        for var in compiled.outputs:
+            values, defined = state[var]
+            result[var] = np.ma.array(values, mask=~defined)
+        return result
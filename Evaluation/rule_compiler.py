@@ -0,0 +1,518 @@
+"""
+Evaluation/rule_compiler.py
+
+Cél:
+- A követelmények végrehajtása: egy requirements dict (vagy RuleSet)
+  lefordítása olyan kiértékelővé, amely bemeneti rekordokra (pl.
+  rendelésekre) kiszámolja a szabályok által meghatározott változókat.
+
+Szemantika (az ellenőrzőkkel egyezően):
+- A szabályok az inputs, majd az outputs sorrendjében, egyetlen menetben
+  futnak; a hatások listája a rule_set.rule_effects szerinti (effects,
+  illetve outputs-nál rules + effects). A későbbi szabály felülírja a
+  korábbi értéket, és a későbbi szabályok már a frissített értékeket látják.
+- Feltétel: a Causes elemei ÉS kapcsolatban (üres Causes = mindig
+  teljesül). Operátorok: ">", ">=", "<", "<=", "==" ("=" ennek írásmódja)
+  és "!=". A boolean szám is (True == 1), mint az intervals.py-ban.
+  Hiányzó (None) változóra, illetve össze nem hasonlítható típusokra a
+  feltétel nem teljesül. Ismeretlen operátorú feltétel sosem teljesül
+  (a fordítás figyelmeztetést ad róla).
+- Hatás: csak "=" (mint a RuleSet.assignments-nél). Szám / boolean érték
+  konstans. A string érték képlet, ha Python-kifejezésként értelmezhető
+  (+ - * / // % ** ^, max/min/abs/round) és nem egyetlen ismeretlen név;
+  különben szöveges konstans (pl. "failed", "very good").
+- Képletben hiányzó operandus vagy számítási hiba (pl. nullával osztás)
+  esetén az eredmény None (meghatározatlan).
+
+Működés:
+- A szabálykészletből egyszer Python forráskód készül (CompiledRules.source):
+  változónként egy lokális, szabályonként egy if-blokk, a képletek
+  beágyazott kifejezésként. A rekordonkénti kiértékelés így egyetlen
+  függvényhívás, dict-lookup és értelmezői bejárás nélkül.
+- Oszlopos (batch) kiértékelés NumPy tömbökkel: rule_arrays.py.
+"""
+
+from __future__ import annotations
+
+import ast
+import math
+from functools import lru_cache
+from typing import Any, Callable, Container, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Checking_process.rule_model import Condition as ModelCondition, Effect as ModelEffect, RuleDecoder, Variable
+from Checking_process.rule_set import RuleSet, rule_effects
+from Instrumentation.metrics import METRICS
+
+
+CONDITION_OPERATORS = (">", ">=", "<", "<=", "==", "!=")
+
+# írásmód-változatok
+_OPERATOR_ALIASES = {"=": "=="}
+
+# képletekben hívható függvények
+FORMULA_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "max": max,
+    "min": min,
+    "abs": abs,
+    "round": round,
+}
+
+
+def _real_pow(base: Any, exponent: Any) -> Any:
+    # negatív alap törtkitevővel Pythonban komplex szám – a valósban nincs értéke
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise ValueError("complex power")
+    return result
+
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+# ennyi különböző szerkezetű szabály lefordított sablonját tartjuk meg
+RULE_TEMPLATE_CACHE = 4096
+
+# számítási hibák, amelyeknél a képlet eredménye meghatározatlan
+_FORMULA_ERRORS = (ArithmeticError, TypeError, ValueError)
+
+
+# -------------------- képletek -------------------- #
+
+class Formula:
+    """
+    Egy string értékű hatás képletként értelmezve.
+
+        text   – az eredeti szöveg
+        node   – ellenőrzött ast kifejezés (csak számok, nevek, aritmetika
+                 és FORMULA_FUNCTIONS hívások)
+        names  – a hivatkozott változók, első előfordulás szerint
+    """
+
+    __slots__ = ("text", "node", "names", "_function")
+
+    def __init__(self, text: str, node: ast.expr, names: List[str]):
+        self.text = text
+        self.node = node
+        self.names = names
+        self._function: Optional[Callable[..., Any]] = None
+
+    def function(self) -> Callable[..., Any]:
+        """
+        A képlet mint függvény (argumentumok a names sorrendjében).
+        Hibát nem nyel el – azt a hívó kezeli.
+        """
+        if self._function is None:
+            args = [f"_a{i}" for i in range(len(self.names))]
+            body = _formula_source(self.node, dict(zip(self.names, args)))
+            namespace = dict(FORMULA_FUNCTIONS, _real_pow=_real_pow)
+            exec(f"def _f({', '.join(args)}):\n    return {body}\n", namespace)
+            self._function = namespace["_f"]
+        return self._function
+
+
+def parse_formula(text: str, known: Container[str]) -> Optional[Formula]:
+    """
+    A string hatásérték képletként, vagy None, ha szöveges konstans.
+    known: az ismert változónevek (egyetlen ismeretlen név = konstans).
+    """
+    try:
+        tree = ast.parse(text.strip().replace("^", "**"), mode="eval")
+    except SyntaxError:
+        return None
+
+    names: List[str] = []
+    if not _valid_formula(tree.body, names):
+        return None
+    if isinstance(tree.body, ast.Name) and tree.body.id not in known:
+        return None
+    return Formula(text, tree.body, names)
+
+
+def _valid_formula(node: ast.expr, names: List[str]) -> bool:
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, (int, float)) and not isinstance(node.value, bool)
+    if isinstance(node, ast.Name):
+        if node.id not in names:
+            names.append(node.id)
+        return True
+    if isinstance(node, ast.BinOp):
+        return (
+            isinstance(node.op, _BINARY_OPERATORS)
+            and _valid_formula(node.left, names)
+            and _valid_formula(node.right, names)
+        )
+    if isinstance(node, ast.UnaryOp):
+        return isinstance(node.op, _UNARY_OPERATORS) and _valid_formula(node.operand, names)
+    if isinstance(node, ast.Call):
+        return (
+            isinstance(node.func, ast.Name)
+            and node.func.id in FORMULA_FUNCTIONS
+            and not node.keywords
+            and len(node.args) >= 1
+            and all(_valid_formula(arg, names) for arg in node.args)
+        )
+    return False
+
+
+def _formula_source(node: ast.expr, slots: Dict[str, str]) -> str:
+    """
+    A képlet Python-forrása, a változónevek helyén a slots szerinti nevekkel.
+    """
+
+    class _Rename(ast.NodeTransformer):
+        def visit_Call(self, call: ast.Call) -> ast.Call:
+            # a függvénynév maradjon, csak az argumentumokat nevezzük át
+            call.args = [self.visit(arg) for arg in call.args]
+            return call
+
+        def visit_BinOp(self, node: ast.BinOp) -> ast.expr:
+            self.generic_visit(node)
+            if not isinstance(node.op, ast.Pow):
+                return node
+            call = ast.Call(func=ast.Name(id="_real_pow", ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+            return ast.copy_location(call, node)
+
+        def visit_Name(self, name: ast.Name) -> ast.Name:
+            return ast.copy_location(ast.Name(id=slots[name.id], ctx=ast.Load()), name)
+
+    copy = ast.parse(ast.unparse(node), mode="eval").body
+    return ast.unparse(_Rename().visit(copy))
+
+
+# -------------------- lefordított szabályok -------------------- #
+
+class Condition:
+    __slots__ = ("variable", "operator", "value")
+
+    def __init__(self, variable: str, operator: str, value: Any):
+        self.variable = variable
+        self.operator = operator
+        self.value = value
+
+
+class Effect:
+    """
+    Egy "=" hatás: value konstans, vagy formula (Formula), ha az nem None.
+    """
+
+    __slots__ = ("variable", "value", "formula")
+
+    def __init__(self, variable: str, value: Any, formula: Optional[Formula]):
+        self.variable = variable
+        self.value = value
+        self.formula = formula
+
+
+class CompiledRule:
+    __slots__ = ("id", "conditions", "effects", "never")
+
+    def __init__(self, rule_id: Any, conditions: List[Condition], effects: List[Effect], never: bool):
+        self.id = rule_id
+        self.conditions = conditions
+        self.effects = effects
+        # ismeretlen operátorú feltétel miatt sosem teljesül
+        self.never = never
+
+    def variables(self) -> List[str]:
+        """
+        A szabály által olvasott vagy írt változók, első előfordulás szerint.
+        """
+        names: Dict[str, None] = {}
+        for cond in self.conditions:
+            names.setdefault(cond.variable)
+        for eff in self.effects:
+            if eff.formula is not None:
+                for name in eff.formula.names:
+                    names.setdefault(name)
+            names.setdefault(eff.variable)
+        return list(names)
+
+
+class CompiledRules:
+    """
+    Végrehajtható szabálykészlet.
+
+    Attribútumok:
+        rules      – CompiledRule lista, végrehajtási sorrendben
+        variables  – minden hivatkozott változó (első előfordulás szerint)
+        outputs    – a szabályok által beállított változók
+        source     – a generált rekordonkénti kiértékelő forráskódja
+        warnings   – fordítási figyelmeztetések (pl. ismeretlen operátor)
+    """
+
+    def __init__(self, rules: List[CompiledRule], variables: List[str], warnings: List[str]):
+        self.rules = rules
+        self.variables = variables
+        seen: Dict[str, None] = {}
+        for rule in rules:
+            for eff in rule.effects:
+                seen.setdefault(eff.variable)
+        self.outputs: List[str] = list(seen)
+        self.warnings = warnings
+        self.source, constants = _generate_source(self)
+        namespace = _namespace(constants)
+        exec(compile(self.source, "<compiled rules>", "exec"), namespace)
+        self._evaluate: Callable[[Dict[str, Any]], Dict[str, Any]] = namespace["_evaluate"]
+
+    def evaluate(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Egy bemeneti rekord (változónév -> érték) kiértékelése.
+        Visszatér: minden outputs változó értéke (None, ha meghatározatlan).
+        """
+        return self._evaluate(record)
+
+    def evaluate_many(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Rekordfolyam kiértékelése, lustán.
+        """
+        return map(self._evaluate, records)
+
+    def evaluate_columns(self, columns: Dict[str, Any], length: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Oszlopos kiértékelés NumPy tömbökön (lásd rule_arrays.py).
+        """
+        from Evaluation.rule_arrays import evaluate_columns
+
+        return evaluate_columns(self, columns, length)
+
+
+def _slot_names(variables: List[str]) -> Dict[str, str]:
+    return {var: f"v{i}" for i, var in enumerate(variables)}
+
+
+def _literal(value: Any, constants: Dict[str, Any]) -> str:
+    """
+    Konstans a generált kódban: literál, ha biztonságosan visszaolvasható,
+    különben névvel a névtérből (pl. inf, nan).
+    """
+    if value is None or isinstance(value, (bool, int, str)):
+        return repr(value)
+    if isinstance(value, float) and math.isfinite(value):
+        return repr(value)
+    name = f"_k{len(constants)}"
+    constants[name] = value
+    return name
+
+
+def _conditions_source(
+    conditions: List[Condition],
+    slots: Dict[str, str],
+    literal: Callable[[Any], str],
+) -> str:
+    # előbb a hiányzó változók (változónként egyszer), aztán az összehasonlítások
+    present = dict.fromkeys(f"{slots[c.variable]} is not None" for c in conditions)
+    tests = [f"{slots[c.variable]} {c.operator} {literal(c.value)}" for c in conditions]
+    return " and ".join(list(present) + tests)
+
+
+def _rule_lines(
+    rule: CompiledRule,
+    slots: Dict[str, str],
+    literal: Callable[[Any], str],
+    names: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    """
+    Egy szabály blokkja a generált függvényben (behúzás: egy szint).
+    names: ha meg van adva, a beállított változókat ezekkel a névkifejezésekkel
+    a state / assigned dict-be is visszaírjuk (rule_function-höz).
+    """
+    if rule.never:
+        return []
+    lines = [] if names is not None else [f"    # {str(rule.id)!r}"]
+    indent = "    "
+    if rule.conditions:
+        test = _conditions_source(rule.conditions, slots, literal)
+        lines += [
+            "    try:",
+            f"        hit = {test}",
+            "    except TypeError:",
+            "        hit = False",
+            "    if hit:",
+        ]
+        indent = "        "
+
+    for eff in rule.effects:
+        target = slots[eff.variable]
+        if eff.formula is None:
+            lines.append(f"{indent}{target} = {literal(eff.value)}")
+            continue
+        expr = _formula_source(eff.formula.node, slots)
+        operands = " and ".join(f"{slots[n]} is not None" for n in eff.formula.names)
+        if not operands:
+            lines.append(f"{indent}{target} = {expr}")
+            continue
+        lines += [
+            f"{indent}if {operands}:",
+            f"{indent}    try:",
+            f"{indent}        {target} = {expr}",
+            f"{indent}    except _FORMULA_ERRORS:",
+            f"{indent}        {target} = None",
+            f"{indent}else:",
+            f"{indent}    {target} = None",
+        ]
+
+    if names is not None:
+        for var in dict.fromkeys(eff.variable for eff in rule.effects):
+            lines.append(f"{indent}state[{names[var]}] = assigned[{names[var]}] = {slots[var]}")
+    return lines
+
+
+def _namespace(constants: Dict[str, Any]) -> Dict[str, Any]:
+    namespace: Dict[str, Any] = dict(FORMULA_FUNCTIONS, _real_pow=_real_pow, **constants)
+    namespace["_FORMULA_ERRORS"] = _FORMULA_ERRORS
+    return namespace
+
+
+@lru_cache(maxsize=RULE_TEMPLATE_CACHE)
+def _rule_template(source: str) -> Callable[..., Callable[[Dict[str, Any], Dict[str, Any]], None]]:
+    namespace = _namespace({})
+    exec(compile(source, "<rule template>", "exec"), namespace)
+    return namespace["_make"]
+
+
+def rule_function(rule: CompiledRule) -> Callable[[Dict[str, Any], Dict[str, Any]], None]:
+    """
+    Egyetlen szabály mint függvény: f(state, assigned). A state az aktuális
+    változóértékek dict-je; teljesülő feltételnél a beállított értékek a
+    state-be és az assigned-be is bekerülnek (lásd rule_index.py).
+
+    A konstansok és a változónevek paraméterek, így az azonos szerkezetű
+    szabályok egyetlen lefordított sablonon osztoznak – a compile() költsége
+    szerkezetenként egyszer jelentkezik, nem szabályonként.
+    """
+    params: List[Any] = []
+
+    def param(value: Any) -> str:
+        params.append(value)
+        return f"_k{len(params) - 1}"
+
+    slots = _slot_names(rule.variables())
+    names = {var: param(var) for var in slots}
+    body = _rule_lines(rule, slots, param, names) or ["    pass"]
+
+    lines = [
+        f"def _make({', '.join(f'_k{i}' for i in range(len(params)))}):",
+        "    def _rule(state, assigned):",
+        "        get = state.get",
+    ]
+    lines += [f"        {slot} = get({names[var]})" for var, slot in slots.items()]
+    lines += ["    " + line for line in body]
+    lines.append("    return _rule")
+    return _rule_template("\n".join(lines) + "\n")(*params)
+
+
+def _generate_source(compiled: CompiledRules) -> Tuple[str, Dict[str, Any]]:
+    """
+    A rekordonkénti kiértékelő forrása és a forrásba nem írható konstansok.
+    """
+    slots = _slot_names(compiled.variables)
+    constants: Dict[str, Any] = {}
+    lines = ["def _evaluate(record):", "    get = record.get"]
+    for var in compiled.variables:
+        lines.append(f"    {slots[var]} = get({var!r})")
+
+    for rule in compiled.rules:
+        lines += _rule_lines(rule, slots, lambda value: _literal(value, constants))
+
+    result = ", ".join(f"{var!r}: {slots[var]}" for var in compiled.outputs)
+    lines.append(f"    return {{{result}}}")
+    return "\n".join(lines) + "\n", constants
+
+
+# -------------------- fordítás -------------------- #
+
+def rule_items(requirements_data: Dict[str, Any] | RuleSet) -> Iterator[Tuple[str, Any, Tuple, Tuple]]:
+    """
+    (section, id, Causes, hatások) a végrehajtás sorrendjében; a feltételek
+    és hatások rule_model objektumok.
+    """
+    if isinstance(requirements_data, RuleSet):
+        for rule in requirements_data.rules:
+            yield rule["section"], rule["id"], rule["causes"], rule["effects"]
+        return
+    decoder = RuleDecoder()
+    for section in ("inputs", "outputs"):
+        for item in requirements_data.get(section, []):
+            rule = decoder.rule(item)
+            rule_id = rule.id if rule.id is not None else "<no-id>"
+            yield section, rule_id, rule.causes, rule_effects(rule, section)
+
+
+def referenced_variables(causes: Iterable[ModelCondition], effects: Iterable[ModelEffect]) -> Iterator[str]:
+    """
+    A feltételek és hatások változónevei (a képletek nevei nélkül).
+    """
+    for items in (causes, effects):
+        for item in items:
+            if isinstance(item.variable, str):
+                yield item.variable
+
+
+def declared_variables(requirements_data: Dict[str, Any] | RuleSet) -> List[str]:
+    if isinstance(requirements_data, RuleSet):
+        variables = requirements_data.variables
+    else:
+        variables = requirements_data.get("variables", [])
+    return [v["name"] for v in variables if isinstance(v, (dict, Variable)) and isinstance(v.get("name"), str)]
+
+
+def compile_rule(
+    rule_id: Any,
+    causes: Iterable[ModelCondition],
+    effects: Iterable[ModelEffect],
+    variables: Dict[str, None],
+    warnings: List[str],
+) -> CompiledRule:
+    """
+    Egy szabály fordítása. variables: az ismert változók (a képletek
+    neveivel bővül), warnings: ide kerülnek a figyelmeztetések.
+    """
+    conditions: List[Condition] = []
+    never = False
+    for c in causes:
+        var, op = c.variable, c.operator
+        op = _OPERATOR_ALIASES.get(op, op)
+        if not isinstance(var, str) or op not in CONDITION_OPERATORS:
+            warnings.append(
+                f"Szabály {rule_id}: a(z) {var!r} {c.operator!r} feltétel "
+                f"nem értelmezhető, a szabály sosem teljesül."
+            )
+            never = True
+            continue
+        conditions.append(Condition(var, op, c.value))
+
+    compiled_effects: List[Effect] = []
+    for e in effects:
+        var = e.variable
+        if not isinstance(var, str) or e.operator != "=":
+            continue
+        value = e.value
+        if value is None and e.expression is not None:
+            value = e.expression
+        formula = parse_formula(value, variables) if isinstance(value, str) else None
+        if formula is not None:
+            for name in formula.names:
+                variables.setdefault(name)
+        compiled_effects.append(Effect(var, value, formula))
+
+    return CompiledRule(rule_id, conditions, compiled_effects, never)
+
+
+def compile_rules(requirements_data: Dict[str, Any] | RuleSet) -> CompiledRules:
+    """
+    Requirements dict vagy RuleSet → CompiledRules.
+    """
+    with METRICS.stage("evaluate.compile"):
+        items = list(rule_items(requirements_data))
+
+        variables: Dict[str, None] = dict.fromkeys(declared_variables(requirements_data))
+        for _, _, causes, effects in items:
+            for var in referenced_variables(causes, effects):
+                variables.setdefault(var)
+
+        rules: List[CompiledRule] = []
+        warnings: List[str] = []
+        for _, rule_id, causes, effects in items:
+            rules.append(compile_rule(rule_id, causes, effects, variables, warnings))
+
+        return CompiledRules(rules, list(variables), warnings)
@@ -0,0 +1,437 @@
+"""
+Evaluation/rule_index.py
+
+Cél:
+- Rekordonkénti kiértékelés úgy, hogy csak azok a szabályok fussanak,
+  amelyek feltételei az adott rekordon egyáltalán teljesülhetnek: a
+  költség a lehetséges találatokkal nőjön, ne a szabályok számával.
+- Szabályok hozzáadása és törlése a teljes index újraépítése nélkül.
+
+Működés (diszkriminációs index):
+- Minden szabály egy "horgony" feltételt kap egy olyan változón, amelyet
+  egyetlen szabály sem állít be (tiszta bemenet). Ennek értéke a teljes
+  kiértékelés alatt a rekordbeli érték, így előre szűrhetünk rá:
+    - "==" feltétel hash-elhető értékkel → érték-index (dict),
+    - a változó nem üres numerikus intervalluma (intervals.build_intervals)
+      → intervallum-index (_IntervalIndex): egy értéket tartalmazó
+      intervallumok néhány bisect és a találatokkal arányos szűrés árán
+      jönnek elő.
+  A feltételek közül a becsült legkisebb találati arányú a horgony (lásd
+  RuleIndex._selectivity), egyenlőségnél az érték-index az előnyös.
+- Horgony nélküli szabály (csak beállított változóra vagy "!="-re
+  vonatkozó feltétel, illetve feltétel nélküli szabály) mindig jelölt;
+  üres intervallumú vagy értelmezhetetlen feltételű szabály sosem.
+- A jelöltek a végrehajtási sorrendben (inputs, majd outputs, azon belül
+  hozzáadási sorrend) futnak, szabályonként lefordított függvénnyel
+  (rule_compiler.rule_function) – az eredmény azonos a CompiledRules-éval.
+- Hozzáadás / törlés a rendezett listákba szúr / onnan töröl (bisect);
+  csak a tömeges felépítés rendez egyben. Ha egy új szabály egy eddig
+  tiszta bemeneti változót állít be, az arra horgonyzott szabályok új
+  horgonyt kapnak. Törléskor nem horgonyzunk át (a jelöltek így is
+  helyesek), és a horgonyválasztás statisztikái sem csökkennek.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from math import frexp, inf, ldexp
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Checking_process.intervals import Interval, Numeric, build_intervals, interval_empty
+from Checking_process.rule_model import Rule, RuleDecoder
+from Checking_process.rule_set import RuleSet, rule_effects
+from Evaluation.rule_compiler import (
+    CompiledRule,
+    compile_rule,
+    declared_variables,
+    referenced_variables,
+    rule_function,
+    rule_items,
+)
+from Instrumentation.metrics import METRICS
+
+
+_SECTION_RANK = {"inputs": 0, "outputs": 1}
+
+_INTERVAL_OPERATORS = (">", ">=", "<", "<=", "==")
+
+# (fajta, változó, kulcs) – fajta: "value", "interval", "always", "never"
+Anchor = Tuple[str, Optional[str], Any]
+
+
+def _point(value: Any) -> bool:
+    # intervallumban kereshető érték (a NaN semmivel sem összehasonlítható)
+    return isinstance(value, (int, float)) and value == value
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class _IntervalIndex:
+    """
+    Egy változó intervallum-horgonyai.
+
+    A kétoldalt korlátos intervallumok szélesség-osztályokba kerülnek
+    (e: 2^(e-1) <= szélesség < 2^e), osztályonként alsó határ szerint
+    rendezve. A v pontot tartalmazók alsó határa [v - 2^e, v]-be esik, így
+    osztályonként két bisect és egy rövid szűrés elég. Az egyoldalú
+    intervallumok a véges határuk szerint rendezett listában vannak, ott a
+    találatok (a határon fekvők kivételével) egy összefüggő szelet.
+    """
+
+    def __init__(self):
+        self.intervals: Dict[int, Interval] = {}
+        # osztály -> (rendezési határok, intervallumok, horgonyok)
+        self._classes: Dict[Any, Tuple[List[Numeric], List[Interval], List[int]]] = {}
+        # szélesség-osztály -> 2^e
+        self._widths: Dict[Any, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    @staticmethod
+    def _place(interval: Interval) -> Tuple[Any, Numeric]:
+        """
+        (osztály, rendezési határ) – osztály: szélesség-kitevő, vagy "below"
+        (alulról nyílt, felső határ szerint), "above" (felülről nyílt, alsó
+        határ szerint), "all".
+        """
+        lo, _, hi, _ = interval
+        if lo == -inf:
+            return ("all" if hi == inf else "below"), hi
+        if hi == inf:
+            return "above", lo
+        return frexp(hi - lo)[1], lo
+
+    def _class(self, cls: Any) -> Tuple[List[Numeric], List[Interval], List[int]]:
+        lists = self._classes.get(cls)
+        if lists is None:
+            lists = self._classes[cls] = ([], [], [])
+            if isinstance(cls, int):
+                try:
+                    self._widths[cls] = ldexp(1.0, cls)
+                except OverflowError:
+                    self._widths[cls] = inf
+        return lists
+
+    def add(self, handle: int, interval: Interval, defer: bool = False) -> None:
+        """
+        defer: tömeges felvételnél csak rögzítünk, a hívó rebuild()-et hív.
+        """
+        self.intervals[handle] = interval
+        if defer:
+            return
+        cls, bound = self._place(interval)
+        bounds, intervals, handles = self._class(cls)
+        pos = bisect_right(bounds, bound)
+        bounds.insert(pos, bound)
+        intervals.insert(pos, interval)
+        handles.insert(pos, handle)
+
+    def rebuild(self) -> None:
+        by_class: Dict[Any, List[Tuple[Numeric, int]]] = {}
+        for handle, interval in self.intervals.items():
+            cls, bound = self._place(interval)
+            by_class.setdefault(cls, []).append((bound, handle))
+        self._classes = {}
+        for cls, items in by_class.items():
+            items.sort()
+            bounds, intervals, handles = self._class(cls)
+            bounds.extend(bound for bound, _ in items)
+            intervals.extend(self.intervals[handle] for _, handle in items)
+            handles.extend(handle for _, handle in items)
+
+    def remove(self, handle: int) -> None:
+        cls, bound = self._place(self.intervals.pop(handle))
+        bounds, intervals, handles = self._classes[cls]
+        pos = bisect_left(bounds, bound)
+        while handles[pos] != handle:
+            pos += 1
+        del bounds[pos], intervals[pos], handles[pos]
+        if not handles:
+            del self._classes[cls]
+
+    def stab(self, value: Any) -> List[int]:
+        """
+        A value-t tartalmazó intervallumok horgonyai.
+        """
+        found: List[int] = []
+        for cls, (bounds, intervals, handles) in self._classes.items():
+            if cls == "all":
+                found.extend(handles)
+                continue
+            if cls == "below":
+                # hi > value mind jó, hi == value csak zártan
+                start = bisect_left(bounds, value)
+                stop = bisect_right(bounds, value, start)
+                found.extend(handles[pos] for pos in range(start, stop) if intervals[pos][3])
+                found.extend(handles[stop:])
+                continue
+            if cls == "above":
+                start = bisect_left(bounds, value)
+                stop = bisect_right(bounds, value, start)
+                found.extend(handles[:start])
+                found.extend(handles[pos] for pos in range(start, stop) if intervals[pos][1])
+                continue
+            start = bisect_left(bounds, value - self._widths[cls])
+            stop = bisect_right(bounds, value, start)
+            for pos in range(start, stop):
+                lo, lo_inc, hi, hi_inc = intervals[pos]
+                if (lo < value or lo_inc) and (value < hi or (hi_inc and value == hi)):
+                    found.append(handles[pos])
+        return found
+
+
+class RuleIndex:
+    """
+    Inkrementálisan bővíthető, indexelt szabálykészlet rekordonkénti
+    kiértékeléshez.
+
+    Attribútumok:
+        outputs   – a szabályok által beállított változók
+        warnings  – fordítási figyelmeztetések
+    """
+
+    def __init__(self, requirements_data: Dict[str, Any] | RuleSet | None = None):
+        self.warnings: List[str] = []
+        self._rules: Dict[int, CompiledRule] = {}
+        self._functions: Dict[int, Callable[[Dict[str, Any], Dict[str, Any]], None]] = {}
+        self._order: Dict[int, Tuple[int, int]] = {}
+        self._by_id: Dict[Any, List[int]] = {}
+        self._next = 0
+        self._decoder = RuleDecoder()
+
+        # ismert változók (a képletek felismeréséhez, mint compile_rules-ban)
+        self._variables: Dict[str, None] = {}
+        # beállított változó -> hány szabály állítja be
+        self._assigned: Dict[str, int] = {}
+
+        # horgonyválasztáshoz: szabályonkénti intervallumok, változónként a
+        # látott véges határok (min, max) és "==" értékek
+        self._rule_intervals: Dict[int, Dict[str, Interval]] = {}
+        self._bounds: Dict[str, List[Numeric]] = {}
+        self._distinct: Dict[str, set] = {}
+
+        self._anchors: Dict[int, Anchor] = {}
+        self._anchored_on: Dict[str, Dict[int, None]] = {}
+        self._values: Dict[str, Dict[Any, Dict[int, None]]] = {}
+        self._intervals: Dict[str, _IntervalIndex] = {}
+        self._always: Dict[int, None] = {}
+
+        if requirements_data is None:
+            return
+        with METRICS.stage("rule_index.build"):
+            items = list(rule_items(requirements_data))
+            self._variables.update(dict.fromkeys(declared_variables(requirements_data)))
+            for _, _, causes, effects in items:
+                self._variables.update(dict.fromkeys(referenced_variables(causes, effects)))
+
+            # előbb minden beállítás ismert legyen, csak utána horgonyzunk
+            handles = [self._insert(section, rule_id, causes, effects) for section, rule_id, causes, effects in items]
+            for handle in handles:
+                self._anchor(handle, defer=True)
+            for index in self._intervals.values():
+                index.rebuild()
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    @property
+    def outputs(self) -> List[str]:
+        return list(self._assigned)
+
+    # -------------------- módosítás -------------------- #
+
+    def add_rule(self, rule: Dict[str, Any] | Rule, section: str = "inputs") -> int:
+        """
+        Egy szabály (nyers dict vagy rule_model.Rule) felvétele a section
+        végére. Visszatér: belső azonosító.
+        """
+        rule = self._decoder.rule(rule)
+        causes = rule.causes
+        effects = rule_effects(rule, section)
+        self._variables.update(dict.fromkeys(referenced_variables(causes, effects)))
+
+        newly_assigned = [
+            var for var in dict.fromkeys(
+                e.variable for e in effects if e.operator == "="
+            )
+            if isinstance(var, str) and var not in self._assigned
+        ]
+        handle = self._insert(section, rule.id if rule.id is not None else "<no-id>", causes, effects)
+
+        # az eddig tiszta bemenetre horgonyzott szabályok új horgonyt kapnak
+        for var in newly_assigned:
+            for other in list(self._anchored_on.get(var, ())):
+                self._unanchor(other)
+                self._anchor(other)
+        self._anchor(handle)
+        return handle
+
+    def remove_rule(self, rule_id: Any) -> int:
+        """
+        Az adott azonosítójú szabály(ok) törlése. Visszatér: törölt darabszám.
+        """
+        handles = self._by_id.pop(rule_id, [])
+        for handle in handles:
+            self._unanchor(handle)
+            rule = self._rules.pop(handle)
+            del self._rule_intervals[handle]
+            for var in dict.fromkeys(eff.variable for eff in rule.effects):
+                self._assigned[var] -= 1
+                if not self._assigned[var]:
+                    del self._assigned[var]
+            del self._functions[handle]
+            del self._order[handle]
+        return len(handles)
+
+    def _insert(self, section: str, rule_id: Any, causes: List, effects: List) -> int:
+        rule = compile_rule(rule_id, causes, effects, self._variables, self.warnings)
+        handle = self._next
+        self._next += 1
+
+        self._rules[handle] = rule
+        self._functions[handle] = rule_function(rule)
+        self._order[handle] = (_SECTION_RANK.get(section, 1), handle)
+        self._by_id.setdefault(rule_id, []).append(handle)
+        for var in dict.fromkeys(eff.variable for eff in rule.effects):
+            self._assigned[var] = self._assigned.get(var, 0) + 1
+
+        # build_intervals a többi operátorra is felvesz (teljes) intervallumot
+        intervals = build_intervals(c for c in rule.conditions if c.operator in _INTERVAL_OPERATORS)
+        self._rule_intervals[handle] = intervals
+        for var, (lo, _, hi, _) in intervals.items():
+            bounds = self._bounds.setdefault(var, [inf, -inf])
+            for bound in (lo, hi):
+                if bound not in (-inf, inf):
+                    bounds[0] = min(bounds[0], bound)
+                    bounds[1] = max(bounds[1], bound)
+        for cond in rule.conditions:
+            if cond.operator == "==" and _hashable(cond.value):
+                self._distinct.setdefault(cond.variable, set()).add(cond.value)
+        return handle
+
+    # -------------------- horgonyok -------------------- #
+
+    def _selectivity(self, var: str, interval: Optional[Interval]) -> float:
+        """
+        A horgony becsült találati aránya (kisebb = jobb). "==" esetén
+        1 / a változón látott "==" értékek száma; kétoldalt korlátos
+        intervallumnál a szélesség a látott határok terjedelméhez képest;
+        egyoldalúnál 1/2.
+        """
+        if interval is None or interval[0] == interval[2]:
+            return 1.0 / max(1, len(self._distinct.get(var, ())))
+        lo, _, hi, _ = interval
+        if lo == -inf or hi == inf:
+            return 0.5
+        low, high = self._bounds[var]
+        return (hi - lo) / (high - low) if high > low else 1.0
+
+    def _choose_anchor(self, handle: int) -> Anchor:
+        rule = self._rules[handle]
+        if rule.never:
+            return ("never", None, None)
+        intervals = self._rule_intervals[handle]
+        if any(interval_empty(iv) for iv in intervals.values()):
+            return ("never", None, None)
+
+        # (becsült arány, "==" előnyben, változónév) szerint a legjobb
+        best: Optional[Tuple[Tuple[float, int, str], Anchor]] = None
+        for cond in rule.conditions:
+            if cond.operator != "==" or cond.variable in self._assigned:
+                continue
+            if cond.value != cond.value or not _hashable(cond.value):
+                continue
+            key = (self._selectivity(cond.variable, None), 0, cond.variable)
+            if best is None or key < best[0]:
+                best = (key, ("value", cond.variable, cond.value))
+
+        for var, interval in intervals.items():
+            if var in self._assigned:
+                continue
+            key = (self._selectivity(var, interval), 1, var)
+            if best is None or key < best[0]:
+                best = (key, ("interval", var, interval))
+
+        return best[1] if best is not None else ("always", None, None)
+
+    def _anchor(self, handle: int, defer: bool = False) -> None:
+        anchor = self._choose_anchor(handle)
+        self._anchors[handle] = anchor
+        kind, var, key = anchor
+        if kind == "always":
+            self._always[handle] = None
+            return
+        if kind == "never":
+            return
+        self._anchored_on.setdefault(var, {})[handle] = None
+        if kind == "value":
+            self._values.setdefault(var, {}).setdefault(key, {})[handle] = None
+        else:
+            self._intervals.setdefault(var, _IntervalIndex()).add(handle, key, defer)
+
+    def _unanchor(self, handle: int) -> None:
+        kind, var, key = self._anchors.pop(handle)
+        if kind == "always":
+            del self._always[handle]
+            return
+        if kind == "never":
+            return
+        del self._anchored_on[var][handle]
+        if kind == "value":
+            bucket = self._values[var][key]
+            del bucket[handle]
+            if not bucket:
+                del self._values[var][key]
+        else:
+            self._intervals[var].remove(handle)
+
+    # -------------------- kiértékelés -------------------- #
+
+    def candidates(self, record: Dict[str, Any]) -> List[int]:
+        """
+        A rekordon esetleg teljesülő szabályok, végrehajtási sorrendben.
+        """
+        found = dict(self._always)
+        for var, value in record.items():
+            if value is None:
+                continue
+            values = self._values.get(var)
+            if values is not None:
+                try:
+                    hit = values.get(value)
+                except TypeError:
+                    hit = None
+                if hit:
+                    found.update(hit)
+            index = self._intervals.get(var)
+            if index is not None and _point(value):
+                found.update(dict.fromkeys(index.stab(value)))
+        METRICS.count("rule_index.candidates", len(found))
+        return sorted(found, key=self._order.__getitem__)
+
+    def fired(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Csak a teljesülő szabályok által beállított változók (ritka eredmény).
+        """
+        state = dict(record)
+        assigned: Dict[str, Any] = {}
+        functions = self._functions
+        for handle in self.candidates(record):
+            functions[handle](state, assigned)
+        return assigned
+
+    def evaluate(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Mint CompiledRules.evaluate: minden outputs változó értéke
+        (None, ha meghatározatlan).
+        """
+        result = {var: record.get(var) for var in self._assigned}
+        result.update(self.fired(record))
+        return result
@@ -0,0 +1,164 @@
+"""
+Instrumentation/metrics.py
+
+Beépített mérőréteg: szakaszonkénti falióra-idő, hívásszám és (opcionálisan)
+memóriacsúcs, valamint tetszőleges számlálók (pl. páros összehasonlítások,
+index-találatok az ellenőrzőkben).
+
+Használat:
+    from Instrumentation.metrics import METRICS
+
+    METRICS.enable(memory=True)
+    ... text_to_requirements(...) / run_all_checks(...) ...
+    data = METRICS.snapshot()     # dict, pl. dashboardokhoz
+    print(METRICS.report())       # ember számára olvasható táblázat
+
+Alapból ki van kapcsolva: ilyenkor a stage() egy közös, üres context
+managert ad vissza, a count() pedig azonnal visszatér.
+
+A process poolon futó workerek (parallel.py, batch.py) mérései a saját
+folyamatukban maradnak, a szülő METRICS-be nem kerülnek át; ahol a szülő
+riportjában kellenek, a worker az eltelt időt visszaadja, és a szülő
+record()-dal veszi fel (memóriacsúcs nélkül).
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from contextlib import nullcontext
+from typing import Any, Dict, List
+
+_NO_STAGE = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "start", "peak_before")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        if self.metrics.memory:
+            self.metrics._enter_memory()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        stat = self.metrics._stat(self.name)
+        stat["calls"] += 1
+        stat["seconds"] += elapsed
+        if self.metrics.memory:
+            peak = self.metrics._exit_memory()
+            if stat["peak_bytes"] is None or peak > stat["peak_bytes"]:
+                stat["peak_bytes"] = peak
+
+
+class Metrics:
+    """
+    Szakasz- és számlálógyűjtő.
+
+    stages:   név -> {"calls", "seconds", "peak_bytes"}
+    counters: név -> egész
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {}
+        # egymásba ágyazott szakaszok eddigi memóriacsúcsai
+        self._peaks: List[int] = []
+        self._started_tracemalloc = False
+
+    # -------------------- be / ki -------------------- #
+
+    def enable(self, memory: bool = False) -> None:
+        self.enabled = True
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.memory = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.counters.clear()
+        self._peaks.clear()
+
+    # -------------------- gyűjtés -------------------- #
+
+    def stage(self, name: str):
+        """
+        Context manager egy szakasz méréséhez.
+        """
+        if not self.enabled:
+            return _NO_STAGE
+        return _Stage(self, name)
+
+    def record(self, name: str, seconds: float, calls: int = 1) -> None:
+        """
+        Máshol (pl. egy process pool workerében) mért szakaszidő felvétele.
+        """
+        if self.enabled:
+            stat = self._stat(name)
+            stat["calls"] += calls
+            stat["seconds"] += seconds
+
+    def _stat(self, name: str) -> Dict[str, Any]:
+        stat = self.stages.get(name)
+        if stat is None:
+            stat = self.stages[name] = {"calls": 0, "seconds": 0.0, "peak_bytes": None}
+        return stat
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _enter_memory(self) -> None:
+        # a szülő eddigi csúcsát megőrizzük, mielőtt nullázzuk
+        _, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+
+    def _exit_memory(self) -> int:
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self._peaks.pop())
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        return peak
+
+    # -------------------- kimenet -------------------- #
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "stages": {name: dict(stat) for name, stat in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+    def report(self) -> str:
+        lines = [f"{'szakasz':40s} {'hívás':>8s} {'idő (s)':>10s} {'csúcs (KiB)':>12s}"]
+        for name, stat in sorted(self.stages.items(), key=lambda kv: -kv[1]["seconds"]):
+            peak = stat["peak_bytes"]
+            peak_text = f"{peak / 1024:12.1f}" if peak is not None else f"{'-':>12s}"
+            lines.append(f"{name:40s} {stat['calls']:8d} {stat['seconds']:10.4f} {peak_text}")
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'számláló':40s} {'érték':>8s}")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"{name:40s} {value:8d}")
+        return "\n".join(lines)
+
+
+# A folyamat közös mérője
+METRICS = Metrics()
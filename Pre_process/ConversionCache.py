@@ -0,0 +1,176 @@
+"""
+Pre_process/ConversionCache.py
+
+Tartalom-címzett cache a folyószöveg → JSON konverzióhoz (DataCleaning).
+
+Működés:
+- A kulcsokat a hívó (DataCleaning) számolja: az R-blokk szövegének hash-e
+  a konverziót befolyásoló szótárak (OPERATOR_WORDS, STOPWORDS, ...)
+  verziójával együtt – szótárváltozáskor a régi bejegyzések maguktól
+  érvénytelenné válnak.
+- Blokkonként tároljuk az elkészült input/output szabályt, így egy szabály
+  átírásakor csak az az egy blokk kerül újra parszolásra. Az érték
+  pickle-elve tárolódik, és minden get() új példányt ad: a hívó
+  szabadon módosíthatja a kapott szabályt (server.py, watch.py), a cache
+  ettől nem romlik el.
+- Nyilvántartjuk, melyik JSON fájl melyik szövegtartalomból készült; a
+  load_json_requirements ez alapján dönti el, hogy a JSON elavult-e.
+- Kilakoltatás mentéskor: a max_age-nél régebben használt bejegyzések
+  törlődnek, és legfeljebb max_entries blokk marad (a legrégebben
+  használtak mennek el előbb; az aktuális futás blokkjai mindig maradnak).
+- Memóriában tartott cache-nél (watch.py) a next_run() viszi tovább az
+  aktuális futás blokkjait a következőbe.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import time
+from typing import Any, Dict, Optional
+
+from Instrumentation.metrics import METRICS
+
+
+# A cache fájl felépítésének verziója – változáskor a régi cache érvénytelen
+CACHE_VERSION = 2
+
+# Alapértelmezett korlátok
+MAX_ENTRIES = 500_000
+MAX_AGE = 30 * 24 * 3600  # másodperc
+
+# Fájl-hash számolásakor egyszerre ennyit olvasunk
+_READ_CHUNK = 1 << 20
+
+
+def content_digest(*parts: str) -> str:
+    """
+    Szövegrészek közös sha1 hash-e.
+    """
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """
+    Egy fájl tartalmának sha1 hash-e, darabonként olvasva.
+    """
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ConversionCache:
+    """
+    Lemezen tárolt blokk-cache a szöveg → JSON konverzióhoz.
+
+    entries: kulcs -> {"value": a tárolt érték pickle-elve,
+                       "used": utolsó használat ideje}
+    outputs: JSON útvonal -> a forrásszöveg hash-e
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = MAX_ENTRIES,
+        max_age: float = MAX_AGE,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.outputs: Dict[str, str] = {}
+        self._now = time.time()
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            # sérült / régi cache – üresen indulunk
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        self.entries = data["entries"]
+        self.outputs = data["outputs"]
+
+    # -------------------- blokkok -------------------- #
+
+    def get(self, key: str) -> Any:
+        """
+        A kulcshoz tárolt érték új példánya, vagy None.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            METRICS.count("text_cache.misses")
+            return None
+        self.hits += 1
+        METRICS.count("text_cache.hits")
+        entry["used"] = self._now
+        return pickle.loads(entry["value"])
+
+    def put(self, key: str, value: Any) -> None:
+        # pickle-elve: a hívónál maradó példány módosítása nem hat a cache-re
+        self.entries[key] = {"value": pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), "used": self._now}
+
+    # -------------------- JSON kimenetek -------------------- #
+
+    def source_of(self, json_path: str) -> Optional[str]:
+        """
+        A JSON fájl forrásszövegének hash-e, ha mi generáltuk.
+        """
+        return self.outputs.get(os.path.abspath(json_path))
+
+    def record_output(self, json_path: str, source_digest: str) -> None:
+        self.outputs[os.path.abspath(json_path)] = source_digest
+
+    # -------------------- mentés -------------------- #
+
+    def _evict(self) -> None:
+        limit = self._now - self.max_age
+        kept = {key: e for key, e in self.entries.items() if e["used"] >= limit}
+
+        if len(kept) > self.max_entries:
+            current = sum(1 for e in kept.values() if e["used"] == self._now)
+            keep = max(self.max_entries, current)
+            newest = sorted(kept.items(), key=lambda kv: kv[1]["used"], reverse=True)[:keep]
+            kept = dict(newest)
+
+        self.entries = kept
+
+    def next_run(self) -> "ConversionCache":
+        """
+        A következő futás cache-e a memóriában (lemez nélkül): csak az ebben
+        a futásban használt blokkok maradnak meg, így hosszan futó
+        folyamatban (watch.py) sem nő korlátlanul.
+        """
+        cache = ConversionCache(max_entries=self.max_entries, max_age=self.max_age)
+        cache.entries = {key: e for key, e in self.entries.items() if e["used"] == self._now}
+        cache.outputs = self.outputs
+        return cache
+
+    def save(self) -> None:
+        """
+        Kilakoltatás, majd atomikus kiírás.
+        """
+        if not self.path:
+            return
+        self._evict()
+        data = {
+            "version": CACHE_VERSION,
+            "entries": self.entries,
+            "outputs": self.outputs,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
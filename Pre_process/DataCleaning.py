@@ -17,12 +17,23 @@ FIGYELEM:
 
 from __future__ import annotations
 
+import io
+import itertools
 import json
 import os
 import re
-from typing import Dict, Any, List, Tuple, Optional
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Set, Tuple, Optional
 
+from Checking_process.rule_model import RuleDecoder
 from Dictionaries.operator_words import OPERATOR_WORDS
+from Instrumentation.metrics import METRICS
+from Pre_process.ConversionCache import ConversionCache, content_digest, file_digest
+
+
+Numeric = float | int
 
 
 # -------------------- Szám-szó → szám -------------------- #
@@ -42,17 +53,19 @@ WORD_NUMBERS = {
 }
 
 
+_NUMBER_WORDS_RE = re.compile(r"\b(" + "|".join(WORD_NUMBERS.keys()) + r")\b")
+
+
+def _number_word_repl(match: re.Match) -> str:
+    return str(WORD_NUMBERS[match.group(0)])
+
+
 def normalize_number_words(text: str) -> str:
     """
     Az angol szám-szavakat arab számokra cseréli (pl. five -> 5).
     Nem változtatja meg a szöveg egyéb részeit.
     """
-
-    def repl(match: re.Match) -> str:
-        return str(WORD_NUMBERS[match.group(0)])
-
-    pattern = r"\b(" + "|".join(WORD_NUMBERS.keys()) + r")\b"
-    return re.sub(pattern, repl, text.lower())
+    return _NUMBER_WORDS_RE.sub(_number_word_repl, text.lower())
 
 
 # -------------------- Segéd: snake_case változónév -------------------- #
@@ -93,52 +106,131 @@ def guess_variable_name(pre_chunk: str) -> str:
 
 # -------------------- Operátor + szám keresése -------------------- #
 
-def find_comparison(text: str,
-                    pick: str = "first") -> Tuple[Optional[str], Optional[float], Optional[str]]:
+# Összehasonlító kifejezések, hosszabb elöl (azonos hossznál a szótár sorrendje).
+_COMPARISON_PHRASES = sorted(
+    (phrase for phrase, meta in OPERATOR_WORDS.items() if meta["type"] == "comparison"),
+    key=len,
+    reverse=True,
+)
+_COMPARISON_RANK = {phrase: rank for rank, phrase in enumerate(_COMPARISON_PHRASES)}
+
+# Egyetlen menetben: minden pozíción a leghosszabb illeszkedő kifejezés
+# (átfedő találatok miatt lookahead-ben), illetve a számok.
+_COMPARISON_RE = re.compile(
+    r"(?=(" + "|".join(re.escape(p) for p in _COMPARISON_PHRASES) + r"))"
+    r"|(\d+(?:\.\d+)?)"
+)
+
+
+def scan_comparison(text: str) -> Tuple[Optional[str], Optional[str], int, List[str]]:
     """
-    OPERATOR_WORDS alapján megpróbál operátort + számértéket találni.
-    Visszatér: (operator, value, phrase), pl. (\">=\", 200, \"reaches\").
+    A szöveg normalizált (kisbetűs, szám-szavak nélküli) alakját egyszer
+    bejárva visszaadja:
+        (operator, phrase, offset, numbers)
+    ahol phrase a leghosszabb talált összehasonlító kifejezés, offset az első
+    előfordulásának helye a normalizált szövegben (-1, ha nincs), numbers
+    pedig a talált számok szövegesen.
     """
     t = normalize_number_words(text)
 
     best_phrase = None
-    best_operator = None
-    for phrase, meta in sorted(OPERATOR_WORDS.items(), key=lambda kv: -len(kv[0])):
-        if meta["type"] == "comparison" and phrase in t:
-            best_phrase = phrase
-            best_operator = meta["operator"]
-            break
+    best_rank = len(_COMPARISON_PHRASES)
+    offset = -1
+    numbers: List[str] = []
+
+    for m in _COMPARISON_RE.finditer(t):
+        phrase = m.group(1)
+        if phrase is None:
+            numbers.append(m.group(2))
+            continue
+        rank = _COMPARISON_RANK[phrase]
+        if rank < best_rank:
+            best_phrase, best_rank, offset = phrase, rank, m.start()
 
-    numbers = re.findall(r"(\d+(?:\.\d+)?)", t)
-    if not numbers:
-        return best_operator, None, best_phrase
+    if best_phrase is None:
+        return None, None, -1, numbers
+    return OPERATOR_WORDS[best_phrase]["operator"], best_phrase, offset, numbers
 
-    num_str = numbers[-1] if pick == "last" else numbers[0]
-    val = float(num_str)
+
+def _pick_number(numbers: List[str], pick: str) -> Optional[Numeric]:
+    if not numbers:
+        return None
+    val = float(numbers[-1] if pick == "last" else numbers[0])
     if val.is_integer():
         val = int(val)
+    return val
 
-    return best_operator, val, best_phrase
+
+def find_comparison(text: str,
+                    pick: str = "first") -> Tuple[Optional[str], Optional[float], Optional[str]]:
+    """
+    OPERATOR_WORDS alapján megpróbál operátort + számértéket találni.
+    Visszatér: (operator, value, phrase), pl. (\">=\", 200, \"reaches\").
+    """
+    op, phrase, _, numbers = scan_comparison(text)
+    return op, _pick_number(numbers, pick), phrase
 
 
 # -------------------- R-szabályok kinyerése -------------------- #
 
+# Szabály eleje: R1, R2, R2-1, R10 stb., utána whitespace (akár a sorvége)
+_RULE_HEAD_RE = re.compile(r"(R\d+(?:-\d+)?)\s")
+
+
+def iter_rule_blocks(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Soronként halad (pl. egy univerzális sorvége-módban megnyitott
+    fájlon, ahol minden sor '\\n'-re végződik), és minden R-blokk végén
+    azonnal visszaadja a (rule_id, normalizált szöveg) párt.
+    Egyszerre csak az aktuális blokk sorai vannak a memóriában.
+
+    Szabályok (az extract_rules korábbi regexével egyezően):
+    - új blokk a sor elején álló 'R<n> ' / 'R<n>-<m> ' azonosítóval kezdődik;
+    - az első blokk előtti bevezetőben az első ilyen azonosító a sor
+      közepén is blokkot nyit;
+    - ha az azonosító után a sorban nincs más, a következő nem üres sor
+      akkor is a blokkhoz tartozik, ha azonosítóval kezdődik.
+    """
+    rule_id: Optional[str] = None
+    body: List[str] = []
+    # az azonosító utáni whitespace még nem ért véget (üres fejsor)
+    pending = False
+
+    for line in lines:
+        if pending:
+            if line.isspace():
+                continue
+            pending = False
+            body.append(line)
+            continue
+
+        if rule_id is None:
+            match = _RULE_HEAD_RE.search(line)
+        else:
+            match = _RULE_HEAD_RE.match(line)
+        if match is None:
+            if rule_id is not None:
+                body.append(line)
+            continue
+
+        if rule_id is not None:
+            yield rule_id, " ".join("".join(body).split())
+        rule_id = match.group(1)
+        rest = line[match.end():]
+        body = [rest]
+        pending = not rest or rest.isspace()
+
+    if rule_id is not None:
+        yield rule_id, " ".join("".join(body).split())
+
+
 def extract_rules(text: str) -> Dict[str, str]:
     """
     A szövegből kinyeri az R1, R2, R2-1, ... szabályokat.
     Elvárás: sor elején 'R1 ', 'R2 ' stb.
+    Ismétlődő azonosítónál az utolsó szöveg marad (az első helyén).
     """
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-
-    # R1, R2, R2-1, R10 stb.
-    pattern = r"(R\d+(?:-\d+)?)\s+(.*?)(?=\nR\d+(?:-\d+)?\s+|\Z)"
-    matches = re.findall(pattern, text, flags=re.S)
-
-    rules: Dict[str, str] = {}
-    for rule_id, desc in matches:
-        normalized = " ".join(desc.strip().split())
-        rules[rule_id] = normalized
-    return rules
+    return dict(iter_rule_blocks(io.StringIO(text, newline=None)))
 
 
 # -------------------- IF / THEN szétválasztás -------------------- #
@@ -146,6 +238,9 @@ def extract_rules(text: str) -> Dict[str, str]:
 IF_WORDS = [w for w, meta in OPERATOR_WORDS.items() if meta["type"] == "logical" and meta["operator"] == "IF"]
 THEN_WORDS = [w for w, meta in OPERATOR_WORDS.items() if meta["type"] == "logical" and meta["operator"] == "THEN"]
 
+_IF_WORDS_BY_LEN = sorted(IF_WORDS, key=len, reverse=True)
+_THEN_WORDS_BY_LEN = sorted(THEN_WORDS, key=len, reverse=True)
+
 
 def split_condition_action(desc: str) -> Tuple[str, str]:
     """
@@ -158,7 +253,7 @@ def split_condition_action(desc: str) -> Tuple[str, str]:
     lower = desc.lower()
 
     found_if = None
-    for w in sorted(IF_WORDS, key=len, reverse=True):
+    for w in _IF_WORDS_BY_LEN:
         idx = lower.find(w)
         if idx != -1:
             found_if = (w, idx)
@@ -173,7 +268,7 @@ def split_condition_action(desc: str) -> Tuple[str, str]:
 
     # Nézzük, van-e THEN szó
     found_then = None
-    for w in sorted(THEN_WORDS, key=len, reverse=True):
+    for w in _THEN_WORDS_BY_LEN:
         idx = lower.find(w, if_end)
         if idx != -1:
             found_then = (w, idx)
@@ -215,17 +310,14 @@ def parse_conditions(condition_text: str) -> List[Dict[str, Any]]:
         if not part:
             continue
 
-        op, val, phrase = find_comparison(part)
+        op, phrase, idx, numbers = scan_comparison(part)
         if op is None:
             # Nincs összehasonlító operátor – kihagyjuk vagy placeholder
             continue
+        val = _pick_number(numbers, "first")
 
         # Operátor előtti rész a változójelölt
-        if phrase:
-            idx = normalize_number_words(part.lower()).find(phrase)
-            pre = part[:idx]
-        else:
-            pre = part
+        pre = part[:idx]
         var_name = guess_variable_name(pre)
 
         results.append(
@@ -240,6 +332,14 @@ def parse_conditions(condition_text: str) -> List[Dict[str, Any]]:
     return results
 
 
+# A hatás változónevének kulcsszavai (az első találat nyer)
+EFFECT_KEYWORDS = [
+    "price", "cost", "discount", "reduction", "weight",
+    "grade", "result", "output", "days", "vacation",
+    "delivery", "fee", "label", "category",
+]
+
+
 def parse_effects(action_text: str, rule_id: str) -> List[Dict[str, Any]]:
     """
     Nagyon általános, óvatos heurisztika:
@@ -269,14 +369,9 @@ def parse_effects(action_text: str, rule_id: str) -> List[Dict[str, Any]]:
         value = action_text  # fallback: teljes szöveg
 
     # Változónév becslése: próbáljunk egy kulcsszót keresni
-    keyword_candidates = [
-        "price", "cost", "discount", "reduction", "weight",
-        "grade", "result", "output", "days", "vacation",
-        "delivery", "fee", "label", "category",
-    ]
     lower = action_text.lower()
     var_name = None
-    for kw in keyword_candidates:
+    for kw in EFFECT_KEYWORDS:
         if kw in lower:
             var_name = to_snake_case(kw)
             break
@@ -296,99 +391,252 @@ def parse_effects(action_text: str, rule_id: str) -> List[Dict[str, Any]]:
 
 # -------------------- Szabályok JSON struktúrává alakítása -------------------- #
 
-def build_rules_structure(rules: Dict[str, str]) -> Dict[str, Any]:
+# Ezek valamelyikét tartalmazó szabály output szabály
+OUTPUT_WORDS = ["output", "result", "display"]
+
+# Az output szabály kérdezett változója (az első találat nyer)
+QUESTION_KEYWORDS = ["price to be paid", "result", "output", "grade", "vacation days"]
+
+
+def build_rule_entry(rule_id: str, desc: str) -> Tuple[str, Dict[str, Any]]:
     """
-    A kinyert R-szabályokat (id -> szöveg) JSON struktúrává alakítja:
-    - inputs: IF-es szabályok
-    - outputs: olyan szabályok, amik 'output', 'result' stb. szót tartalmaznak
+    Egyetlen R-szabály JSON alakja: ("inputs" | "outputs", szabály).
     """
-    inputs: List[Dict[str, Any]] = []
-    outputs: List[Dict[str, Any]] = []
-
-    for rule_id, desc in rules.items():
-        lower = desc.lower()
-        is_output = any(w in lower for w in ["output", "result", "display"])
+    lower = desc.lower()
+    is_output = any(w in lower for w in OUTPUT_WORDS)
 
+    with METRICS.stage("text.split_condition_action"):
         cond_text, action_text = split_condition_action(desc)
+    with METRICS.stage("text.parse_conditions"):
         causes = parse_conditions(cond_text)
 
-        if is_output:
-            # Output típus – question + rules
-            question_var = None
-            for kw in ["price to be paid", "result", "output", "grade", "vacation days"]:
-                if kw in lower:
-                    question_var = to_snake_case(kw)
-                    break
-            if question_var is None:
-                question_var = "result_value"
-
-            question = [
-                {
-                    "variable": question_var,
-                    "operator": "=",
-                    "value": "?",
-                }
-            ]
+    if is_output:
+        # Output típus – question + rules
+        question_var = None
+        for kw in QUESTION_KEYWORDS:
+            if kw in lower:
+                question_var = to_snake_case(kw)
+                break
+        if question_var is None:
+            question_var = "result_value"
+
+        question = [
+            {
+                "variable": question_var,
+                "operator": "=",
+                "value": "?",
+            }
+        ]
 
-            rules_list = []
-            # az action_text-ből próbálunk effects-szerű szabályt építeni
+        rules_list = []
+        # az action_text-ből próbálunk effects-szerű szabályt építeni
+        with METRICS.stage("text.parse_effects"):
             effects_like = parse_effects(action_text or desc, rule_id)
-            for eff in effects_like:
-                rules_list.append(
-                    {
-                        "variable": eff["variable"],
-                        "operator": eff["operator"],
-                        "value": eff["value"],
-                        "raw": eff["raw"],
-                    }
-                )
-
-            outputs.append(
-                {
-                    "id": rule_id,
-                    "description": desc,
-                    "question": question,
-                    "rules": rules_list,
-                }
-            )
-        else:
-            effects = parse_effects(action_text or desc, rule_id)
-            inputs.append(
+        for eff in effects_like:
+            rules_list.append(
                 {
-                    "id": rule_id,
-                    "description": desc,
-                    "Causes": causes,
-                    "effects": effects,
+                    "variable": eff["variable"],
+                    "operator": eff["operator"],
+                    "value": eff["value"],
+                    "raw": eff["raw"],
                 }
             )
 
-    return {
-        "inputs": inputs,
-        "outputs": outputs,
+        return "outputs", {
+            "id": rule_id,
+            "description": desc,
+            "question": question,
+            "rules": rules_list,
+        }
+
+    with METRICS.stage("text.parse_effects"):
+        effects = parse_effects(action_text or desc, rule_id)
+    return "inputs", {
+        "id": rule_id,
+        "description": desc,
+        "Causes": causes,
+        "effects": effects,
     }
 
 
-# -------------------- Változók kinyerése -------------------- #
+def _json_fragment(entry: Dict[str, Any]) -> str:
+    """
+    A szabály pontosan úgy, ahogy a requirements.json-ban áll
+    (json.dump(indent=2), a listán belüli behúzással).
+    """
+    text = json.dumps(entry, indent=2, ensure_ascii=False)
+    return "    " + text.replace("\n", "\n    ")
 
-def infer_variables(struct: Dict[str, Any]) -> List[Dict[str, Any]]:
+
+RuleEntry = Tuple[str, Dict[str, Any], Optional[str]]
+
+# Párhuzamos konverziónál egy worker-feladat ennyi R-blokkot kap
+CHUNK_SIZE = 256
+
+# Ennél kevesebb szabálynál a process pool indítása többe kerül, mint a nyereség
+PARALLEL_MIN_RULES = 2000
+
+
+def _convert_block(rule_id: str, desc: str, with_fragment: bool) -> RuleEntry:
+    section, entry = build_rule_entry(rule_id, desc)
+    return section, entry, _json_fragment(entry) if with_fragment else None
+
+
+def _convert_chunk(chunk: List[Tuple[str, str]], with_fragment: bool) -> List[RuleEntry]:
+    # worker oldali feladat: egy darab R-blokk feldolgozása sorrendben
+    return [_convert_block(rule_id, desc, with_fragment) for rule_id, desc in chunk]
+
+
+def _cached_rule_entry(
+    rule_id: str,
+    desc: str,
+    cache: ConversionCache,
+) -> RuleEntry:
     """
-    A inputs/outputs részekből kinyeri a változóneveket és
-    heurisztikusan típus/role értéket rendel hozzájuk.
+    (szakasz, szabály, JSON-részlet) a cache-ből, vagy parszolva.
+    """
+    key = content_digest(CONVERSION_VERSION, rule_id, desc)
+    cached = cache.get(key)
+    if cached is None:
+        cached = _convert_block(rule_id, desc, True)
+        cache.put(key, cached)
+    return cached
+
+
+def _convert_window(
+    window: List[Tuple[str, str]],
+    cache: ConversionCache | None,
+    with_fragment: bool,
+    pool: ProcessPoolExecutor,
+    chunk_size: int,
+) -> List[RuleEntry]:
     """
-    vars_set = set()
+    Egy ablaknyi R-blokk eredménye eredeti sorrendben: a cache-találatok
+    helyben, a többi darabolva, a pool workerein parszolva.
+    """
+    results: List[Optional[RuleEntry]] = [None] * len(window)
+    todo: List[int] = []
+    keys: List[Optional[str]] = []
+
+    for i, (rule_id, desc) in enumerate(window):
+        key = None
+        if cache is not None:
+            key = content_digest(CONVERSION_VERSION, rule_id, desc)
+            cached = cache.get(key)
+            if cached is not None:
+                results[i] = cached
+                continue
+        todo.append(i)
+        keys.append(key)
+
+    chunks = [
+        [window[i] for i in todo[start:start + chunk_size]]
+        for start in range(0, len(todo), chunk_size)
+    ]
+    converted = [
+        result
+        for part in pool.map(_convert_chunk, chunks, [with_fragment] * len(chunks))
+        for result in part
+    ]
+
+    for i, key, result in zip(todo, keys, converted):
+        results[i] = result
+        if cache is not None:
+            cache.put(key, result)
+
+    return results
+
+
+def iter_rule_entries(
+    rules: Dict[str, str] | Iterable[Tuple[str, str]],
+    cache: ConversionCache | None = None,
+    workers: int | None = None,
+    with_fragments: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[RuleEntry]:
+    """
+    (szakasz, szabály, JSON-részlet vagy None) szabályonként, lustán.
+    rules lehet dict vagy (id, szöveg) párok iterátora (iter_rule_blocks).
+
+    - cache megadásakor a változatlan R-blokkokat nem parszoljuk újra, és a
+      kész JSON-részlet is a cache-ből jön (ilyenkor mindig van részlet).
+    - with_fragments: cache nélkül is készüljön JSON-részlet.
+    - workers > 1: a blokkok chunk_size méretű darabokban egy process pool
+      workereihez kerülnek; az eredmény sorrendje és tartalma azonos a
+      sorossal. Iterátor bemenetnél egyszerre csak egy ablaknyi
+      (workers * chunk_size * 2) blokk van a memóriában.
+    """
+    pairs = rules.items() if isinstance(rules, dict) else rules
+    with_fragment = with_fragments or cache is not None
+
+    if workers is None or workers <= 1:
+        for rule_id, desc in pairs:
+            if cache is None:
+                yield _convert_block(rule_id, desc, with_fragment)
+            else:
+                yield _cached_rule_entry(rule_id, desc, cache)
+        return
+
+    window_size = workers * chunk_size * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        iterator = iter(pairs)
+        while True:
+            window = list(itertools.islice(iterator, window_size))
+            if not window:
+                break
+            yield from _convert_window(window, cache, with_fragment, pool, chunk_size)
+
+
+def build_rules_structure(
+    rules: Dict[str, str] | Iterable[Tuple[str, str]],
+    cache: ConversionCache | None = None,
+    fragments: Dict[str, List[str]] | None = None,
+    workers: int | None = None,
+    model: bool = False,
+) -> Dict[str, Any]:
+    """
+    A kinyert R-szabályokat (id -> szöveg) JSON struktúrává alakítja:
+    - inputs: IF-es szabályok
+    - outputs: olyan szabályok, amik 'output', 'result' stb. szót tartalmaznak
+    cache megadásakor a változatlan R-blokkokat nem parszoljuk újra; ha
+    fragments is meg van adva, szakaszonként ebbe kerülnek a szabályok
+    kész JSON-részletei (gyors kiíráshoz). workers > 1 esetén a blokkok
+    párhuzamosan készülnek (lásd iter_rule_entries). model=True esetén a
+    szabályok típusos rule_model.Rule objektumok.
+    """
+    struct: Dict[str, List[Any]] = {"inputs": [], "outputs": []}
+    decoder = RuleDecoder() if model else None
+
+    if isinstance(rules, dict) and len(rules) < PARALLEL_MIN_RULES:
+        workers = None
+
+    for section, entry, fragment in iter_rule_entries(rules, cache, workers):
+        if fragments is not None and fragment is not None:
+            fragments.setdefault(section, []).append(fragment)
+        struct[section].append(decoder.rule(entry) if decoder is not None else entry)
+
+    return struct
 
-    for rule in struct.get("inputs", []):
+
+# -------------------- Változók kinyerése -------------------- #
+
+def _add_rule_variables(vars_set: Set[Tuple[str, str]], section: str, rule: Dict[str, Any]) -> None:
+    """
+    Egy szabály (név, szerepkör) párjai a vars_set-be.
+    """
+    if section == "inputs":
         for c in rule.get("Causes", []):
             vars_set.add((c["variable"], "input"))
         for e in rule.get("effects", []):
             vars_set.add((e["variable"], "eternal-truth"))
-
-    for rule in struct.get("outputs", []):
+    else:
         for q in rule.get("question", []):
             vars_set.add((q["variable"], "output"))
         for r in rule.get("rules", []):
             vars_set.add((r["variable"], "eternal-truth"))
 
+
+def _variables_from_roles(vars_set: Set[Tuple[str, str]]) -> List[Dict[str, Any]]:
     # Ha ugyanarra a névre több szerepkör is jön, preferálunk:
     # output > input > eternal-truth
     role_priority = {"output": 3, "input": 2, "eternal-truth": 1}
@@ -415,60 +663,248 @@ def infer_variables(struct: Dict[str, Any]) -> List[Dict[str, Any]]:
     return variables
 
 
+def infer_variables(struct: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    A inputs/outputs részekből kinyeri a változóneveket és
+    heurisztikusan típus/role értéket rendel hozzájuk.
+    """
+    vars_set: Set[Tuple[str, str]] = set()
+
+    for section in ("inputs", "outputs"):
+        for rule in struct.get(section, []):
+            _add_rule_variables(vars_set, section, rule)
+
+    return _variables_from_roles(vars_set)
+
+
 # -------------------- Fő építőfüggvények -------------------- #
 
-def text_to_requirements(text: str) -> Dict[str, Any]:
+# A konverzió kódjának verziója – a heurisztika változásakor növelendő
+CONVERSION_FORMAT = 1
+
+# A konverzió eredményét befolyásoló minden szótár együttes hash-e;
+# a szöveg → JSON cache kulcsainak része
+CONVERSION_VERSION = content_digest(
+    repr(CONVERSION_FORMAT),
+    repr(sorted(OPERATOR_WORDS.items())),
+    repr(sorted(STOPWORDS)),
+    repr(sorted(WORD_NUMBERS.items())),
+    repr((EFFECT_KEYWORDS, OUTPUT_WORDS, QUESTION_KEYWORDS)),
+)
+
+
+def text_to_requirements(
+    text: str,
+    cache: ConversionCache | None = None,
+    fragments: Dict[str, List[str]] | None = None,
+    workers: int | None = None,
+    model: bool = False,
+) -> Dict[str, Any]:
     """
     Nyers követelményszöveg → JSON struktúra (dict).
+    workers > 1 esetén az R-blokkok process poolon készülnek; az
+    eredmény azonos a soros futáséval. model=True esetén a szabályok és
+    változók típusos rule_model objektumok.
     """
-    rules = extract_rules(text)
-    struct = build_rules_structure(rules)
-    variables = infer_variables(struct)
-
+    with METRICS.stage("text.extract_rules"):
+        rules = extract_rules(text)
+    with METRICS.stage("text.build_rules_structure"):
+        struct = build_rules_structure(rules, cache=cache, fragments=fragments, workers=workers, model=model)
+    with METRICS.stage("text.infer_variables"):
+        variables = infer_variables(struct)
+    METRICS.count("text.rules", len(rules))
+
+    if model:
+        decoder = RuleDecoder()
+        variables = [decoder.variable(v) for v in variables]
     struct["variables"] = variables
     return struct
 
 
+def _write_requirements_json(
+    path: str,
+    data: Dict[str, Any],
+    fragments: Dict[str, List[str]] | None = None,
+) -> None:
+    """
+    json.dump(indent=2)-vel bájtra azonos kiírás; a fragments-ben
+    megadott szakaszok szabályait a kész részletekből fűzzük össze.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        if not fragments:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            return
+
+        parts = []
+        for key, value in data.items():
+            name = json.dumps(key, ensure_ascii=False)
+            if value and key in fragments:
+                body = ",\n".join(fragments[key])
+                parts.append(f"  {name}: [\n{body}\n  ]")
+            else:
+                text = json.dumps(value, indent=2, ensure_ascii=False)
+                parts.append(f"  {name}: " + text.replace("\n", "\n  "))
+        f.write("{\n" + ",\n".join(parts) + "\n}")
+
+
+def _convert_text_file(
+    text_path: str,
+    json_output_path: str,
+    cache: ConversionCache | None,
+    workers: int | None = None,
+) -> Dict[str, Any]:
+    if not os.path.exists(text_path):
+        raise FileNotFoundError(f"A megadott szövegfájl nem található: {text_path}")
+
+    with open(text_path, "r", encoding="utf-8") as f:
+        raw_text = f.read()
+
+    fragments: Dict[str, List[str]] | None = {} if cache is not None else None
+    data = text_to_requirements(raw_text, cache=cache, fragments=fragments, workers=workers)
+    _write_requirements_json(json_output_path, data, fragments)
+
+    if cache is not None:
+        cache.record_output(json_output_path, file_digest(text_path))
+        cache.save()
+
+    return data
+
+
+def stream_text_to_json(
+    text_path: str,
+    json_output_path: str,
+    cache: ConversionCache | None = None,
+    workers: int | None = None,
+) -> int:
+    """
+    Korlátos memóriájú szöveg → JSON konverzió nagy fájlokhoz.
+
+    A szöveget soronként olvassuk (iter_rule_blocks), minden szabályt
+    azonnal kiírunk; az outputs szabályai egy ideiglenes fájlba kerülnek,
+    a variables részhez csak a (név, szerepkör) párokat gyűjtjük.
+    Eltérés a text_to_requirements-től: ismétlődő azonosító esetén
+    mindkét szabály bekerül (a dict-es változat csak az utolsót tartja meg).
+    workers > 1 esetén a blokkok ablakonként process poolon készülnek.
+
+    Visszatér: a kiírt szabályok száma.
+    """
+    if not os.path.exists(text_path):
+        raise FileNotFoundError(f"A megadott szövegfájl nem található: {text_path}")
+
+    vars_set: Set[Tuple[str, str]] = set()
+    counts = {"inputs": 0, "outputs": 0}
+
+    with METRICS.stage("text.stream_to_json"), \
+            open(text_path, "r", encoding="utf-8") as src, \
+            tempfile.TemporaryFile("w+", encoding="utf-8") as spool, \
+            open(json_output_path, "w", encoding="utf-8") as out:
+        targets = {"inputs": out, "outputs": spool}
+        out.write('{\n  "inputs": ')
+
+        entries = iter_rule_entries(iter_rule_blocks(src), cache, workers, with_fragments=True)
+        for section, entry, fragment in entries:
+            _add_rule_variables(vars_set, section, entry)
+            targets[section].write(",\n" if counts[section] else "[\n")
+            targets[section].write(fragment)
+            counts[section] += 1
+
+        out.write("\n  ]" if counts["inputs"] else "[]")
+        out.write(',\n  "outputs": ')
+        if counts["outputs"]:
+            spool.seek(0)
+            shutil.copyfileobj(spool, out)
+            out.write("\n  ]")
+        else:
+            out.write("[]")
+
+        text = json.dumps(_variables_from_roles(vars_set), indent=2, ensure_ascii=False)
+        out.write(',\n  "variables": ' + text.replace("\n", "\n  ") + "\n}")
+
+    total = counts["inputs"] + counts["outputs"]
+    METRICS.count("text.rules", total)
+
+    if cache is not None:
+        cache.record_output(json_output_path, file_digest(text_path))
+        cache.save()
+
+    return total
+
+
 def build_requirements_json(
     text_path: str,
     json_output_path: str = "requirements.json",
+    cache_path: str | None = None,
+    workers: int | None = None,
 ) -> Dict[str, Any]:
     """
     Beolvassa a folyószöveges követelményeket egy .txt fájlból,
     JSON struktúrát épít belőle, és kiírja requirements.json néven.
+    cache_path megadásakor a konverzió R-blokkonként cache-elt, és a cache
+    megjegyzi, hogy a JSON melyik szövegtartalomból készült.
+    workers > 1 esetén a konverzió párhuzamos.
     """
-    if not os.path.exists(text_path):
-        raise FileNotFoundError(f"A megadott szövegfájl nem található: {text_path}")
+    cache = ConversionCache(cache_path) if cache_path else None
+    return _convert_text_file(text_path, json_output_path, cache, workers)
 
-    with open(text_path, "r", encoding="utf-8") as f:
-        raw_text = f.read()
 
-    data = text_to_requirements(raw_text)
+def _json_is_stale(json_path: str, text_path: str, cache: ConversionCache | None) -> bool:
+    """
+    Elavult-e a JSON a forrásszöveghez képest.
+    Ha a cache tudja, miből készült, a tartalmat hasonlítjuk; különben
+    (kézzel írt / cache nélkül generált JSON) a módosítási időt.
+    """
+    if cache is not None:
+        source = cache.source_of(json_path)
+        if source is not None:
+            return source != file_digest(text_path)
+    return os.path.getmtime(text_path) > os.path.getmtime(json_path)
 
-    with open(json_output_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
 
-    return data
+def refresh_json_requirements(
+    json_path: str,
+    text_path: str,
+    cache_path: str | None = None,
+    workers: int | None = None,
+) -> bool:
+    """
+    Ha a JSON hiányzik vagy elavult, korlátos memóriában újragenerálja
+    (stream_text_to_json). True, ha újragenerálta.
+    """
+    cache = ConversionCache(cache_path) if cache_path else None
+    if os.path.exists(json_path) and not _json_is_stale(json_path, text_path, cache):
+        return False
+    stream_text_to_json(text_path, json_path, cache, workers)
+    return True
 
 
 def load_json_requirements(
     json_path: str = "requirements.json",
     text_path: str | None = None,
+    cache_path: str | None = None,
+    workers: int | None = None,
 ) -> Dict[str, Any]:
     """
     Betölti a requirements.json-t.
-    Ha még nem létezik, de van text_path, akkor abból legenerálja.
+    Ha még nem létezik, vagy a text_path szövege azóta megváltozott,
+    akkor abból (újra)generálja.
     """
+    cache = ConversionCache(cache_path) if cache_path else None
+
     if os.path.exists(json_path):
-        with open(json_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        if (
+            text_path is None
+            or not os.path.exists(text_path)
+            or not _json_is_stale(json_path, text_path, cache)
+        ):
+            with open(json_path, "r", encoding="utf-8") as f:
+                return json.load(f)
 
     if text_path is None:
         raise FileNotFoundError(
             f"A(z) '{json_path}' nem található, és text_path sincs megadva."
         )
 
-    return build_requirements_json(text_path, json_output_path=json_path)
+    return _convert_text_file(text_path, json_path, cache, workers)
 
 
 if __name__ == "__main__":
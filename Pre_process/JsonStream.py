@@ -0,0 +1,158 @@
+"""
+Pre_process/JsonStream.py
+
+Inkrementális (streaming) beolvasás nagy requirements.json fájlokhoz.
+
+A teljes fájlt nem töltjük be egyszerre: darabonként (chunk) olvasunk,
+és a "variables", "inputs", "outputs" tömbök elemeit egyenként dekódoljuk
+és adjuk tovább (section, item) párokként. Egyszerre csak egy elem és
+egy olvasási puffer van a memóriában.
+
+Elvárt felépítés: egy JSON objektum a legfelső szinten. Az ismeretlen
+kulcsok értékét beolvassuk és eldobjuk; ha viszont a nem üres objektumban
+egyik szekciókulcs sincs meg, ValueError (mint SchemaLoader.detect_schema),
+hogy az ismeretlen felépítés ne legyen csendben üres szabálykészlet.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterator, TextIO, Tuple
+
+STREAM_SECTIONS = ("variables", "inputs", "outputs")
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+
+
+class _ChunkReader:
+    """
+    Puffer egy szövegfájl fölött: karakterenként / JSON-értékenként
+    halad előre, és csak szükség esetén olvas újabb darabot.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        # a feldolgozott előtagot eldobjuk, hogy a puffer ne nőjön
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.f.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> str:
+        """
+        A következő nem-whitespace karakter ('' fájl végén), fogyasztás nélkül.
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"Hibás JSON: '{ch}' helyett '{got or 'EOF'}' található.")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        Egy teljes JSON-érték dekódolása. Ha a puffer közben elfogy,
+        duplázódó méretű darabokkal olvasunk tovább.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                val, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size = max(size, len(self.buf))
+                continue
+            if end == len(self.buf) and not self.eof:
+                # pl. egy szám a puffer végén még folytatódhat
+                if self._fill(size):
+                    continue
+            self.pos = end
+            return val
+
+
+def iter_json_requirements(
+    f: TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Egy megnyitott requirements.json-ból (section, item) párokat ad vissza,
+    ahol section a "variables" / "inputs" / "outputs" egyike, item pedig a
+    tömb egy eleme – abban a sorrendben, ahogy a fájlban szerepelnek.
+    """
+    reader = _ChunkReader(f, chunk_size)
+    reader.expect("{")
+
+    if reader.peek() == "}":
+        return
+
+    has_section = False
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError("Hibás JSON: kulcsként string várható.")
+        reader.expect(":")
+        has_section = has_section or key in STREAM_SECTIONS
+
+        if key in STREAM_SECTIONS and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield key, reader.value()
+                    nxt = reader.peek()
+                    reader.pos += 1
+                    if nxt == "]":
+                        break
+                    if nxt != ",":
+                        raise ValueError(f"Hibás JSON: ',' vagy ']' helyett '{nxt or 'EOF'}'.")
+        else:
+            # nem streamelt kulcs – beolvassuk és eldobjuk
+            reader.value()
+
+        nxt = reader.peek()
+        reader.pos += 1
+        if nxt == "}":
+            if not has_section:
+                raise ValueError(
+                    "Ismeretlen felépítés: a JSON objektumban nincs 'variables', 'inputs' vagy 'outputs' kulcs."
+                )
+            return
+        if nxt != ",":
+            raise ValueError(f"Hibás JSON: ',' vagy '}}' helyett '{nxt or 'EOF'}'.")
+
+
+def stream_json_requirements(
+    json_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Mint iter_json_requirements, de fájlútvonalból.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        yield from iter_json_requirements(f, chunk_size)
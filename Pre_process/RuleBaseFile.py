@@ -0,0 +1,614 @@
+"""
+Pre_process/RuleBaseFile.py
+
+Cél:
+- A normalizált szabálybázis (rule_model) tömör, bináris, oszlopos
+  tárolása, hogy nagy szabálybázisok JSON-parszolás nélkül, memóriába
+  leképezve (mmap) töltődjenek újra.
+
+Felépítés (natív bájtsorrend, minden oszlop 8 bájtra igazítva):
+    fejléc   – MAGIC, FORMAT_VERSION, az oszlopok száma
+    katalógus – oszloponként: név, típuskód (array modul), eltolás, elemszám
+    oszlopok:
+        meta                – JSON (séma, forrás, elemszámok, egyéb kulcsok)
+        text, text_offsets  – az összes szöveg egy UTF-8 blokkban, és a
+                              dekódolt szövegbeli (karakter-)határaik
+        value_kind,
+        value_data          – az egyedi értékek táblája; value_data 8
+                              bájtja egész, szöveg-index vagy float (ugyanaz
+                              a puffer 'q' és 'd' nézetben)
+        var_*               – változónként egy sor (érték-indexek)
+        cond_*, eff_*       – az egyedi feltételek és hatások (érték-indexek)
+        rule_*              – szabályonként egy sor; a feltétel- és
+                              hatáslisták CSR-alakban (rule_causes_start +
+                              causes stb.)
+
+Heurisztika:
+- Ugyanaz a megosztás, mint a RuleDecoder-ben: az ismétlődő értékek,
+  feltételek és hatások egyszer szerepelnek, a szabályok indexekkel
+  hivatkoznak rájuk.
+- A nem JSON-skalár értékek (lista, objektum, int64-be nem férő egész)
+  JSON-szövegként tárolódnak.
+- Megnyitáskor csak a fejlécet olvassuk; az érték-, feltétel- és
+  hatástábla az első szabály elérésekor épül fel, a szabályok elemenként,
+  igény szerint (lusta szakaszok). Az oszlopok közvetlenül is elérhetők
+  (column; NumPy esetén másolás nélküli tömbként).
+- Más verziójú vagy bájtsorrendű fájlt nem olvasunk (ValueError); cache-ként
+  használva ilyenkor újraépül.
+
+Használat:
+    write_rule_base("requirements.rulebase", requirements)
+    writer = RuleBaseWriter()                  # elemenként, pl. streamelve
+    for section, item in items: writer.add(section, item)
+    writer.write("requirements.rulebase")
+    requirements = read_rule_base("requirements.rulebase")
+    with RuleBaseFile("requirements.rulebase") as rb:
+        ids = rb.column("rule_id")
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from Checking_process.rule_model import Condition, Effect, Rule, RuleDecoder, Variable
+from Instrumentation.metrics import METRICS
+
+try:
+    import numpy as np
+except ImportError:  # a NumPy opcionális függőség
+    np = None
+
+
+HAS_NUMPY = np is not None
+
+# A fájl azonosítója és felépítésének verziója – változáskor a régi fájl érvénytelen
+MAGIC = b"RULEBASE"
+FORMAT_VERSION = 1
+
+# fejléc: MAGIC, verzió, oszlopszám; katalógus-bejegyzés: név, típuskód, eltolás, elemszám
+_HEADER = struct.Struct("=8sII")
+_ENTRY = struct.Struct("=24ssxxxxxxxQQ")
+
+_ALIGN = 8
+
+# Érték-fajták (value_kind)
+_NONE, _FALSE, _TRUE, _INT, _FLOAT, _STR, _JSON = range(7)
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+_SECTIONS = ("inputs", "outputs")
+
+# a Rule üres, de a forrásban szereplő listáinak bitjei (rule_present)
+_PRESENT_BITS = {"Causes": 1, "effects": 2, "rules": 4, "question": 8}
+
+# bitmaszk -> a Rule present argumentuma
+_PRESENT = [tuple(key for key, bit in _PRESENT_BITS.items() if mask & bit) for mask in range(16)]
+
+_NUMPY_TYPES = {"B": "u1", "i": "i4", "q": "i8", "d": "f8"}
+
+
+# -------------------- Írás -------------------- #
+
+class _Writer:
+    """
+    A requirements elemeinek oszlopokra bontása (szöveg- és értéktábla
+    deduplikálva).
+    """
+
+    def __init__(self):
+        self.texts: List[str] = []
+        self._text_index: Dict[str, int] = {}
+        self.value_kind = array("B")
+        self.value_data = array("q")
+        self._value_index: Dict[Tuple[type, Any], int] = {}
+        # id(objektum) -> (sorindex, objektum); az objektumot életben
+        # tartjuk, hogy az id ne kerülhessen újra kiosztásra
+        self._objects: Dict[int, Tuple[int, Any]] = {}
+        self.columns: Dict[str, array] = {}
+
+    def column(self, name: str, typecode: str) -> array:
+        col = self.columns.get(name)
+        if col is None:
+            col = self.columns[name] = array(typecode)
+        return col
+
+    def text(self, s: str) -> int:
+        idx = self._text_index.get(s)
+        if idx is None:
+            idx = self._text_index[s] = len(self.texts)
+            self.texts.append(s)
+        return idx
+
+    def _add_value(self, kind: int, data: int) -> int:
+        self.value_kind.append(kind)
+        self.value_data.append(data)
+        return len(self.value_kind) - 1
+
+    def value(self, v: Any) -> int:
+        """
+        Az érték indexe az értéktáblában; a típus azért része a kulcsnak,
+        mert 1 == 1.0 == True.
+        """
+        t = type(v)
+        if t is str or t is int or t is float or t is bool or v is None:
+            key = (t, v)
+            idx = self._value_index.get(key)
+            if idx is not None:
+                return idx
+            if v is None:
+                idx = self._add_value(_NONE, 0)
+            elif t is bool:
+                idx = self._add_value(_TRUE if v else _FALSE, 0)
+            elif t is str:
+                idx = self._add_value(_STR, self.text(v))
+            elif t is float:
+                idx = self._add_value(_FLOAT, struct.unpack("=q", struct.pack("=d", v))[0])
+            elif _INT64_MIN <= v <= _INT64_MAX:
+                idx = self._add_value(_INT, v)
+            else:
+                idx = self._add_value(_JSON, self.text(json.dumps(v)))
+            self._value_index[key] = idx
+            return idx
+        return self._add_value(_JSON, self.text(json.dumps(v, ensure_ascii=False)))
+
+    def shared(self, obj: Any, table: str, fields: Tuple[str, ...]) -> int:
+        """
+        Egy (a RuleDecoder által megosztott) feltétel / hatás sorindexe;
+        ugyanaz az objektum egyszer kerül a táblába.
+        """
+        known = self._objects.get(id(obj))
+        if known is not None:
+            return known[0]
+        cols = [self.column(f"{table}_{field}", "i") for field in fields]
+        idx = len(cols[0])
+        self._objects[id(obj)] = (idx, obj)
+        for field, col in zip(fields, cols):
+            value = getattr(obj, field)
+            if field == "operator" and isinstance(value, str):
+                # Operator → sima str, hogy a szövegtáblába kerüljön
+                value = str(value)
+            col.append(self.value(value))
+        return idx
+
+
+_COND_FIELDS = ("variable", "operator", "value", "raw")
+_EFF_FIELDS = ("variable", "operator", "value", "expression", "raw")
+_VAR_FIELDS = ("name", "type", "unit", "role")
+_RULE_LISTS = (("causes", "Causes", "cond", _COND_FIELDS),
+               ("effects", "effects", "eff", _EFF_FIELDS),
+               ("rules", "rules", "eff", _EFF_FIELDS),
+               ("question", "question", "eff", _EFF_FIELDS))
+
+
+def _write_columns(path: str, columns: List[Tuple[str, array]]) -> None:
+    """
+    Fejléc, katalógus és 8 bájtra igazított oszlopok atomikus kiírása.
+    """
+    offset = _HEADER.size + _ENTRY.size * len(columns)
+    catalog: List[bytes] = []
+    layout: List[Tuple[int, array]] = []
+    for name, col in columns:
+        offset += -offset % _ALIGN
+        catalog.append(_ENTRY.pack(name.encode("ascii"), col.typecode.encode("ascii"), offset, len(col)))
+        layout.append((offset, col))
+        offset += len(col) * col.itemsize
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(columns)))
+        f.write(b"".join(catalog))
+        for start, col in layout:
+            f.write(b"\0" * (start - f.tell()))
+            # tofile darabonként ír – az oszlopról nem készül bájtmásolat
+            col.tofile(f)
+    os.replace(tmp_path, path)
+
+
+class RuleBaseWriter:
+    """
+    A szabálybázis elemenkénti felépítése: add() a (section, item) párokat
+    veszi át (a JsonStream sorrendjében is), write() írja ki a fájlt. Így a
+    streamelt beolvasás a teljes requirements dict nélkül is cache-elhető.
+
+    A szabályok sorrendje ugyanaz, mint a RuleSet.from_stream-é: az inputs
+    előtt érkező outputs elemeket pufferoljuk. Ha outputs után ismét inputs
+    jön (ismétlődő kulcs), a sorrend nem tartható – in_order hamis lesz, és
+    a write() ValueError-t ad.
+    """
+
+    def __init__(self):
+        self.decoder = RuleDecoder()
+        self.w = w = _Writer()
+        # az üres táblák oszlopai is szerepelnek (egységes katalógus)
+        for table, fields in (("var", ("raw", *_VAR_FIELDS)), ("cond", _COND_FIELDS), ("eff", _EFF_FIELDS)):
+            for field in fields:
+                w.column(f"{table}_{field}", "i")
+        self.var_raw = w.column("var_raw", "i")
+        self.var_cols = [w.column(f"var_{field}", "i") for field in _VAR_FIELDS]
+        self.rule_cols = {name: w.column(f"rule_{name}", "i") for name in ("id", "description", "raw")}
+        self.rule_section = w.column("rule_section", "B")
+        self.rule_present = w.column("rule_present", "B")
+        self.starts = {attr: w.column(f"rule_{attr}_start", "q") for attr, _, _, _ in _RULE_LISTS}
+        self.refs = {attr: w.column(attr, "i") for attr, _, _, _ in _RULE_LISTS}
+        for col in self.starts.values():
+            col.append(0)
+        self.counts = {"variables": 0, "inputs": 0, "outputs": 0}
+        self.in_order = True
+        self._pending_outputs: List[Any] = []
+
+    def add(self, section: str, item: Any) -> None:
+        """
+        Egy "variables" / "inputs" / "outputs" elem (nyers dict vagy
+        rule_model objektum) felvétele.
+        """
+        if section == "variables":
+            self._variable(self.decoder.item(section, item))
+        elif section == "inputs":
+            if self.counts["outputs"]:
+                self.in_order = False
+            self._rule(0, self.decoder.item(section, item))
+        elif section == "outputs":
+            if not self.counts["inputs"]:
+                self._pending_outputs.append(self.decoder.item(section, item))
+                return
+            self._flush_outputs()
+            self._rule(1, self.decoder.item(section, item))
+
+    def _flush_outputs(self) -> None:
+        for rule in self._pending_outputs:
+            self._rule(1, rule)
+        self._pending_outputs.clear()
+
+    def _variable(self, var: Any) -> None:
+        w = self.w
+        self.counts["variables"] += 1
+        if isinstance(var, Variable):
+            self.var_raw.append(-1)
+            for field, col in zip(_VAR_FIELDS, self.var_cols):
+                col.append(w.value(getattr(var, field)))
+        else:
+            self.var_raw.append(w.value(var))
+            for col in self.var_cols:
+                col.append(-1)
+
+    def _rule(self, section_no: int, rule: Any) -> None:
+        w = self.w
+        rule_cols = self.rule_cols
+        self.counts[_SECTIONS[section_no]] += 1
+        self.rule_section.append(section_no)
+        if not isinstance(rule, Rule):
+            rule_cols["raw"].append(w.value(rule))
+            rule_cols["id"].append(-1)
+            rule_cols["description"].append(-1)
+            self.rule_present.append(0)
+            for attr, _, _, _ in _RULE_LISTS:
+                self.starts[attr].append(len(self.refs[attr]))
+            return
+        rule_cols["raw"].append(-1)
+        rule_cols["id"].append(w.value(rule.id))
+        rule_cols["description"].append(w.value(rule.description))
+        present = 0
+        for attr, key, table, fields in _RULE_LISTS:
+            if key in rule.present:
+                present |= _PRESENT_BITS[key]
+            col = self.refs[attr]
+            for obj in getattr(rule, attr):
+                col.append(w.shared(obj, table, fields))
+            self.starts[attr].append(len(col))
+        self.rule_present.append(present)
+
+    def write(self, path: str, meta: Optional[Dict[str, Any]] = None, extra: Optional[Dict[str, Any]] = None) -> None:
+        """
+        A fájl kiírása. meta tetszőleges JSON-ba írható kiegészítés (pl. a
+        forrás hash-e), extra a requirements nem szakasz kulcsai.
+        """
+        if not self.in_order:
+            raise ValueError("A szabálybázis nem írható: outputs után ismét inputs szakasz érkezett.")
+        self._flush_outputs()
+        w = self.w
+        info = {
+            "byteorder": sys.byteorder,
+            "counts": self.counts,
+            "extra": extra or {},
+            **(meta or {}),
+        }
+
+        text = "".join(w.texts)
+        text_offsets = array("q", [0, *accumulate(map(len, w.texts))])
+
+        columns: List[Tuple[str, array]] = [
+            ("meta", array("B", json.dumps(info).encode("ascii"))),
+            ("text", array("B", text.encode("utf-8", "surrogatepass"))),
+            ("text_offsets", text_offsets),
+            ("value_kind", w.value_kind),
+            ("value_data", w.value_data),
+            *sorted(w.columns.items()),
+        ]
+        _write_columns(path, columns)
+        METRICS.count("rule_base.rules", self.counts["inputs"] + self.counts["outputs"])
+
+
+def write_rule_base(path: str, requirements: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Requirements (dict vagy rule_model elemekkel) → bináris szabálybázis.
+    meta tetszőleges JSON-ba írható kiegészítés (pl. a forrás hash-e).
+    """
+    with METRICS.stage("rule_base.write"):
+        writer = RuleBaseWriter()
+        for section in ("variables", *_SECTIONS):
+            for item in requirements.get(section, []):
+                writer.add(section, item)
+        extra = {
+            key: value
+            for key, value in requirements.items()
+            if key not in ("variables", *_SECTIONS)
+        }
+        writer.write(path, meta, extra)
+
+
+# -------------------- Olvasás -------------------- #
+
+# a még fel nem épített szabály helye
+_MISSING = object()
+
+
+class _LazySection(Sequence):
+    """
+    Egy szakasz elemei, első eléréskor felépítve; build(start, stop) adja
+    a [start, stop) indexű elemeket.
+    """
+
+    def __init__(self, build: Callable[[int, int], List[Any]], first: int, count: int, path: str):
+        self._build = build
+        self._path = path
+        self._first = first
+        self._items: List[Any] = [_MISSING] * count
+        self._complete = count == 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if item is _MISSING:
+            if index < 0:
+                index += len(self._items)
+            start = self._first + index
+            item = self._items[index] = self._build(start, start + 1)[0]
+        return item
+
+    def __iter__(self) -> Iterator[Any]:
+        if not self._complete:
+            # végigolvasás: egyben építjük fel, a már elért elemek maradnak
+            built = self._build(self._first, self._first + len(self._items))
+            self._items = [new if old is _MISSING else old for old, new in zip(self._items, built)]
+            self._complete = True
+        return iter(self._items)
+
+    def __repr__(self) -> str:
+        return f"<{len(self._items)} elem: {self._path}>"
+
+
+class RuleBaseFile:
+    """
+    Memóriába leképezett bináris szabálybázis.
+
+    meta     – az íráskor megadott kiegészítés, counts, extra
+    column() – egy oszlop memoryview-ként (NumPy esetén tömbként)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._catalog = self._read_catalog()
+            self.meta: Dict[str, Any] = json.loads(bytes(self._view("meta")).decode("utf-8"))
+            if self.meta.get("byteorder") != sys.byteorder:
+                raise ValueError(f"Más bájtsorrendű szabálybázis: {path}")
+        except Exception:
+            self._map.close()
+            raise
+        self._views: List[memoryview] = []
+        self._tables: Optional[Tuple[List[Any], List[Condition], List[Effect]]] = None
+
+    def _read_catalog(self) -> Dict[str, Tuple[str, int, int]]:
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"Nem szabálybázis fájl: {self.path}")
+        magic, version, n_columns = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Nem szabálybázis fájl: {self.path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Nem támogatott szabálybázis-verzió ({version}): {self.path}")
+        catalog: Dict[str, Tuple[str, int, int]] = {}
+        for i in range(n_columns):
+            name, typecode, offset, count = _ENTRY.unpack_from(self._map, _HEADER.size + i * _ENTRY.size)
+            typecode = typecode.decode("ascii")
+            if offset + count * array(typecode).itemsize > len(self._map):
+                raise ValueError(f"Csonka szabálybázis fájl: {self.path}")
+            catalog[name.rstrip(b"\0").decode("ascii")] = (typecode, offset, count)
+        return catalog
+
+    def _view(self, name: str) -> memoryview:
+        typecode, offset, count = self._catalog[name]
+        size = count * array(typecode).itemsize
+        view = memoryview(self._map)[offset:offset + size]
+        return view if typecode == "B" else view.cast(typecode)
+
+    def column(self, name: str) -> Any:
+        """
+        Egy oszlop másolás nélkül: NumPy tömb, ha elérhető, különben
+        memoryview. A fájl lezárásáig érvényes.
+        """
+        if name not in self._catalog:
+            raise KeyError(name)
+        if HAS_NUMPY:
+            typecode, offset, count = self._catalog[name]
+            return np.frombuffer(self._map, dtype=_NUMPY_TYPES[typecode], count=count, offset=offset)
+        view = self._view(name)
+        self._views.append(view)
+        return view
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._catalog)
+
+    # -------------------- modell -------------------- #
+
+    def _build_tables(self) -> Tuple[List[Any], List[Condition], List[Effect]]:
+        """
+        Értéktábla, egyedi feltételek és hatások – egyszer, az első
+        szabály elérésekor.
+        """
+        with METRICS.stage("rule_base.tables"):
+            text = bytes(self._view("text")).decode("utf-8", "surrogatepass")
+            bounds = self._view("text_offsets").tolist()
+            texts = [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+            kinds = self._view("value_kind").tolist()
+            data = self._view("value_data")
+            floats = data.cast("B").cast("d")
+            ints = data.tolist()
+            values: List[Any] = []
+            append = values.append
+            for i, kind in enumerate(kinds):
+                if kind == _STR:
+                    append(texts[ints[i]])
+                elif kind == _INT:
+                    append(ints[i])
+                elif kind == _FLOAT:
+                    append(floats[i])
+                elif kind == _TRUE:
+                    append(True)
+                elif kind == _FALSE:
+                    append(False)
+                elif kind == _NONE:
+                    append(None)
+                else:
+                    append(json.loads(texts[ints[i]]))
+            floats.release()
+            data.release()
+
+            def rows(table: str, fields: Tuple[str, ...]) -> List[List[Any]]:
+                cols = [self._view(f"{table}_{field}").tolist() for field in fields]
+                return [[values[i] for i in row] for row in zip(*cols)]
+
+            conditions = [Condition(*row) for row in rows("cond", _COND_FIELDS)]
+            effects = [Effect(*row) for row in rows("eff", _EFF_FIELDS)]
+            cols = {
+                name: self._view(name).tolist()
+                for name in self._catalog
+                if name.startswith("rule_") or name in ("causes", "effects", "rules", "question")
+            }
+            # (kezdőpontok, hivatkozások, tábla) listánként, a Rule argumentumainak sorrendjében
+            self._rule_lists = [
+                (cols[f"rule_{attr}_start"], cols[attr], conditions if table == "cond" else effects)
+                for attr, _, table, _ in _RULE_LISTS
+            ]
+            self._rule_cols = cols
+        return values, conditions, effects
+
+    def _tables_ready(self) -> Tuple[List[Any], List[Condition], List[Effect]]:
+        if self._tables is None:
+            self._tables = self._build_tables()
+        return self._tables
+
+    def rules(self, first: int, stop: int) -> List[Any]:
+        """
+        A [first, stop) indexű szabályok (inputs, majd outputs sorrendben)
+        Rule-ként.
+        """
+        values = self._tables_ready()[0]
+        cols = self._rule_cols
+        raws, ids, descriptions, present_bits = (
+            cols["rule_raw"], cols["rule_id"], cols["rule_description"], cols["rule_present"]
+        )
+        (c_start, c_refs, c_shared), (e_start, e_refs, e_shared), (r_start, r_refs, r_shared), (
+            q_start, q_refs, q_shared
+        ) = self._rule_lists
+        # a ciklus szándékosan helyben, függvényhívás nélkül (forró út)
+        built: List[Any] = []
+        for i in range(first, stop):
+            raw = raws[i]
+            if raw >= 0:
+                built.append(values[raw])
+                continue
+            j = i + 1
+            built.append(Rule(
+                values[ids[i]],
+                values[descriptions[i]],
+                tuple([c_shared[k] for k in c_refs[c_start[i]:c_start[j]]]),
+                tuple([e_shared[k] for k in e_refs[e_start[i]:e_start[j]]]),
+                tuple([r_shared[k] for k in r_refs[r_start[i]:r_start[j]]]),
+                tuple([q_shared[k] for k in q_refs[q_start[i]:q_start[j]]]),
+                _PRESENT[present_bits[i]],
+            ))
+        return built
+
+    def variables(self, first: int, stop: int) -> List[Any]:
+        """
+        A [first, stop) indexű változók Variable-ként.
+        """
+        values = self._tables_ready()[0]
+        cols = [self._view(f"var_{field}")[first:stop].tolist() for field in ("raw", *_VAR_FIELDS)]
+        variables: List[Any] = []
+        for raw, *fields in zip(*cols):
+            if raw >= 0:
+                variables.append(values[raw])
+            else:
+                variables.append(Variable(*(values[i] for i in fields)))
+        return variables
+
+    def requirements(self) -> Dict[str, Any]:
+        """
+        A tárolt requirements; a szakaszok lusta sorozatok (a RuleSet és a
+        többi fogyasztó listaként kezeli), a fájl lezárásáig olvashatók.
+        """
+        counts = self.meta["counts"]
+        data: Dict[str, Any] = dict(self.meta.get("extra", {}))
+        data["variables"] = _LazySection(self.variables, 0, counts["variables"], self.path)
+        data["inputs"] = _LazySection(self.rules, 0, counts["inputs"], self.path)
+        data["outputs"] = _LazySection(self.rules, counts["inputs"], counts["outputs"], self.path)
+        return data
+
+    # -------------------- lezárás -------------------- #
+
+    def close(self) -> None:
+        """
+        Az oszlop-nézetek és a leképezés felszabadítása; a már felépített
+        szabályok érvényesek maradnak, a column() által adott nézetek nem.
+        """
+        for view in self._views:
+            view.release()
+        self._views = []
+        try:
+            self._map.close()
+        except BufferError:
+            # még élő NumPy nézet tartja a leképezést – a GC zárja le
+            pass
+
+    def __enter__(self) -> "RuleBaseFile":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def read_rule_base(path: str) -> Dict[str, Any]:
+    """
+    Bináris szabálybázis → requirements (rule_model elemekkel); a
+    szabályok első elérésig a leképezett fájlban maradnak.
+    """
+    with METRICS.stage("rule_base.read"):
+        return RuleBaseFile(path).requirements()
@@ -0,0 +1,328 @@
+"""
+Pre_process/SchemaLoader.py
+
+Cél:
+- A követelményfájlok kétféle felépítésének felismerése és egységesítése a
+  {"variables", "inputs", "outputs"} alakra, amelyet az ellenőrzők várnak:
+    "requirements" – {"variables": [...], "inputs": [...], "outputs": [...]}
+                     (a Causes / effects / rules szabályokkal)
+    "rule_list"    – szabályok listája:
+                     [{"rule_id": ..., "conditions": [{"attribute": ...,
+                       "operator": ..., "value": ...}], "action": {...}},
+                      {"rule_id": ..., "constraints": {név: érték}, "note": ...}]
+- A betöltött szabálybázis bináris cache-e (RuleBaseFile), hogy a
+  változatlan nagy fájlok JSON-parszolás nélkül töltődjenek újra.
+- Nagy requirements.json streamelt betöltése közvetlenül RuleSet-be
+  (load_rule_set): az elemek egyenként, dekódolva kerülnek a
+  RuleSet.from_stream-be, és ugyanebből a menetből készül a bináris cache.
+
+Heurisztika (rule_list):
+- A conditions / action(s) rekordból inputs szabály lesz (attribute →
+  variable), a constraints rekordból outputs szabály "=" hatásokkal
+  (rules); a note a description helyére kerül.
+- A változók az első előfordulásuk sorrendjében jönnek létre. Szerepkör a
+  DataCleaning szerint: feltétel → input, hatás és kényszer →
+  eternal-truth. Típus a látott értékekből: bool → boolean, szöveg →
+  string, csak egész → integer, egyébként decimal.
+- Ismeretlen felépítésnél és értelmezhetetlen rekordnál ValueError – a
+  hibás fájl ne menjen át csendben üres szabálykészletként. Ez a
+  streamelt olvasásra is áll: ott a JsonStream ellenőrzi a kulcsokat.
+- A rule_list felépítés nem streamelhető (a változókat az összes rekordból
+  becsüljük), ezért load_rule_set azt egyben olvassa és normalizálja.
+
+Bináris cache:
+- A cache a forrás útvonalát, méretét, módosítási idejét és sha1-ét
+  tárolja. Egyező méret és idő esetén a cache-t használjuk; eltérő időnél
+  (pl. touch) a hash dönt. Sérült / régi cache helyett újraépítünk.
+
+Használat:
+    requirements = normalize_requirements(json.load(f))
+    requirements = load_requirements("rules.json", cache_path="rules.rulebase")
+    rule_set = load_rule_set("requirements.json", RuleCache(...), "requirements.rulebase")
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from Checking_process.rule_model import decode_stream
+from Checking_process.rule_set import RuleSet
+from Instrumentation.metrics import METRICS
+from Pre_process.ConversionCache import file_digest
+from Pre_process.DataCleaning import text_to_requirements
+from Pre_process.JsonStream import stream_json_requirements
+from Pre_process.RuleBaseFile import MAGIC, RuleBaseFile, RuleBaseWriter, read_rule_base, write_rule_base
+
+
+SCHEMA_REQUIREMENTS = "requirements"
+SCHEMA_RULE_LIST = "rule_list"
+
+_SECTION_KEYS = ("variables", "inputs", "outputs")
+
+# a rule_list rekordok felismerő kulcsai
+_RULE_LIST_KEYS = ("rule_id", "conditions", "action", "actions", "constraints")
+
+# Ha ugyanarra a névre több szerepkör is jön (mint DataCleaning-ben)
+_ROLE_PRIORITY = {"output": 3, "input": 2, "eternal-truth": 1}
+
+
+def detect_schema(data: Any) -> str:
+    """
+    SCHEMA_REQUIREMENTS vagy SCHEMA_RULE_LIST; ismeretlen felépítésnél
+    ValueError.
+    """
+    if isinstance(data, dict):
+        if not data or any(key in data for key in _SECTION_KEYS):
+            return SCHEMA_REQUIREMENTS
+        raise ValueError(
+            "Ismeretlen felépítés: a JSON objektumban nincs 'variables', 'inputs' vagy 'outputs' kulcs."
+        )
+    if isinstance(data, list):
+        if all(isinstance(r, dict) and any(key in r for key in _RULE_LIST_KEYS) for r in data):
+            return SCHEMA_RULE_LIST
+        raise ValueError("Ismeretlen felépítés: a lista elemei nem rule_id / conditions / action rekordok.")
+    raise ValueError(f"Ismeretlen felépítés: JSON objektum vagy lista várható, nem {type(data).__name__}.")
+
+
+# -------------------- rule_list → requirements -------------------- #
+
+def _item(item: Any, record_id: Any) -> Dict[str, Any]:
+    """
+    {"attribute", "operator", "value"} → {"variable", "operator", "value"}.
+    """
+    if not isinstance(item, dict):
+        raise ValueError(f"Értelmezhetetlen feltétel / hatás a(z) {record_id} szabályban: {item!r}")
+    return {
+        "variable": item.get("attribute", item.get("variable")),
+        "operator": item.get("operator"),
+        "value": item.get("value"),
+    }
+
+
+def _actions(record: Dict[str, Any]) -> List[Any]:
+    actions = record.get("actions")
+    if actions is None:
+        action = record.get("action")
+        actions = [] if action is None else [action]
+    return actions if isinstance(actions, list) else [actions]
+
+
+def _constraints(record: Dict[str, Any], record_id: Any) -> List[Dict[str, Any]]:
+    constraints = record.get("constraints")
+    if isinstance(constraints, dict):
+        return [{"variable": name, "operator": "=", "value": value} for name, value in constraints.items()]
+    if not isinstance(constraints, list):
+        constraints = [constraints]
+    return [_item(c, record_id) for c in constraints]
+
+
+def _variable_type(values: List[Any]) -> str:
+    if any(isinstance(v, bool) for v in values):
+        return "boolean"
+    if any(isinstance(v, str) for v in values):
+        return "string"
+    if values and all(isinstance(v, int) for v in values):
+        return "integer"
+    return "decimal"
+
+
+def _infer_variables(struct: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Változók az első előfordulás sorrendjében, szerepkörrel és a látott
+    értékekből becsült típussal.
+    """
+    roles: Dict[Any, str] = {}
+    values: Dict[Any, List[Any]] = {}
+
+    def see(items: List[Dict[str, Any]], role: str) -> None:
+        for item in items:
+            name = item["variable"]
+            if name is None:
+                continue
+            if name not in roles or _ROLE_PRIORITY[role] > _ROLE_PRIORITY[roles[name]]:
+                roles[name] = role
+            if item["value"] is not None:
+                values.setdefault(name, []).append(item["value"])
+            else:
+                values.setdefault(name, [])
+
+    for rule in struct["inputs"]:
+        see(rule["Causes"], "input")
+        see(rule["effects"], "eternal-truth")
+    for rule in struct["outputs"]:
+        see(rule["rules"], "eternal-truth")
+
+    return [
+        {"name": name, "type": _variable_type(values[name]), "role": role}
+        for name, role in roles.items()
+    ]
+
+
+def normalize_rule_list(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    rule_list felépítés → {"variables", "inputs", "outputs"}.
+    """
+    struct: Dict[str, List[Dict[str, Any]]] = {"inputs": [], "outputs": []}
+
+    for record in records:
+        record_id = record.get("rule_id", record.get("id"))
+        description = record.get("description", record.get("note"))
+        has_rule = any(key in record for key in ("conditions", "action", "actions"))
+        has_constraints = record.get("constraints") is not None
+        if not has_rule and not has_constraints:
+            raise ValueError(f"Értelmezhetetlen szabály ({record_id}): sem conditions / action, sem constraints.")
+
+        if has_rule:
+            rule: Dict[str, Any] = {"id": record_id}
+            if description is not None:
+                rule["description"] = description
+            rule["Causes"] = [_item(c, record_id) for c in record.get("conditions") or []]
+            rule["effects"] = [_item(a, record_id) for a in _actions(record)]
+            struct["inputs"].append(rule)
+
+        if has_constraints:
+            rule = {"id": record_id}
+            if description is not None:
+                rule["description"] = description
+            rule["rules"] = _constraints(record, record_id)
+            struct["outputs"].append(rule)
+
+    return {"variables": _infer_variables(struct), **struct}
+
+
+def normalize_requirements(data: Any) -> Dict[str, Any]:
+    """
+    Bármelyik támogatott felépítés → requirements dict (a requirements
+    felépítés változatlanul marad).
+    """
+    if detect_schema(data) == SCHEMA_RULE_LIST:
+        with METRICS.stage("load.normalize"):
+            return normalize_rule_list(data)
+    return data
+
+
+# -------------------- Betöltés bináris cache-sel -------------------- #
+
+def _source_info(path: str) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _is_rule_base(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _cached_rule_base(cache_path: str, source: Dict[str, Any], path: str) -> Optional[Dict[str, Any]]:
+    """
+    A cache-ből betöltött requirements, ha a path mostani tartalmából
+    készült; különben None.
+    """
+    try:
+        rule_base = RuleBaseFile(cache_path)
+        cached = rule_base.meta.get("source") or {}
+        if cached.get("path") == source["path"] and cached.get("size") == source["size"]:
+            if cached.get("mtime_ns") == source["mtime_ns"] or cached.get("sha1") == file_digest(path):
+                return rule_base.requirements()
+    except (OSError, ValueError, KeyError):
+        # hiányzó, sérült vagy régi formátumú cache – újraépítjük
+        return None
+    rule_base.close()
+    return None
+
+
+def _first_char(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            ch = f.read(1)
+            if not ch or not ch.isspace():
+                return ch
+
+
+def _load_json(path: str) -> Tuple[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    schema = detect_schema(data)
+    return schema, normalize_requirements(data)
+
+
+def load_requirements(path: str, cache_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Követelményfájl → requirements dict:
+        .txt              – text_to_requirements,
+        bináris (MAGIC)   – read_rule_base,
+        egyéb             – JSON, mindkét felépítésből normalizálva.
+    cache_path megadásakor a JSON normalizált alakja bináris cache-be
+    kerül, és amíg a fájl nem változik, onnan töltődik.
+    """
+    if path.endswith(".txt"):
+        with open(path, "r", encoding="utf-8") as f:
+            return text_to_requirements(f.read())
+    if _is_rule_base(path):
+        return read_rule_base(path)
+
+    if cache_path is None:
+        with METRICS.stage("load.json"):
+            return _load_json(path)[1]
+
+    source = _source_info(path)
+    cached = _cached_rule_base(cache_path, source, path)
+    if cached is not None:
+        METRICS.count("rule_base.hits")
+        return cached
+
+    METRICS.count("rule_base.misses")
+    with METRICS.stage("load.json"):
+        schema, requirements = _load_json(path)
+    source["sha1"] = file_digest(path)
+    write_rule_base(cache_path, requirements, meta={"schema": schema, "source": source})
+    return requirements
+
+
+def load_rule_set(path: str, rule_cache: Any = None, cache_path: Optional[str] = None) -> RuleSet:
+    """
+    Nagy JSON követelményfájl → RuleSet (rule_cache: opcionális RuleCache).
+    A requirements felépítést streamelve, egyetlen menetben olvassuk: az
+    elemek dekódolva, egyenként kerülnek a RuleSet-be, így a beolvasás
+    végére az egymenetes ellenőrzések (redundancia, képletek) indexei is
+    készen vannak, a nyers dict pedig sosem áll össze.
+    cache_path megadásakor a bináris szabálybázis ugyanebből a menetből
+    íródik ki, és amíg a fájl nem változik, a RuleSet onnan épül.
+    """
+    source = None
+    if cache_path is not None:
+        source = _source_info(path)
+        cached = _cached_rule_base(cache_path, source, path)
+        if cached is not None:
+            METRICS.count("rule_base.hits")
+            return RuleSet(cached, cache=rule_cache)
+        METRICS.count("rule_base.misses")
+
+    if _first_char(path) != "{":
+        # rule_list: egyben olvassuk és normalizáljuk
+        with METRICS.stage("load.json"):
+            schema, requirements = _load_json(path)
+        if source is not None:
+            source["sha1"] = file_digest(path)
+            write_rule_base(cache_path, requirements, meta={"schema": schema, "source": source})
+        return RuleSet(requirements, cache=rule_cache)
+
+    writer = RuleBaseWriter() if source is not None else None
+
+    def items():
+        for section, item in decode_stream(stream_json_requirements(path)):
+            if writer is not None:
+                writer.add(section, item)
+            yield section, item
+
+    with METRICS.stage("load.stream"):
+        rule_set = RuleSet.from_stream(items(), cache=rule_cache)
+
+    # ismétlődő szakaszkulcsnál a sorrend nem írható ki – ilyenkor nincs cache
+    if writer is not None and writer.in_order:
+        source["sha1"] = file_digest(path)
+        with METRICS.stage("rule_base.write"):
+            writer.write(cache_path, meta={"schema": SCHEMA_REQUIREMENTS, "source": source})
+    return rule_set
@@ -0,0 +1,132 @@
+"""
+batch.py
+
+Több követelményfájl ellenőrzése egyetlen futtatással.
+
+Használat:
+    python batch.py Examples
+    python batch.py "Examples/*.json" -o results.jsonl --workers 4
+
+- A bemenet lehet fájl, könyvtár (benne a .json és .txt fájlok) vagy glob minta.
+- A fájlokat egy process pool workerei dolgozzák fel; a workerek
+  fájlok között újrahasznosulnak, így az importok költsége egyszer jelentkezik.
+- Fájlonként egy JSON sor (JSON Lines) készül, a bemenet sorrendjében:
+  {"file": ..., "ok": ..., "findings": {...}, "error": ..., "timings": {...}}
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+
+from main import run_all_checks
+from Pre_process.SchemaLoader import load_requirements
+
+
+REQUIREMENT_EXTENSIONS = (".json", ".txt")
+
+
+def collect_files(patterns: Iterable[str]) -> List[str]:
+    """
+    Fájlok, könyvtárak és glob minták kibontása rendezett, ismétlés
+    nélküli fájllistává.
+    """
+    files: List[str] = []
+    seen = set()
+
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = sorted(
+                os.path.join(pattern, name)
+                for name in os.listdir(pattern)
+                if name.endswith(REQUIREMENT_EXTENSIONS)
+            )
+        elif os.path.isfile(pattern):
+            candidates = [pattern]
+        else:
+            candidates = sorted(glob.glob(pattern, recursive=True))
+
+        for path in candidates:
+            if os.path.isfile(path) and path not in seen:
+                seen.add(path)
+                files.append(path)
+
+    return files
+
+
+def validate_file(path: str) -> Dict[str, Any]:
+    """
+    Egy fájl betöltése és ellenőrzése. A hibát nem dobjuk tovább, hanem
+    az eredményrekordba írjuk, hogy a batch többi része lefusson.
+    """
+    record: Dict[str, Any] = {"file": path, "ok": False, "findings": {}, "error": None}
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    try:
+        requirements = load_requirements(path)
+        timings["load"] = time.perf_counter() - start
+
+        check_start = time.perf_counter()
+        errors = run_all_checks(requirements)
+        timings["checks"] = time.perf_counter() - check_start
+
+        record["findings"] = {error_type: details for error_type, details in errors}
+        record["ok"] = not errors
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    timings["total"] = time.perf_counter() - start
+    record["timings"] = timings
+    return record
+
+
+def validate_files(files: List[str], workers: int | None = None) -> Iterator[Dict[str, Any]]:
+    """
+    A fájlok ellenőrzése worker poolon; az eredmények a bemenet sorrendjében
+    érkeznek. workers == 1 esetén a saját folyamatban fut.
+    """
+    if workers == 1 or len(files) <= 1:
+        for path in files:
+            yield validate_file(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(validate_file, files)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Követelményfájlok kötegelt ellenőrzése.")
+    parser.add_argument("paths", nargs="+", help="fájlok, könyvtárak vagy glob minták")
+    parser.add_argument("-o", "--output", help="JSON Lines kimeneti fájl (alapértelmezés: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="workerek száma")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    if not files:
+        print("Nem található ellenőrizhető fájl.", file=sys.stderr)
+        return 2
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        for record in validate_files(files, workers=args.workers):
+            if record["error"] is not None:
+                failed += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+evaluate.py
+
+Követelmények végrehajtása rekordokon (lásd Evaluation/rule_compiler.py).
+
+Használat:
+    python evaluate.py Examples/price_calculation_example.json orders.jsonl -o results.jsonl
+    python evaluate.py Examples/price_calculation_example.json orders.csv --batch
+
+- A rekordok JSON Lines (soronként egy objektum) vagy CSV fájlból jönnek.
+  CSV-ben az üres mező hiányzó érték, a számok és a true/false értékek
+  típust kapnak.
+- Kimenet soronként egy JSON objektum: a bemeneti rekord, kiegészítve a
+  szabályok által meghatározott változókkal (stdout, ha nincs -o).
+- --batch: NumPy oszlopos kiértékelés (a teljes bemenet a memóriában).
+- --source: csak a generált kiértékelő kódot írja ki.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from typing import Any, Dict, Iterator, List
+
+from Evaluation.rule_compiler import CompiledRules, compile_rules
+from Instrumentation.metrics import METRICS
+from Pre_process.SchemaLoader import load_requirements
+
+
+def _csv_value(text: str) -> Any:
+    if text == "":
+        return None
+    lowered = text.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Rekordok egy .csv vagy JSON Lines fájlból, lustán.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield {key: _csv_value(value) for key, value in row.items()}
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _json_value(value: Any) -> Any:
+    # NumPy skalárok JSON-ba írhatóvá alakítása
+    return value.item() if hasattr(value, "item") else value
+
+
+def evaluate_batch(compiled: CompiledRules, records: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    A rekordok kiértékelése oszloposan, az eredmények rekordonként.
+    """
+    columns = {
+        var: [record.get(var) for record in records]
+        for var in compiled.variables
+        if any(var in record for record in records)
+    }
+    results = compiled.evaluate_columns(columns, len(records))
+    data = {var: (arr.data.tolist(), arr.mask.tolist()) for var, arr in results.items()}
+    for i in range(len(records)):
+        yield {var: (None if mask[i] else values[i]) for var, (values, mask) in data.items()}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Követelmények végrehajtása rekordokon.")
+    parser.add_argument("requirements", help="követelményfájl (.json vagy .txt)")
+    parser.add_argument("records", nargs="?", help="bemeneti rekordok (.csv vagy JSON Lines)")
+    parser.add_argument("-o", "--output", help="JSON Lines kimeneti fájl (alapértelmezés: stdout)")
+    parser.add_argument("--batch", action="store_true", help="NumPy oszlopos kiértékelés")
+    parser.add_argument("--source", action="store_true", help="a generált kód kiírása")
+    parser.add_argument("--profile", action="store_true", help="szakaszidők kiírása (stderr)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        METRICS.enable()
+
+    compiled = compile_rules(load_requirements(args.requirements))
+    for warning in compiled.warnings:
+        print(warning, file=sys.stderr)
+    if args.source:
+        print(compiled.source, end="")
+        return 0
+    if not args.records:
+        parser.error("a rekordfájl megadása kötelező (kivéve --source esetén)")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.batch:
+            records = list(read_records(args.records))
+            pairs = zip(records, evaluate_batch(compiled, records))
+        else:
+            pairs = ((record, compiled.evaluate(record)) for record in read_records(args.records))
+
+        with METRICS.stage("evaluate.write"):
+            for record, result in pairs:
+                merged = dict(record)
+                merged.update((var, _json_value(value)) for var, value in result.items())
+                out.write(json.dumps(merged, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.profile:
+        print(METRICS.report(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
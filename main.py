@@ -1,51 +1,175 @@
+import argparse
 import os
 
-from Pre_process.DataCleaning import load_json_requirements
+from Pre_process.DataCleaning import load_json_requirements, refresh_json_requirements
+from Pre_process.SchemaLoader import load_rule_set, normalize_requirements
 from Checking_process import (
     check_variable_conflicts,
     check_logical_exclusions,
     check_redunant_rules,
+    check_coverage_gaps,
 )
+from Checking_process.check_cache import RuleCache, run_cached_checks
+from Checking_process.parallel import run_checks_parallel
+from Checking_process.rule_set import RuleSet, as_rule_set
+from Instrumentation.metrics import METRICS
 
 
-def run_all_checks(requirements_data):
+# Ennél nagyobb requirements.json-t / forrásszöveget streamelve dolgozunk fel (bájt)
+STREAM_THRESHOLD = 16 * 1024 * 1024
+
+# Inkrementális újraellenőrzéshez használt szabály-cache
+CACHE_PATH = "requirements.cache"
+
+# Szöveg → JSON konverzió R-blokkonkénti cache-e
+CONVERSION_CACHE_PATH = "requirements.textcache"
+
+# A nagy requirements.json normalizált, bináris alakja (gyors újratöltéshez)
+RULE_BASE_PATH = "requirements.rulebase"
+
+
+def run_all_checks(requirements_data, workers=None, cache_path=None, coverage=False, cache=None):
+    """
+    Lefuttatja az összes ellenőrzőt.
+    workers > 1 esetén az ellenőrzők process poolon, párhuzamosan futnak
+    (ugyanazokkal az eredményekkel, ugyanabban a sorrendben).
+    cache_path megadásakor inkrementálisan, a lemezen tárolt szabály-cache
+    alapján csak a módosult szabályokat számoljuk újra; cache megadásakor
+    (kész RuleCache, pl. a watch mód memóriában tartott állapota) ugyanígy,
+    lemezre csak útvonallal létrehozott cache kerül. Cache-sel épített kész
+    RuleSet (pl. load_rule_set) a saját cache-ét használja. Cache mellett
+    workers > 1 esetén a páros keresés teljes újraszámolása (hideg cache,
+    sok módosítás) fut process poolon.
+    coverage=True esetén a lefedettségi hézagokat is keressük
+    (check_coverage_gaps).
+    """
     errors = []
 
+    if isinstance(requirements_data, RuleSet) and requirements_data.cache is not None:
+        # a szabályok kulcsai ebből a cache-ből valók
+        cache = requirements_data.cache
+
+    if cache is not None or cache_path is not None:
+        if cache is None:
+            cache = RuleCache(cache_path)
+        with METRICS.stage("check.rule_set"):
+            if isinstance(requirements_data, RuleSet):
+                rule_set = requirements_data
+            else:
+                rule_set = RuleSet(requirements_data, cache=cache)
+        with METRICS.stage("check.cached"):
+            results = run_cached_checks(rule_set, cache, workers=workers)
+    elif workers is not None and workers > 1:
+        # A szabálykészletet egyszer indexeljük, minden ellenőrző ezt kapja
+        with METRICS.stage("check.rule_set"):
+            rule_set = as_rule_set(requirements_data)
+        with METRICS.stage("check.parallel"):
+            results = run_checks_parallel(rule_set, workers=workers)
+    else:
+        with METRICS.stage("check.rule_set"):
+            rule_set = as_rule_set(requirements_data)
+        results = None
+
+    if results is not None:
+        variable_conflicts = results["variable_conflicts"]
+        logical_exclusions = results["logical_exclusions"]
+        redundant_rules = results["redundant_rules"]
+    else:
+        with METRICS.stage("check.variable_conflicts"):
+            variable_conflicts = check_variable_conflicts.check(rule_set)
+        with METRICS.stage("check.logical_exclusions"):
+            logical_exclusions = check_logical_exclusions.check(rule_set)
+        with METRICS.stage("check.redundant_rules"):
+            redundant_rules = check_redunant_rules.check(rule_set)
+
     # 1. Változóütközés ellenőrzés
-    variable_conflicts = check_variable_conflicts.check(requirements_data)
     if variable_conflicts:
         errors.append(("Változóütközések", variable_conflicts))
 
     # 2. Logikai kizárások ellenőrzése
-    logical_exclusions = check_logical_exclusions.check(requirements_data)
     if logical_exclusions:
         errors.append(("Logikai kizárások", logical_exclusions))
 
     # 3. Redundáns szabályok ellenőrzése
-    redundant_rules = check_redunant_rules.check(requirements_data)
     if redundant_rules:
         errors.append(("Redundáns szabályok", redundant_rules))
 
+    # 4. Lefedettségi hézagok (opcionális)
+    if coverage:
+        with METRICS.stage("check.coverage_gaps"):
+            coverage_gaps = check_coverage_gaps.check(rule_set)
+        if coverage_gaps:
+            errors.append(("Lefedetlen tartományok", coverage_gaps))
+
     return errors
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Követelmények ellenőrzése.")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="ennyi folyamaton fut a szöveg → JSON konverzió és az ellenőrzés (alapértelmezés: soros)",
+    )
+    parser.add_argument(
+        "--coverage",
+        action="store_true",
+        help="a kimeneti változókat meg nem határozó bemeneti tartományok keresése",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="szakaszonkénti idő, memóriacsúcs és számlálók kiírása a végén",
+    )
+    args = parser.parse_args(argv)
+    if args.profile:
+        METRICS.enable(memory=True)
+
     # Itt add meg, melyik szövegfájlból épüljön fel a JSON,
     # ha még nem létezik requirements.json
     text_source_path = os.path.join("Examples", "price_calculation_example.txt")
     json_path = "requirements.json"
 
     try:
-        requirements = load_json_requirements(
-            json_path=json_path,
-            text_path=text_source_path,
-        )
+        if (
+            os.path.exists(text_source_path)
+            and os.path.getsize(text_source_path) > STREAM_THRESHOLD
+        ):
+            # nagy szövegfájl: a JSON-t korlátos memóriában frissítjük
+            refresh_json_requirements(
+                json_path,
+                text_source_path,
+                CONVERSION_CACHE_PATH,
+                workers=args.workers,
+            )
+
+        if os.path.exists(json_path) and os.path.getsize(json_path) > STREAM_THRESHOLD:
+            # nagy fájl: elemenként olvassuk, közben épül az index (a
+            # szabály-cache-sel), és ugyanebből a menetből bináris cache
+            # készül – változatlan fájlnál JSON-parszolás nélkül töltődik újra
+            requirements = load_rule_set(json_path, RuleCache(CACHE_PATH), RULE_BASE_PATH)
+        else:
+            requirements = normalize_requirements(
+                load_json_requirements(
+                    json_path=json_path,
+                    text_path=text_source_path,
+                    cache_path=CONVERSION_CACHE_PATH,
+                    workers=args.workers,
+                )
+            )
     except Exception as e:
         print(f"Hiba történt a JSON betöltése / generálása közben:\n{e}")
         return
 
     print("Ellenőrzés indítása...\n")
-    errors = run_all_checks(requirements)
+    errors = run_all_checks(
+        requirements,
+        workers=args.workers,
+        cache_path=CACHE_PATH,
+        coverage=args.coverage,
+    )
 
     if not errors:
         print("A JSON teljesen hibátlan.")
@@ -56,6 +180,10 @@ def main():
             for detail in details:
                 print(f"- {detail}")
 
+    if args.profile:
+        print("\n--- Mérések ---")
+        print(METRICS.report())
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,484 @@
+"""
+server.py
+
+Helyben futó ellenőrző szolgáltatás (HTTP/JSON): a CI és a szerkesztők
+folyamatindítás helyett ezt hívják, így az interpreter indítása, az
+importok és a már látott szabálykészletek feldolgozása nem ismétlődik.
+
+Használat:
+    python server.py --port 8765 --workers 4
+    curl -s localhost:8765/validate -d '{"path": "Examples/price_calculation_example.json"}'
+    curl -s localhost:8765/validate -d '{"text": "R1 If ...", "document": "spec.txt"}'
+    curl -s localhost:8765/stats
+
+Végpontok:
+    POST /validate – {"requirements": {...} | [...]} | {"text": "..."} | {"path": "..."}
+                     opcionálisan "coverage": true és "document": név
+                     -> {"ok", "findings", "cached", "elapsed_ms"}
+    POST /convert  – {"text": "..."} vagy {"path": "....txt"} -> {"requirements": {...}}
+    GET  /stats    – kérésszámok, késleltetés (átlag, max, p50/p95/p99),
+                     áteresztés, cache-találatok
+    GET  /health   – {"ok": true}
+
+Működés:
+- A kapcsolatokat külön (démon) szálak fogadják, az egyszerre futó
+  ellenőrzések és konverziók számát pedig egy --workers méretű szemafor
+  korlátozza; a szálak közösen használják a meleg cache-eket. A tétlen
+  keep-alive kapcsolat így nem foglal helyet, KEEPALIVE_TIMEOUT után
+  lezárul, és a kilépést sem tartja fel. (A GIL miatt az ellenőrzések nem
+  futnak valóban párhuzamosan, a hálózati és fájl I/O viszont átfed.)
+- Eredmény-LRU: a bemenet tartalom-hash-e (és a coverage opció) szerint a
+  kész RuleSet és a hibalista – azonos tartalomra nem számolunk újra.
+- Dokumentum-LRU: a "document" nevű (path-nál a fájl útvonala szerinti)
+  bemenet előző ellenőrzésének szabály- és konverziós cache-e (mint
+  watch.py-nál) – egy szerkesztett fájl új változatánál csak a módosult
+  szabályokat érintő részek számolódnak újra.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from main import run_all_checks
+from Checking_process.check_cache import RuleCache
+from Checking_process.rule_set import RuleSet
+from Pre_process.ConversionCache import ConversionCache
+from Pre_process.DataCleaning import text_to_requirements
+from Pre_process.SchemaLoader import load_requirements, normalize_requirements
+
+
+# Alapértelmezett cím és szálszám
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+
+# Ennyi ellenőrzési eredményt / dokumentumállapotot tartunk meg
+RESULT_CACHE_SIZE = 128
+DOCUMENT_CACHE_SIZE = 256
+
+# A késleltetés-percentilisek ennyi legutóbbi kérésből számolódnak
+LATENCY_WINDOW = 1024
+
+# A friss áteresztés ennyi másodperces ablakra vonatkozik
+THROUGHPUT_WINDOW = 60.0
+
+# Ennél nagyobb kéréstörzset nem fogadunk (bájt)
+MAX_BODY = 256 * 1024 * 1024
+
+# Ennyi másodperc tétlenség után zárjuk a (keep-alive) kapcsolatot
+KEEPALIVE_TIMEOUT = 5.0
+
+_MISSING = object()
+
+
+class RequestError(Exception):
+    """
+    A kliens hibája (hiányzó vagy érvénytelen mező) – HTTP 4xx válasz.
+    """
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class _LRU:
+    """
+    Szálbiztos, legutóbb használt szerint kilakoltató cache.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        """
+        A kulcshoz tartozó érték, vagy _MISSING.
+        """
+        with self._lock:
+            value = self._items.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._items.move_to_end(key)
+            return value
+
+    def get_or_create(self, key: Any, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._items.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                value = factory()
+                self._put(key, value)
+            else:
+                self.hits += 1
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._put(key, value)
+
+    def _put(self, key: Any, value: Any) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._items), "capacity": self.capacity, "hits": self.hits, "misses": self.misses}
+
+
+class _Document:
+    """
+    Egy dokumentum előző ellenőrzésének állapota (lásd watch.py).
+    """
+
+    def __init__(self):
+        # egy dokumentum cache-lánca egyszerre csak egy kérésé
+        self.lock = threading.Lock()
+        self.rule_cache = RuleCache()
+        self.text_cache = ConversionCache()
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Stats:
+    """
+    Kérésszámlálók, késleltetés és áteresztés végpontonként.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.in_flight = 0
+        # végpont -> {"requests", "errors", "seconds", "max_ms"}
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        # (befejezés ideje, késleltetés ms) a legutóbbi kérésekre
+        self._recent: "deque[Tuple[float, float]]" = deque(maxlen=LATENCY_WINDOW)
+
+    def begin(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, endpoint: str, seconds: float, error: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            stat = self.endpoints.get(endpoint)
+            if stat is None:
+                stat = self.endpoints[endpoint] = {"requests": 0, "errors": 0, "seconds": 0.0, "max_ms": 0.0}
+            stat["requests"] += 1
+            stat["errors"] += error
+            stat["seconds"] += seconds
+            stat["max_ms"] = max(stat["max_ms"], seconds * 1000)
+            self._recent.append((now, seconds * 1000))
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            uptime = now - self.started
+            total = sum(stat["requests"] for stat in self.endpoints.values())
+            latencies = [ms for _, ms in self._recent]
+            window = min(THROUGHPUT_WINDOW, uptime) or 1.0
+            recent = sum(1 for finished, _ in self._recent if now - finished <= THROUGHPUT_WINDOW)
+            endpoints = {
+                name: {
+                    "requests": stat["requests"],
+                    "errors": stat["errors"],
+                    "mean_ms": round(stat["seconds"] * 1000 / stat["requests"], 3),
+                    "max_ms": round(stat["max_ms"], 3),
+                }
+                for name, stat in self.endpoints.items()
+            }
+            in_flight = self.in_flight
+
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 3)
+
+        return {
+            "uptime_s": round(uptime, 3),
+            "requests": total,
+            "in_flight": in_flight,
+            "throughput_rps": round(total / uptime, 3) if uptime else None,
+            # a LATENCY_WINDOW korlát miatt nagy terhelésnél alulbecsül
+            "recent_rps": round(recent / window, 3),
+            "latency_ms": {
+                "p50": rounded(_percentile(latencies, 0.50)),
+                "p95": rounded(_percentile(latencies, 0.95)),
+                "p99": rounded(_percentile(latencies, 0.99)),
+            },
+            "endpoints": endpoints,
+        }
+
+
+class ValidationService:
+    """
+    A szolgáltatás állapota és műveletei – a HTTP rétegtől függetlenül is
+    használható (pl. tesztből, ugyanabban a folyamatban).
+    """
+
+    def __init__(self, result_cache_size: int = RESULT_CACHE_SIZE, document_cache_size: int = DOCUMENT_CACHE_SIZE):
+        # (tartalom-hash, coverage) -> (RuleSet, hibák)
+        self.results = _LRU(result_cache_size)
+        # dokumentumnév -> _Document
+        self.documents = _LRU(document_cache_size)
+        self.stats = _Stats()
+
+    # -------------------- bemenet -------------------- #
+
+    @staticmethod
+    def _source(payload: Dict[str, Any]) -> Tuple[str, Any, str]:
+        """
+        (fajta, tartalom, tartalom-hash) a kérésből: fajta "requirements",
+        "text" vagy "json" (fájlból).
+        """
+        if "requirements" in payload:
+            requirements = payload["requirements"]
+            if not isinstance(requirements, (dict, list)):
+                raise RequestError("A 'requirements' mezőnek JSON objektumnak vagy szabálylistának kell lennie.")
+            canonical = json.dumps(requirements, sort_keys=True, ensure_ascii=False)
+            return "requirements", requirements, hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+        if "text" in payload:
+            text = payload["text"]
+            if not isinstance(text, str):
+                raise RequestError("A 'text' mezőnek szövegnek kell lennie.")
+            return "text", text, hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+        if "path" in payload:
+            path = payload["path"]
+            if not isinstance(path, str):
+                raise RequestError("A 'path' mezőnek szövegnek kell lennie.")
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError as e:
+                raise RequestError(f"A fájl nem olvasható: {e}", status=404)
+            kind = "text" if path.endswith(".txt") else "json"
+            content = data.decode("utf-8") if kind == "text" else path
+            return kind, content, hashlib.sha1(data).hexdigest()
+
+        raise RequestError("Hiányzó bemenet: 'requirements', 'text' vagy 'path' szükséges.")
+
+    @staticmethod
+    def _document_name(payload: Dict[str, Any]) -> Optional[str]:
+        name = payload.get("document")
+        if name is None and isinstance(payload.get("path"), str):
+            name = os.path.abspath(payload["path"])
+        return None if name is None else str(name)
+
+    @staticmethod
+    def _requirements(kind: str, content: Any, document: Optional[_Document]) -> Dict[str, Any]:
+        if kind in ("requirements", "json"):
+            # mindkét felépítés (requirements / rule_list) normalizálva
+            try:
+                if kind == "requirements":
+                    return normalize_requirements(content)
+                return load_requirements(content)
+            except ValueError as e:
+                raise RequestError(str(e))
+        if document is None:
+            return text_to_requirements(content)
+        text_cache = document.text_cache.next_run()
+        requirements = text_to_requirements(content, cache=text_cache)
+        document.text_cache = text_cache
+        return requirements
+
+    # -------------------- műveletek -------------------- #
+
+    def validate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        coverage = bool(payload.get("coverage", False))
+        kind, content, digest = self._source(payload)
+
+        key = (digest, coverage)
+        cached = self.results.get(key)
+        if cached is not _MISSING:
+            _, errors = cached
+        else:
+            name = self._document_name(payload)
+            if name is None:
+                requirements = self._requirements(kind, content, None)
+                rule_set = RuleSet(requirements)
+                errors = run_all_checks(rule_set, coverage=coverage)
+            else:
+                document = self.documents.get_or_create(name, _Document)
+                with document.lock:
+                    requirements = self._requirements(kind, content, document)
+                    rule_cache = document.rule_cache.next_run()
+                    rule_set = RuleSet(requirements, cache=rule_cache)
+                    errors = run_all_checks(rule_set, coverage=coverage, cache=rule_cache)
+                    document.rule_cache = rule_cache
+            self.results.put(key, (rule_set, errors))
+
+        findings = {error_type: details for error_type, details in errors}
+        return {
+            "ok": not findings,
+            "findings": findings,
+            "cached": cached is not _MISSING,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    def convert(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        kind, content, _ = self._source(payload)
+        if kind != "text":
+            raise RequestError("A konverzióhoz 'text' vagy .txt 'path' szükséges.")
+        name = self._document_name(payload)
+        if name is None:
+            return {"requirements": self._requirements(kind, content, None)}
+        document = self.documents.get_or_create(name, _Document)
+        with document.lock:
+            return {"requirements": self._requirements(kind, content, document)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        stats = self.stats.snapshot()
+        stats["caches"] = {"results": self.results.snapshot(), "documents": self.documents.snapshot()}
+        return stats
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "ValidationServer"
+    protocol_version = "HTTP/1.1"
+    # socket-időkorlát: a tétlen kapcsolat szála nem vár örökké
+    timeout = KEEPALIVE_TIMEOUT
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, endpoint: str, action: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+        stats = self.server.service.stats
+        stats.begin()
+        start = time.perf_counter()
+        error = True
+        try:
+            # a törzset a korlátozott szakaszon kívül olvassuk: a lassú
+            # kliens ne foglaljon ellenőrző helyet
+            payload = self._payload()
+            with self.server.slots:
+                body = action(payload)
+            error = False
+            status = 200
+        except RequestError as e:
+            status, body = e.status, {"error": str(e)}
+        except Exception as e:
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            stats.end(endpoint, time.perf_counter() - start, error)
+        self._reply(status, body)
+
+    def _payload(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise RequestError("Túl nagy kéréstörzs.", status=413)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            raise RequestError(f"Érvénytelen JSON: {e}")
+        if not isinstance(payload, dict):
+            raise RequestError("A kéréstörzsnek JSON objektumnak kell lennie.")
+        return payload
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._reply(200, {"ok": True})
+        elif self.path == "/stats":
+            self._reply(200, self.server.service.snapshot())
+        else:
+            self._reply(404, {"error": f"Ismeretlen végpont: {self.path}"})
+
+    def do_POST(self) -> None:
+        service = self.server.service
+        if self.path == "/validate":
+            self._handle("validate", service.validate)
+        elif self.path == "/convert":
+            self._handle("convert", service.convert)
+        else:
+            # a törzset el kell olvasni, hogy a kapcsolat használható maradjon
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self._reply(404, {"error": f"Ismeretlen végpont: {self.path}"})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ValidationServer(ThreadingHTTPServer):
+    """
+    HTTP szerver kapcsolatonkénti démon szálakkal; az egyszerre futó
+    ellenőrzések számát a slots szemafor (workers) korlátozza.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ValidationService, workers: int = DEFAULT_WORKERS,
+                 verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.verbose = verbose
+        self.slots = threading.BoundedSemaphore(workers)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Helyben futó követelmény-ellenőrző szolgáltatás (HTTP/JSON).")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"cím (alapértelmezés: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (alapértelmezés: {DEFAULT_PORT})")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"egyszerre futó ellenőrzések száma (alapértelmezés: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=RESULT_CACHE_SIZE,
+        help=f"ennyi ellenőrzési eredmény marad meg (alapértelmezés: {RESULT_CACHE_SIZE})",
+    )
+    parser.add_argument(
+        "--documents",
+        type=int,
+        default=DOCUMENT_CACHE_SIZE,
+        help=f"ennyi dokumentum inkrementális állapota marad meg (alapértelmezés: {DOCUMENT_CACHE_SIZE})",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="kérésenkénti napló (stderr)")
+    args = parser.parse_args(argv)
+
+    service = ValidationService(args.cache_size, args.documents)
+    server = ValidationServer((args.host, args.port), service, workers=args.workers, verbose=args.verbose)
+    print(f"Figyelés: http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+testcases.py
+
+Határérték-tesztesetek generálása egy követelményfájlból (lásd
+Evaluation/boundary_cases.py).
+
+Használat:
+    python testcases.py Examples/price_calculation_example.json -o cases.jsonl
+    python testcases.py Examples/price_calculation_example.json --order 3 --expected
+    python testcases.py requirements.json --step total_weight_kg=0.1 --limit 1000
+
+- Kimenet soronként egy JSON objektum (stdout, ha nincs -o):
+  {"rules": [...], "variable": ..., "point": ..., "inputs": {...}}
+- --order: a szabály-kombinációk legnagyobb mérete (0 = korlátlan).
+- --expected: az eseteket a lefordított szabályokkal ki is értékeli
+  ("expected" mező).
+- Az esetek folyamként készülnek, a kombinációs tér nem kerül a memóriába.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from itertools import islice
+from typing import Dict, List
+
+from Evaluation.boundary_cases import DEFAULT_MAX_ORDER, boundary_cases
+from Evaluation.rule_compiler import compile_rules
+from Instrumentation.metrics import METRICS
+from Pre_process.SchemaLoader import load_requirements
+
+
+def _parse_steps(items: List[str]) -> Dict[str, float]:
+    steps: Dict[str, float] = {}
+    for item in items:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Érvénytelen lépésköz: {item!r} (várt alak: változó=érték)")
+        steps[name.strip()] = float(value) if "." in value or "e" in value.lower() else int(value)
+    return steps
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Határérték-tesztesetek generálása.")
+    parser.add_argument("requirements", help="követelményfájl (.json vagy .txt)")
+    parser.add_argument("-o", "--output", help="JSON Lines kimeneti fájl (alapértelmezés: stdout)")
+    parser.add_argument(
+        "--order",
+        type=int,
+        default=DEFAULT_MAX_ORDER,
+        help=f"a kombinációk legnagyobb mérete, 0 = korlátlan (alapértelmezés: {DEFAULT_MAX_ORDER})",
+    )
+    parser.add_argument(
+        "--step",
+        action="append",
+        default=[],
+        metavar="VÁLTOZÓ=ÉRTÉK",
+        help="lépésköz megadása egy változóra (többször is megadható)",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="legfeljebb ennyi eset")
+    parser.add_argument("--expected", action="store_true", help="az elvárt kimenetek hozzáadása")
+    parser.add_argument("--profile", action="store_true", help="szakaszidők kiírása (stderr)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        METRICS.enable()
+
+    try:
+        steps = _parse_steps(args.step)
+    except ValueError as e:
+        parser.error(str(e))
+
+    requirements = load_requirements(args.requirements)
+    compiled = compile_rules(requirements)
+    cases = boundary_cases(
+        requirements,
+        max_order=args.order or None,
+        steps=steps,
+        compiled=compiled,
+    )
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with METRICS.stage("testcases.write"):
+            for case in islice(cases, args.limit):
+                if args.expected:
+                    case["expected"] = compiled.evaluate(case["inputs"])
+                out.write(json.dumps(case, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.profile:
+        print(METRICS.report(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""
+A tesztek a repó gyökeréből importálnak (Checking_process, Pre_process, ...),
+ugyanúgy, mint a main.py.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+"""
+ConversionCache: a találatok nem osztoznak a hívóval.
+"""
+
+import copy
+import os
+
+from Pre_process.ConversionCache import ConversionCache
+from Pre_process.DataCleaning import text_to_requirements
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "Examples", "price_calculation_example.txt")
+
+
+def test_get_returns_a_copy():
+    cache = ConversionCache()
+    value = ("inputs", {"id": "R1", "Causes": [{"variable": "x", "operator": ">", "value": 1}]}, None)
+    cache.put("k", value)
+    value[1]["Causes"].clear()
+    hit = cache.get("k")
+    assert hit[1]["Causes"] == [{"variable": "x", "operator": ">", "value": 1}]
+    hit[1]["id"] = "R2"
+    assert cache.get("k")[1]["id"] == "R1"
+
+
+def test_mutating_the_result_does_not_corrupt_later_runs():
+    with open(EXAMPLE, encoding="utf-8") as f:
+        text = f.read()
+    cache = ConversionCache()
+    first = text_to_requirements(text, cache=cache)
+    expected = copy.deepcopy(first)
+
+    for section in ("inputs", "outputs"):
+        for rule in first[section]:
+            rule["id"] = "changed"
+            rule.get("Causes", []).clear()
+
+    second = text_to_requirements(text, cache=cache.next_run())
+    assert second == expected
@@ -0,0 +1,60 @@
+"""
+formula_index: kanonikus alak és mélyen egymásba ágyazott képletek.
+"""
+
+import sys
+
+import pytest
+
+from Checking_process.formula_index import FormulaInterner, canonical_formula
+from Checking_process.rule_set import RuleSet
+
+# jóval a Python rekurziós korlátja fölötti mélység
+DEPTH = 5 * sys.getrecursionlimit()
+
+
+def test_canonical_form():
+    assert canonical_formula("a*b + c") == canonical_formula("c + b*a")
+    assert canonical_formula("(a+b)+c") == canonical_formula("c+(b+a)")
+    assert canonical_formula("a/b") != canonical_formula("b/a")
+    assert canonical_formula("ez nem képlet!") is None
+
+
+@pytest.mark.parametrize(
+    "expr, expected",
+    [
+        ("/".join(["a"] * DEPTH), None),
+        ("^".join(["a"] * DEPTH), None),
+        ("(" * DEPTH + "a" + ")" * DEPTH, "a"),
+        ("-" * DEPTH + "a", "a"),
+        ("-" * (DEPTH + 1) + "a", canonical_formula("-a")),
+        ("(-" * DEPTH + "a" + ")" * DEPTH, "a"),
+    ],
+)
+def test_deep_formula(expr, expected):
+    interner = FormulaInterner()
+    sig = canonical_formula(expr, interner)
+    assert sig is not None
+    if expected is not None:
+        assert sig == expected
+    # a memoizált signature ugyanaz
+    assert interner.signature(interner.parse(expr)) == sig
+
+
+def test_deep_formula_in_rule_set():
+    expr = "/".join(["a"] * DEPTH)
+    rule_set = RuleSet({
+        "variables": [
+            {"name": "a", "type": "decimal", "role": "input"},
+            {"name": "y", "type": "decimal", "role": "output"},
+        ],
+        "inputs": [
+            {
+                "id": "R1",
+                "Causes": [{"variable": "a", "operator": ">", "value": 1}],
+                "effects": [{"variable": "y", "operator": "=", "value": expr}],
+            },
+        ],
+        "outputs": [],
+    })
+    assert len(rule_set.rules) == 1
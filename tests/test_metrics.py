@@ -0,0 +1,46 @@
+"""
+Instrumentation: ellenőrzőnkénti szakaszok a cache-elt és a párhuzamos
+futásban is.
+"""
+
+import json
+import os
+
+import pytest
+
+from Instrumentation.metrics import METRICS
+from main import run_all_checks
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "Examples", "price_calculation_example.json")
+
+CHECKER_STAGES = ("check.variable_conflicts", "check.logical_exclusions", "check.redundant_rules")
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+
+def _requirements():
+    with open(EXAMPLE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_checker_stages_with_cache(metrics, tmp_path, workers):
+    run_all_checks(_requirements(), workers=workers, cache_path=str(tmp_path / "requirements.cache"))
+    report = metrics.report()
+    for name in (*CHECKER_STAGES, "check.cached", "rule_cache.save"):
+        assert name in metrics.stages
+        assert name in report
+
+
+def test_checker_stages_parallel(metrics):
+    run_all_checks(_requirements(), workers=2)
+    for name in (*CHECKER_STAGES, "check.parallel"):
+        assert metrics.stages[name]["calls"] == 1
@@ -0,0 +1,43 @@
+"""
+SchemaLoader: streamelt betöltés RuleSet-be és bináris cache.
+"""
+
+import json
+import os
+
+import pytest
+
+from Checking_process.check_cache import RuleCache, run_cached_checks
+from Checking_process.rule_set import RuleSet
+from Pre_process.SchemaLoader import load_rule_set
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "Examples", "price_calculation_example.json")
+
+
+def _checks(rule_set):
+    return run_cached_checks(rule_set, rule_set.cache)
+
+
+def test_streamed_rule_set_matches_in_memory(tmp_path):
+    with open(EXAMPLE, encoding="utf-8") as f:
+        expected = _checks(RuleSet(json.load(f), cache=RuleCache(None)))
+
+    rule_base = str(tmp_path / "requirements.rulebase")
+    streamed = load_rule_set(EXAMPLE, RuleCache(None), rule_base)
+    assert os.path.exists(rule_base)
+    assert _checks(streamed) == expected
+
+    # változatlan fájl: a RuleSet a bináris cache-ből épül
+    cached = load_rule_set(EXAMPLE, RuleCache(None), rule_base)
+    assert [r.id for r in cached.rules] == [r.id for r in streamed.rules]
+    assert _checks(cached) == expected
+
+
+def test_unknown_layout_is_not_cached(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps({"foo": [1, 2]}), encoding="utf-8")
+    rule_base = tmp_path / "bad.rulebase"
+    with pytest.raises(ValueError):
+        load_rule_set(str(path), RuleCache(None), str(rule_base))
+    assert not rule_base.exists()
@@ -0,0 +1,361 @@
+"""
+watch.py
+
+Követelményfájlok folyamatos figyelése és újraellenőrzése mentéskor.
+
+Használat:
+    python watch.py Examples
+    python watch.py requirements.json "specs/*.txt" --debounce 100 --jsonl
+
+- A bemenet lehet fájl, könyvtár vagy glob minta (mint batch.py-nál); az
+  új fájlokat RESCAN_INTERVAL-onként vesszük fel.
+- Egy asyncio eseményhurok INTERVAL-onként megnézi a fájlok méretét és
+  módosítási idejét. Változás után a fájl akkor kerül sorra, ha legalább
+  DEBOUNCE ideje nem változott (egy mentés több írásból is állhat).
+- Fájlonként memóriában marad az előző futás állapota:
+    - .txt: R-blokkonkénti konverziós cache – csak a módosult blokkok
+      parszolódnak újra (ConversionCache.next_run),
+    - szabály-cache: a változatlan szabályok számolt adatai, az ütköző párok
+      az üzeneteikkel és a hatáscsoportonkénti lefedések (RuleCache.next_run)
+      – csak a módosult szabályokat érintő részek számolódnak újra.
+- A páros ütközések változását a szabály-cache megjelent / megszűnt
+  párjaiból számoljuk (üzenetenkénti darabszámmal), nem a teljes
+  hibalisták összevetésével – egy mentés ideje így nem az ütközések
+  számával nő.
+- Azonos tartalmú mentésnél (pl. csak touch) nem ellenőrzünk újra.
+- Kimenet: a változás óta megjelent (+) és megszűnt (-) hibák, fájlonként;
+  --jsonl esetén soronként egy JSON objektum:
+  {"file": ..., "ok": ..., "total": ..., "added": {...}, "resolved": {...},
+   "error": ..., "elapsed_ms": ...}
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+from batch import collect_files
+from main import run_all_checks
+from Checking_process.check_cache import RuleCache
+from Pre_process.ConversionCache import ConversionCache
+from Pre_process.DataCleaning import text_to_requirements
+from Pre_process.SchemaLoader import normalize_requirements
+
+
+# A fájlok állapotának lekérdezési gyakorisága (másodperc)
+INTERVAL = 0.02
+
+# Ennyi ideig nem változhat a fájl, mielőtt újraellenőrizzük (másodperc)
+DEBOUNCE = 0.05
+
+# Ilyen gyakran bontjuk ki újra a mintákat az új fájlokért (másodperc)
+RESCAN_INTERVAL = 1.0
+
+# A run_all_checks kategóriája, amelynek a végén a páros ütközések
+# üzenetei (RuleCache.pair_texts) állnak
+PAIR_CATEGORY = "Logikai kizárások"
+
+Findings = Dict[str, List[str]]
+
+
+def _diff_messages(before: List[str], after: List[str]) -> Tuple[List[str], List[str]]:
+    before_set = set(before)
+    after_set = set(after)
+    appeared = [msg for msg in after if msg not in before_set]
+    gone = [msg for msg in before if msg not in after_set]
+    return appeared, gone
+
+
+def _diff_findings(
+    old: Findings,
+    new: Findings,
+    pair_counts: Tuple[int, int] = (0, 0),
+    pair_diff: Tuple[List[str], List[str]] = ([], []),
+) -> Tuple[Findings, Findings]:
+    """
+    (megjelent, megszűnt) hibák kategóriánként, az eredeti sorrendben.
+
+    A PAIR_CATEGORY lista utolsó (régi, új) pair_counts eleme a páros
+    ütközések üzenete: ezeket nem vetjük össze, a változásuk pair_diff.
+    """
+    added: Findings = {}
+    resolved: Findings = {}
+    for category in dict.fromkeys([*new, *old]):
+        before = old.get(category, [])
+        after = new.get(category, [])
+        if category == PAIR_CATEGORY:
+            appeared, gone = _diff_messages(
+                before[:len(before) - pair_counts[0]],
+                after[:len(after) - pair_counts[1]],
+            )
+            appeared += pair_diff[0]
+            gone += pair_diff[1]
+        else:
+            appeared, gone = _diff_messages(before, after)
+        if appeared:
+            added[category] = appeared
+        if gone:
+            resolved[category] = gone
+    return added, resolved
+
+
+class _WatchedFile:
+    """
+    Egy figyelt fájl és az előző ellenőrzésének memóriában tartott állapota.
+    """
+
+    def __init__(self, path: str, coverage: bool):
+        self.path = path
+        self.coverage = coverage
+        # (méret, módosítási idő) – ebből látjuk a változást
+        self.stat: Optional[Tuple[int, int]] = None
+        # az utolsó még nem ellenőrzött változás ideje
+        self.changed_at: Optional[float] = None
+        self.digest: Optional[str] = None
+        self.findings: Findings = {}
+        # a páros ütközések üzenetei -> darabszám (a mostani állapotban)
+        self.pair_counts: Dict[str, int] = {}
+        # az ellenőrzési sorban van
+        self.queued = False
+        self.rule_cache = RuleCache()
+        self.text_cache = ConversionCache()
+
+    def poll(self, now: float) -> bool:
+        """
+        A fájl állapotának frissítése; False, ha a fájl eltűnt.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        stat = (st.st_size, st.st_mtime_ns)
+        if stat != self.stat:
+            self.stat = stat
+            self.changed_at = now
+        return True
+
+    def due(self, now: float, debounce: float) -> bool:
+        return self.changed_at is not None and now - self.changed_at >= debounce
+
+    def _load(self, text: str) -> Dict[str, Any]:
+        if self.path.endswith(".txt"):
+            text_cache = self.text_cache.next_run()
+            requirements = text_to_requirements(text, cache=text_cache)
+            self.text_cache = text_cache
+            return requirements
+        return normalize_requirements(json.loads(text))
+
+    def _pair_diff(self, rule_cache: RuleCache) -> Tuple[List[str], List[str]]:
+        """
+        A páros ütközések (megjelent, megszűnt) üzenetei a szabály-cache
+        pair_changes-éből; a darabszámok miatt az ismétlődő üzenet csak
+        akkor jelent meg / szűnt meg, ha előtte / utána egy sem volt.
+        """
+        added, resolved = rule_cache.pair_changes
+        counts = self.pair_counts
+        before = {text: counts.get(text, 0) for text in added}
+        for text in resolved:
+            n = counts[text] - 1
+            if n:
+                counts[text] = n
+            else:
+                del counts[text]
+        for text in added:
+            counts[text] = counts.get(text, 0) + 1
+        return [text for text in added if not before[text]], [text for text in resolved if text not in counts]
+
+    def revalidate(self) -> Optional[Dict[str, Any]]:
+        """
+        Újraellenőrzés az előző állapothoz képest. None, ha a tartalom nem
+        változott. Hibánál az előző állapot megmarad.
+        """
+        start = time.perf_counter()
+        record: Dict[str, Any] = {
+            "file": self.path,
+            "ok": False,
+            "total": None,
+            "added": {},
+            "resolved": {},
+            "error": None,
+        }
+
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            if digest == self.digest:
+                return None
+
+            requirements = self._load(data.decode("utf-8"))
+            rule_cache = self.rule_cache.next_run()
+            errors = run_all_checks(requirements, coverage=self.coverage, cache=rule_cache)
+        except Exception as e:
+            # a következő mentésnél újra próbáljuk
+            self.digest = None
+            record["error"] = f"{type(e).__name__}: {e}"
+        else:
+            findings = {error_type: details for error_type, details in errors}
+            pair_counts = (len(self.rule_cache.pair_texts), len(rule_cache.pair_texts))
+            record["added"], record["resolved"] = _diff_findings(
+                self.findings, findings, pair_counts, self._pair_diff(rule_cache)
+            )
+            record["ok"] = not findings
+            record["total"] = sum(len(details) for details in findings.values())
+            self.findings = findings
+            self.rule_cache = rule_cache
+            self.digest = digest
+
+        record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return record
+
+
+def _write_text(out: TextIO, record: Dict[str, Any]) -> None:
+    stamp = time.strftime("%H:%M:%S")
+    if record["error"] is not None:
+        out.write(f"[{stamp}] {record['file']}: hiba – {record['error']}\n")
+        return
+
+    added = sum(len(v) for v in record["added"].values())
+    resolved = sum(len(v) for v in record["resolved"].values())
+    state = f"{record['total']} hiba" if not record["ok"] else "hibátlan"
+    if added or resolved:
+        state += f" ({added} új, {resolved} megszűnt)"
+    out.write(f"[{stamp}] {record['file']}: {state} ({record['elapsed_ms']} ms)\n")
+    for sign, findings in (("+", record["added"]), ("-", record["resolved"])):
+        for category, details in findings.items():
+            for detail in details:
+                out.write(f"  {sign} {category}: {detail}\n")
+
+
+class Watcher:
+    """
+    A minták fájljainak figyelése egy asyncio eseményhurokban.
+    """
+
+    def __init__(
+        self,
+        patterns: List[str],
+        out: TextIO = sys.stdout,
+        jsonl: bool = False,
+        coverage: bool = False,
+        interval: float = INTERVAL,
+        debounce: float = DEBOUNCE,
+    ):
+        self.patterns = patterns
+        self.out = out
+        self.jsonl = jsonl
+        self.coverage = coverage
+        self.interval = interval
+        self.debounce = debounce
+        self.files: Dict[str, _WatchedFile] = {}
+        self._rescanned_at = -RESCAN_INTERVAL
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        if self.jsonl:
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            _write_text(self.out, record)
+        self.out.flush()
+
+    def _scan(self, now: float) -> None:
+        if now - self._rescanned_at >= RESCAN_INTERVAL:
+            self._rescanned_at = now
+            for path in collect_files(self.patterns):
+                if path not in self.files:
+                    self.files[path] = _WatchedFile(path, self.coverage)
+
+        for path, watched in list(self.files.items()):
+            if not watched.poll(now):
+                del self.files[path]
+                if not self.jsonl:
+                    self.out.write(f"[{time.strftime('%H:%M:%S')}] {path}: a fájl megszűnt, nem figyeljük tovább.\n")
+                    self.out.flush()
+
+    async def _revalidate(self, watched: _WatchedFile) -> None:
+        # külön szálon, hogy közben a figyelés is folyjon; ami a futás
+        # közben változik, az újra sorra kerül
+        watched.changed_at = None
+        loop = asyncio.get_running_loop()
+        record = await loop.run_in_executor(None, watched.revalidate)
+        if record is not None:
+            self._emit(record)
+
+    async def _poll(self, queue: "asyncio.Queue[_WatchedFile]") -> None:
+        while True:
+            now = time.monotonic()
+            self._scan(now)
+            for watched in self.files.values():
+                if not watched.queued and watched.due(now, self.debounce):
+                    watched.queued = True
+                    queue.put_nowait(watched)
+            await asyncio.sleep(self.interval)
+
+    async def _check(self, queue: "asyncio.Queue[_WatchedFile]") -> None:
+        while True:
+            watched = await queue.get()
+            try:
+                await self._revalidate(watched)
+            finally:
+                watched.queued = False
+
+    async def run(self, once: bool = False) -> None:
+        """
+        Az első teljes ellenőrzés után (once=False esetén) a változások
+        figyelése leállításig: a lekérdezés és az ellenőrzés két külön
+        korutin, egy sorral összekötve.
+        """
+        self._scan(time.monotonic())
+        for watched in list(self.files.values()):
+            await self._revalidate(watched)
+        if once:
+            return
+        queue: "asyncio.Queue[_WatchedFile]" = asyncio.Queue()
+        await asyncio.gather(self._poll(queue), self._check(queue))
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Követelményfájlok figyelése és újraellenőrzése mentéskor.")
+    parser.add_argument("paths", nargs="+", help="fájlok, könyvtárak vagy glob minták")
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEBOUNCE * 1000,
+        help=f"ennyi ms nyugalom után ellenőrzünk (alapértelmezés: {DEBOUNCE * 1000:g})",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=INTERVAL * 1000,
+        help=f"a fájlok lekérdezési gyakorisága ms-ban (alapértelmezés: {INTERVAL * 1000:g})",
+    )
+    parser.add_argument("--coverage", action="store_true", help="a lefedettségi hézagokat is keressük")
+    parser.add_argument("--jsonl", action="store_true", help="JSON Lines kimenet")
+    parser.add_argument("--once", action="store_true", help="egyszeri ellenőrzés figyelés nélkül")
+    args = parser.parse_args(argv)
+
+    if not collect_files(args.paths):
+        print("Nem található ellenőrizhető fájl.", file=sys.stderr)
+        return 2
+
+    watcher = Watcher(
+        args.paths,
+        jsonl=args.jsonl,
+        coverage=args.coverage,
+        interval=args.interval / 1000,
+        debounce=args.debounce / 1000,
+    )
+    try:
+        asyncio.run(watcher.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())